@@ -1,216 +1,430 @@
 import argparse
-import sys
-import threading
+import asyncio
+import atexit
 import time
-
-import nest_asyncio  # type:ignore
-import pypresence  # type:ignore
+import traceback
+from typing import Any, Optional
 
 from league_rpc.champion import gather_ingame_information, get_skin_asset
 from league_rpc.gametime import get_current_ingame_time
-from league_rpc.kda import get_creepscore, get_gold, get_kda, get_level
-from league_rpc.lcu_api.lcu_connector import start_connector
+from league_rpc.kda import (
+    format_creepscore,
+    format_kda,
+    get_active_player,
+    get_level,
+    get_player_scores,
+)
+from league_rpc.lcu_api.lcu_connector import module_data, rpc_updater, start_connector
+from league_rpc.live_timeseries import LiveGameRecorder
+from league_rpc.models.game_rates import (
+    RATE_GOLD,
+    GameRates,
+    parse_rates,
+    rates_for_game_mode,
+)
+from league_rpc.models.gameflow_state import (
+    POLL_INTERVALS,
+    ClientState,
+    GameflowStateMachine,
+    StateTransition,
+)
+from league_rpc.models.lcu.gameflow_phase import GameFlowPhase
+from league_rpc.models.match_history import ChampionSummary, MatchRecorder
+from league_rpc.models.presence_writer import PresenceWriter
 from league_rpc.processes.process import (
     check_discord_process,
     check_league_client_process,
-    player_state,
+    watch_league_processes,
 )
-from league_rpc.reconnect import discord_reconnect_attempt
 from league_rpc.utils.color import Color
 from league_rpc.utils.const import (
     ALL_GAME_DATA_URL,
     CHAMPION_NAME_CONVERT_MAP,
     DEFAULT_CLIENT_ID,
     DEFAULT_LEAGUE_CLIENT_EXE_PATH,
-    DISCORD_PROCESS_NAMES,
     LEAGUE_OF_LEGENDS_LOGO,
     SMALL_TEXT,
 )
+from league_rpc.utils.executor import run_blocking
+from league_rpc.utils.loop_monitor import loop_monitor
+from league_rpc.utils.metrics import MetricsServer
 from league_rpc.utils.polling import wait_until_exists
+from league_rpc.utils.tracing import tracer
 
 # Discord Application: League of Linux
 
 
-def main(cli_args: argparse.Namespace) -> None:
+def sample_rates(
+    game_rates: GameRates,
+    game_time: int,
+    scores: dict[str, Any],
+    active_player: dict[str, Any],
+) -> None:
+    """Hands the latest values of the game to the per-minute rates."""
+    game_rates.sample(
+        game_time=game_time,
+        creep_score=scores.get("creepScore"),
+        gold=active_player.get("currentGold"),
+        kills=scores.get("kills"),
+        deaths=scores.get("deaths"),
+        assists=scores.get("assists"),
+    )
+
+
+def sample_match(
+    recorder: Optional[MatchRecorder],
+    game_time: int,
+    scores: dict[str, Any],
+    active_player: dict[str, Any],
+) -> None:
+    """Hands the latest values of the game to the match recorder, if the match history is enabled."""
+    if recorder is None:
+        return
+    recorder.sample(
+        game_time=game_time,
+        kills=scores.get("kills"),
+        deaths=scores.get("deaths"),
+        assists=scores.get("assists"),
+        creep_score=scores.get("creepScore"),
+        current_gold=active_player.get("currentGold"),
+        level=active_player.get("level"),
+    )
+
+
+async def champion_record(
+    recorder: Optional[MatchRecorder], cli_args: argparse.Namespace, champion: str
+) -> str:
+    """Returns the record of the champion in the match history, as text for the presence. Empty if there is none."""
+    if recorder is None or cli_args.no_stats:
+        return ""
+    summary: ChampionSummary = await run_blocking(
+        recorder.history.champion_summary, champion=champion
+    )
+    return summary.format()
+
+
+async def in_game_presence(
+    presence: PresenceWriter,
+    cli_args: argparse.Namespace,
+    start_time: int,
+    recorder: Optional[MatchRecorder] = None,
+) -> None:
+    """
+    Shows the in-game presence, refreshed from the live client API.
+    Runs while the player is in game: it is started when the game is entered, and cancelled when it's left.
+    The values of the game are handed to the recorder on every refresh, for the match history,
+    and to the per-minute rates selected with --rates. The record of the champion in the match history
+    is shown next to its skin.
+    """
+    print(
+        f"\n{Color.dblue}Detected game! Will soon gather data and update discord RPC{Color.reset}"
+    )
+    refresh_interval: float = POLL_INTERVALS[ClientState.IN_GAME]
+
+    # Poll the local league api until 200 response.
+    await run_blocking(
+        wait_until_exists,
+        url=ALL_GAME_DATA_URL,
+        custom_message="Failed to reach the local league api",
+        startup=True,
+    )
+    (
+        champ_name,
+        skin_name,
+        chroma_name,
+        skin_id,
+        gamemode,
+        _,
+        _,
+    ) = await run_blocking(gather_ingame_information)
+    rates: tuple[str, ...] = (
+        () if cli_args.no_stats else rates_for_game_mode(cli_args.rates, gamemode)
+    )
+    game_rates = GameRates()
+    if gamemode == "TFT":
+        # TFT RPC
+        if recorder is not None:
+            recorder.start(client_data=module_data.client_data, game_mode=gamemode)
+        while True:
+            level: int = await run_blocking(get_level)
+            ingame_time: int = await run_blocking(
+                get_current_ingame_time, default_time=start_time
+            )
+            if recorder is not None:
+                recorder.sample(game_time=ingame_time, level=level)
+            presence.update(
+                phase=GameFlowPhase.IN_PROGRESS,
+                large_image="https://wallpapercave.com/wp/wp7413493.jpg",
+                large_text="Playing TFT",
+                details="Teamfight Tactics",
+                state=f"In Game · lvl: {level}",
+                small_image=LEAGUE_OF_LEGENDS_LOGO,
+                small_text=SMALL_TEXT,
+                start=int(time.time()) - ingame_time,
+            )
+            await asyncio.sleep(refresh_interval)
+    elif gamemode == "Arena":
+        # ARENA RPC
+        skin_asset: str = await run_blocking(
+            get_skin_asset,
+            champion_name=champ_name,
+            skin_id=skin_id,
+        )
+        print(
+            f"{Color.green}Successfully gathered all data. Updating your Presence now!{Color.reset}"
+        )
+        if recorder is not None:
+            recorder.start(
+                client_data=module_data.client_data,
+                champion=champ_name,
+                skin=skin_name,
+                game_mode=gamemode,
+            )
+        # Read once: the game that is played is only added to the history once it's over.
+        record: str = await champion_record(recorder, cli_args, champ_name)
+        while True:
+            large_text = (
+                f"{skin_name} ({chroma_name})"
+                if chroma_name
+                else (
+                    skin_name
+                    if skin_name
+                    else CHAMPION_NAME_CONVERT_MAP.get(champ_name, champ_name)
+                )
+            )
+            if record:
+                large_text = f"{large_text} · {record}"
+            stats: str = ""
+            scores: dict[str, Any] = {}
+            active_player: dict[str, Any] = {}
+            if not cli_args.no_stats or recorder is not None:
+                scores, active_player = await asyncio.gather(
+                    run_blocking(get_player_scores),
+                    run_blocking(get_active_player),
+                )
+            level, gold = int(active_player.get("level", 0)), int(
+                active_player.get("currentGold", 0)
+            )
+            ingame_time = await run_blocking(
+                get_current_ingame_time, default_time=start_time
+            )
+            if rates:
+                sample_rates(game_rates, ingame_time, scores, active_player)
+            if not cli_args.no_stats:
+                stats = f"· {format_kda(scores)} · lvl: {level} · gold: {gold}{game_rates.format(rates)}"
+            sample_match(recorder, ingame_time, scores, active_player)
+            presence.update(
+                phase=GameFlowPhase.IN_PROGRESS,
+                large_image=skin_asset,
+                large_text=large_text,
+                details=gamemode,
+                state=f"In Game {stats}",
+                small_image=LEAGUE_OF_LEGENDS_LOGO,
+                small_text=SMALL_TEXT,
+                start=int(time.time()) - ingame_time,
+            )
+            await asyncio.sleep(refresh_interval)
+    else:
+        # LEAGUE RPC
+        skin_asset = await run_blocking(
+            get_skin_asset,
+            champion_name=champ_name,
+            skin_id=skin_id,
+        )
+        print(
+            f"{Color.green}Successfully gathered all data. Updating your Presence now!{Color.reset}"
+        )
+        if not champ_name or not gamemode:
+            return
+        if recorder is not None:
+            recorder.start(
+                client_data=module_data.client_data,
+                champion=champ_name,
+                skin=skin_name,
+                game_mode=gamemode,
+            )
+        # Read once: the game that is played is only added to the history once it's over.
+        record = await champion_record(recorder, cli_args, champ_name)
+        while True:
+            large_text = (
+                f"{skin_name} ({chroma_name})"
+                if chroma_name
+                else (
+                    skin_name
+                    if skin_name
+                    else CHAMPION_NAME_CONVERT_MAP.get(champ_name, champ_name)
+                )
+            )
+            if record:
+                large_text = f"{large_text} · {record}"
+            stats = ""
+            scores = {}
+            active_player = {}
+            if not cli_args.no_stats or recorder is not None:
+                # The kills, deaths, assists and creep score come in a single request.
+                scores = await run_blocking(get_player_scores)
+            if recorder is not None or RATE_GOLD in rates:
+                active_player = await run_blocking(get_active_player)
+            ingame_time = await run_blocking(
+                get_current_ingame_time, default_time=start_time
+            )
+            if rates:
+                sample_rates(game_rates, ingame_time, scores, active_player)
+            if not cli_args.no_stats:
+                stats = f"· {format_kda(scores)} · {format_creepscore(scores)}{game_rates.format(rates)}"
+            sample_match(recorder, ingame_time, scores, active_player)
+            presence.update(
+                phase=GameFlowPhase.IN_PROGRESS,
+                large_image=skin_asset,
+                large_text=large_text,
+                details=gamemode,
+                state=f"In Game {stats}",
+                small_image=LEAGUE_OF_LEGENDS_LOGO,
+                small_text=SMALL_TEXT,
+                start=int(time.time()) - ingame_time,
+            )
+            await asyncio.sleep(refresh_interval)
+
+
+def report_in_game_failure(task: "asyncio.Task[None]") -> None:
+    """Prints the exception that ended the in-game presence. Leaving the game cancels it, which is not a failure."""
+    if task.cancelled() or (exc := task.exception()) is None:
+        return
+    print(
+        f"{Color.red}The in-game presence stopped because of an error. It will be back in the next game.{Color.reset}"
+    )
+    traceback.print_exception(exc)
+
+
+async def main(cli_args: argparse.Namespace) -> None:
     """
     This is the program that gets executed.
+    Everything runs on a single event loop. Blocking calls (process scans, the live client API) go through run_blocking.
     """
+    background_tasks: set[asyncio.Task[None]] = {
+        asyncio.create_task(loop_monitor.run())
+    }
+    metrics_server: Optional[MetricsServer] = None
+    if cli_args.metrics_port:
+        metrics_server = MetricsServer(port=cli_args.metrics_port)
+        await metrics_server.start()
+
     ############################################################
     ## Check Discord, RiotClient & LeagueClient processes     ##
-    check_league_client_process(cli_args)
+    await check_league_client_process(cli_args)
 
-    rpc = check_discord_process(
-        process_names=DISCORD_PROCESS_NAMES + cli_args.add_process,
+    presence = await check_discord_process(
         client_id=cli_args.client_id,
         wait_for_discord=cli_args.wait_for_discord,
     )
+    # presence is the only writer of the Discord presence, shared by the in-game task and the LCU task.
+    # It reconnects to Discord by itself, so closing Discord never interrupts them.
 
-    # Start LCU_Thread
-    # This process will connect to the LCU API and updates the rpc based on data subscribed from the LCU API.
-    # In this case passing the rpc object to the process is easier than trying to return updated data from the process.
-    # Every In-Client update will be handled by the LCU_Thread process and will update the rpc accordingly.
-    lcu_process = threading.Thread(
-        target=start_connector,
-        args=(
-            rpc,
-            cli_args,
-        ),
-        daemon=True,
+    # The state machine decides who owns the presence: the in-game task while in game, the LCU task otherwise.
+    gameflow: GameflowStateMachine = module_data.gameflow
+    start_time = int(time.time())
+    in_game_task: Optional[asyncio.Task[None]] = None
+    recorder: Optional[MatchRecorder] = None if cli_args.no_history else MatchRecorder()
+    game_recorder: Optional[LiveGameRecorder] = None
+    if cli_args.record_game:
+        game_recorder = LiveGameRecorder(
+            directory=cli_args.record_game, rate=cli_args.record_game_rate
+        )
+        # Also written when leagueRPC is stopped in the middle of a game.
+        atexit.register(game_recorder.stop, wait=True)
+
+    def enter_game(_: StateTransition) -> None:
+        nonlocal in_game_task
+        in_game_task = asyncio.create_task(
+            in_game_presence(
+                presence=presence,
+                cli_args=cli_args,
+                start_time=start_time,
+                recorder=recorder,
+            ),
+            name="in_game_presence",
+        )
+        in_game_task.add_done_callback(report_in_game_failure)
+        if game_recorder is not None:
+            game_recorder.start()
+
+    def exit_game(_: StateTransition) -> None:
+        if in_game_task is not None:
+            in_game_task.cancel()
+        if game_recorder is not None:
+            game_recorder.stop()
+        # Show the presence of the client again, now that the game is over.
+        rpc_updater.delay_update(module_data=module_data)
+
+    def finish_match(transition: StateTransition) -> None:
+        # The LP after the game arrives during the post-game screens, so the game is only stored once they are left.
+        if recorder is not None and transition.current not in (
+            ClientState.IN_GAME,
+            ClientState.POST_GAME,
+        ):
+            recorder.finish(client_data=module_data.client_data)
+
+    gameflow.on_enter(ClientState.IN_GAME, enter_game)
+    gameflow.on_exit(ClientState.IN_GAME, exit_game)
+    gameflow.on_exit(ClientState.IN_GAME, finish_match)
+    gameflow.on_exit(ClientState.POST_GAME, finish_match)
+
+    # Start the LCU task
+    # This task will connect to the LCU API and updates the rpc based on data subscribed from the LCU API.
+    # Every In-Client update will be handled by the LCU task, and will update the rpc accordingly.
+    background_tasks.add(
+        asyncio.create_task(
+            start_connector(presence_from_main=presence, cli_args=cli_args)
+        )
     )
-    lcu_process.start()
 
     print(f"\n{Color.green}Successfully connected to Discord RPC!{Color.reset}")
     ############################################################
 
-    start_time = int(time.time())
     while True:
-        try:
-            match player_state():
-                case "InGame":
-                    print(
-                        f"\n{Color.dblue}Detected game! Will soon gather data and update discord RPC{Color.reset}"
-                    )
-
-                    # Poll the local league api until 200 response.
-                    wait_until_exists(
-                        url=ALL_GAME_DATA_URL,
-                        custom_message="Failed to reach the local league api",
-                        startup=True,
-                    )
-                    (
-                        champ_name,
-                        skin_name,
-                        chroma_name,
-                        skin_id,
-                        gamemode,
-                        _,
-                        _,
-                    ) = gather_ingame_information()
-                    if gamemode == "TFT":
-                        # TFT RPC
-                        while player_state() == "InGame":
-                            try:
-                                rpc.update(  # type:ignore
-                                    large_image="https://wallpapercave.com/wp/wp7413493.jpg",
-                                    large_text="Playing TFT",
-                                    details="Teamfight Tactics",
-                                    state=f"In Game · lvl: {get_level()}",
-                                    small_image=LEAGUE_OF_LEGENDS_LOGO,
-                                    small_text=SMALL_TEXT,
-                                    start=int(time.time())
-                                    - get_current_ingame_time(default_time=start_time),
-                                )
-                            except RuntimeError:
-                                print(
-                                    f"{Color.red}Discord seems to be closed, will attempt to reconnect!{Color.reset}"
-                                )
-                                discord_reconnect_attempt(rpc=rpc)
-                            time.sleep(10)
-                    elif gamemode == "Arena":
-                        # ARENA RPC
-                        skin_asset: str = get_skin_asset(
-                            champion_name=champ_name,
-                            skin_id=skin_id,
-                        )
-                        print(
-                            f"{Color.green}Successfully gathered all data. Updating your Presence now!{Color.reset}"
-                        )
-                        while player_state() == "InGame":
-                            large_text = (
-                                f"{skin_name} ({chroma_name})"
-                                if chroma_name
-                                else (
-                                    skin_name
-                                    if skin_name
-                                    else CHAMPION_NAME_CONVERT_MAP.get(
-                                        champ_name, champ_name
-                                    )
-                                )
-                            )
-                            try:
-                                rpc.update(  # type:ignore
-                                    large_image=skin_asset,
-                                    large_text=large_text,
-                                    details=gamemode,
-                                    state=f"In Game {f'· {get_kda()} · lvl: {get_level()} · gold: {get_gold()}' if not cli_args.no_stats else ''}",
-                                    small_image=LEAGUE_OF_LEGENDS_LOGO,
-                                    small_text=SMALL_TEXT,
-                                    start=int(time.time())
-                                    - get_current_ingame_time(default_time=start_time),
-                                )
-                            except RuntimeError:
-                                print(
-                                    f"{Color.red}Discord seems to be closed, will attempt to reconnect!{Color.reset}"
-                                )
-                                discord_reconnect_attempt(rpc=rpc)
-                            time.sleep(10)
-                    else:
-                        # LEAGUE RPC
-                        skin_asset = get_skin_asset(
-                            champion_name=champ_name,
-                            skin_id=skin_id,
-                        )
-                        print(
-                            f"{Color.green}Successfully gathered all data. Updating your Presence now!{Color.reset}"
-                        )
-                        while player_state() == "InGame":
-                            if not champ_name or not gamemode:
-                                break
-                            large_text = (
-                                f"{skin_name} ({chroma_name})"
-                                if chroma_name
-                                else (
-                                    skin_name
-                                    if skin_name
-                                    else CHAMPION_NAME_CONVERT_MAP.get(
-                                        champ_name, champ_name
-                                    )
-                                )
-                            )
-                            try:
-                                rpc.update(  # type:ignore
-                                    large_image=skin_asset,
-                                    large_text=large_text,
-                                    details=gamemode,
-                                    state=f"In Game {f'· {get_kda()} · {get_creepscore()}' if not cli_args.no_stats else ''}",
-                                    small_image=LEAGUE_OF_LEGENDS_LOGO,
-                                    small_text=SMALL_TEXT,
-                                    start=int(time.time())
-                                    - get_current_ingame_time(default_time=start_time),
-                                )
-                            except RuntimeError:
-                                print(
-                                    f"{Color.red}Discord seems to be closed, will attempt to reconnect!{Color.reset}"
-                                )
-                                discord_reconnect_attempt(rpc=rpc)
-                            time.sleep(10)
-
-                case "InLobby":
-                    # Handled by lcu_process thread
-                    # It will subscribe to websockets and update discord on events.
-
-                    time.sleep(10)
-
-                case _:
-                    print(
-                        f"{Color.red}LeagueOfLegends.exe was terminated. rpc shuting down..{Color.reset}."
-                    )
-                    rpc.close()
-                    sys.exit()
-        except pypresence.exceptions.PipeClosed:
-            # If the program crashes because pypresence failed to connect to a pipe. (Typically if Discord is closed.)
-            # The script will automatically try to reconnect..
-            # if it fails it will keep going until you either reconnect or after a long enough period of time has passed
-            print(
-                f"{Color.red}Discord seems to be closed, will attempt to reconnect!{Color.reset}"
+        if cli_args.daemon:
+            # The LCU connector leaves the closed state as soon as the client is back.
+            while gameflow.state == ClientState.CLOSED:
+                await gameflow.wait()
+
+        # Returns once the League client is closed.
+        await watch_league_processes(gameflow=gameflow)
+
+        print(
+            f"{Color.dgray}Time spent: "
+            + ", ".join(
+                f"{state} {duration / 60:.0f}m"
+                for state, duration in gameflow.durations.items()
+                if state != ClientState.CLOSED
             )
-            discord_reconnect_attempt(rpc=rpc, amount_of_tries=12, amount_of_waiting=5)
+            + Color.reset
+        )
+        if not cli_args.daemon:
+            break
 
+        # Stay resident: Discord stays connected and the caches stay warm for the next session.
+        rpc_updater.snapshot.flush()
+        module_data.rank_timeline.flush()
+        presence.clear()
+        print(
+            f"{Color.yellow}League was closed. LeagueRPC keeps running in the background, and will show your presence again once League starts.{Color.reset}"
+        )
+
+    print(
+        f"{Color.red}LeagueOfLegends.exe was terminated. rpc shuting down..{Color.reset}."
+    )
+    for task in background_tasks:
+        task.cancel()
+    rpc_updater.snapshot.flush()
+    module_data.rank_timeline.flush()
+    if recorder is not None:
+        recorder.history.close()
+    await presence.close()
+    if metrics_server is not None:
+        await metrics_server.stop()
 
-if __name__ == "__main__":
-    # Patch for asyncio - read more here: https://pypi.org/project/nest-asyncio/
-    nest_asyncio.apply()  # type: ignore
 
+if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Script with Discord RPC.")
     parser.add_argument(
         "--client-id",
@@ -238,7 +452,7 @@ if __name__ == "__main__":
         "--add-process",
         nargs="+",
         default=[],
-        help="Add custom Discord process names to the search list.",
+        help="Deprecated and ignored. Discord is found by its IPC socket, whatever its process is named.",
     )
     parser.add_argument(
         "--wait-for-league",
@@ -259,6 +473,61 @@ if __name__ == "__main__":
         help=f"Path to the League of Legends client executable. Default path is: {DEFAULT_LEAGUE_CLIENT_EXE_PATH}",
     )
 
+    parser.add_argument(
+        "--rates",
+        type=str,
+        nargs="+",
+        default=[],
+        metavar="[MODE=]RATES",
+        help="Show per-minute rates next to the InGame stats: cs (CS/min), gold (gold/min) and kda (KDA ratio). E.g. '--rates cs,kda ARAM=kda,gold' picks the rates of every game mode, and of ARAM.",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="use '--no-history' to not record your finished games in the local match history",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running when League is closed, and show the presence again as soon as League starts. Waits for League and Discord indefinitely.",
+    )
+
+    parser.add_argument(
+        "--record-events",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Record every League Client API event to a compressed file, for replaying it with league_rpc.lcu_api.event_replay.",
+    )
+    parser.add_argument(
+        "--record-game",
+        type=str,
+        default=None,
+        metavar="DIRECTORY",
+        help="Record the gold, level, creep score and KDA of every game over time, to one compact file per game in the directory.",
+    )
+    parser.add_argument(
+        "--record-game-rate",
+        type=float,
+        default=1.0,
+        metavar="HZ",
+        help="Samples per second recorded by --record-game. Default is 1.",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Write timing spans of HTTP requests, LCU handlers and presence updates to a Chrome trace file, to open in Perfetto.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="Serve Prometheus metrics (request latencies, presence updates, reconnects, memory, CPU) at http://127.0.0.1:PORT/metrics.",
+    )
+
     args: argparse.Namespace = parser.parse_args()
 
     # Prints the League RPC logo
@@ -278,7 +547,7 @@ if __name__ == "__main__":
         )
     if args.add_process:
         print(
-            f"{Color.green}Argument {Color.blue}--add-process{Color.green} detected.. Will add {Color.blue}{args.add_process}{Color.green} to the list of Discord processes to look for.{Color.reset}"
+            f"{Color.orange}Argument {Color.blue}--add-process{Color.orange} is no longer needed, and is ignored. Discord is now found by its IPC socket, whatever its process is named.{Color.reset}"
         )
 
     if args.client_id != DEFAULT_CLIENT_ID:
@@ -294,6 +563,55 @@ if __name__ == "__main__":
             f"{Color.green}Argument {Color.blue}--wait-for-discord{Color.green} detected.. {Color.blue}will wait for Discord to start before continuing{Color.reset}"
         )
 
+    try:
+        args.rates = parse_rates(args.rates)
+    except ValueError as exc:
+        parser.error(f"--rates: {exc}")
+    if args.rates:
+        print(
+            f"{Color.green}Argument {Color.blue}--rates{Color.green} detected.. Will show per-minute rates next to your InGame stats{Color.reset}"
+        )
+        if args.no_stats:
+            print(
+                f"{Color.orange}--rates is ignored, because --no-stats hides the InGame stats.{Color.reset}"
+            )
+
+    if args.no_history:
+        print(
+            f"{Color.green}Argument {Color.blue}--no-history{Color.green} detected.. Will {Color.red}not {Color.green}record your games in the match history{Color.reset}"
+        )
+    if args.daemon:
+        print(
+            f"{Color.green}Argument {Color.blue}--daemon{Color.green} detected.. Will keep running when League is closed, and wait for it to start again.{Color.reset}"
+        )
+        # Timeouts would end the daemon, so wait for as long as it takes.
+        args.wait_for_league = args.wait_for_discord = -1
+
+    if args.record_events:
+        print(
+            f"{Color.green}Argument {Color.blue}--record-events{Color.green} detected.. Will record League Client events to {Color.blue}{args.record_events}{Color.reset}"
+        )
+
+    if args.record_game:
+        if args.record_game_rate <= 0:
+            parser.error("--record-game-rate must be greater than 0")
+        print(
+            f"{Color.green}Argument {Color.blue}--record-game{Color.green} detected.. Will record your games to {Color.blue}{args.record_game}{Color.green} ({args.record_game_rate:g} samples per second){Color.reset}"
+        )
+
+    if args.trace:
+        print(
+            f"{Color.green}Argument {Color.blue}--trace{Color.green} detected.. Will write a trace to {Color.blue}{args.trace}{Color.green} on exit{Color.reset}"
+        )
+        tracer.start(path=args.trace)
+        # Also written when leagueRPC is stopped with CTRL + C.
+        atexit.register(tracer.save)
+
+    if args.metrics_port:
+        print(
+            f"{Color.green}Argument {Color.blue}--metrics-port{Color.green} detected.. Will serve metrics on port {Color.blue}{args.metrics_port}{Color.reset}"
+        )
+
     if args.launch_league:
         if args.launch_league == DEFAULT_LEAGUE_CLIENT_EXE_PATH:
             print(
@@ -307,4 +625,4 @@ if __name__ == "__main__":
                 f"{Color.orange}If league is already running, it will not launch a new instance.{Color.reset}\n"
             )
 
-    main(cli_args=args)
+    asyncio.run(main(cli_args=args))
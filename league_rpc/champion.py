@@ -16,7 +16,9 @@ from league_rpc.utils.const import (
     GAME_MODE_CONVERT_MAP,
     MERAKIANALYTICS_CHAMPION_DATA,
 )
-from league_rpc.utils.polling import wait_until_exists
+from league_rpc.utils.metrics import SOURCE_CDN, SOURCE_LIVE_CLIENT, host_label
+from league_rpc.utils.polling import timed_request, wait_until_exists
+from league_rpc.utils.tracing import traced
 
 urllib3.disable_warnings()
 
@@ -25,15 +27,15 @@ def get_specific_champion_data(name: str, locale: str) -> dict[str, Any]:
     """
     Get the specific champion data for the champion name.
     """
-    response: requests.Response = requests.get(
-        url=DDRAGON_CHAMPION_DATA.format_map(
-            {
-                "version": get_latest_version(),
-                "name": name,
-                "locale": locale,
-            }
-        ),
-        timeout=15,
+    url: str = DDRAGON_CHAMPION_DATA.format_map(
+        {
+            "version": get_latest_version(),
+            "name": name,
+            "locale": locale,
+        }
+    )
+    response: requests.Response = timed_request(
+        "GET", url, source=SOURCE_CDN, endpoint=host_label(url), timeout=15
     )
     return response.json()
 
@@ -47,13 +49,13 @@ def get_specific_chroma_data(name: str, locale: str) -> dict[str, Any]:
             "locale": locale.replace("_", "-"),
         }
     )
-    response: requests.Response = requests.get(
-        url=url,
-        timeout=15,
+    response: requests.Response = timed_request(
+        "GET", url, source=SOURCE_CDN, endpoint=host_label(url), timeout=15
     )
     return response.json()[name]
 
 
+@traced(category=SOURCE_LIVE_CLIENT)
 def gather_ingame_information() -> tuple[str, str, str, int, str, int, int]:
     """
     Get the current playing champion name.
@@ -74,11 +76,17 @@ def gather_ingame_information() -> tuple[str, str, str, int, str, int, int]:
         url=ALL_GAME_DATA_URL,
         custom_message="Did not find game data.. Will try again in 5 seconds",
     ):
-        parsed_data = response.json()
+        parsed_data: dict[str, Any] = response.json()
         game_mode = GAME_MODE_CONVERT_MAP.get(
             parsed_data["gameData"]["gameMode"],
             parsed_data["gameData"]["gameMode"],
         )
+        # Only the own player is needed. Drop the rest of allgamedata (every player, every event
+        # of the game) before the slow CDN lookups, instead of keeping it alive during them.
+        player: Optional[dict[str, Any]] = find_player(
+            players=parsed_data["allPlayers"], riot_id=your_summoner_name
+        )
+        del response, parsed_data
 
         if game_mode == "TFT":
             # If the currentGame is TFT.. gather the relevant information
@@ -86,7 +94,7 @@ def gather_ingame_information() -> tuple[str, str, str, int, str, int, int]:
         else:
             # If the gamemode is LEAGUE gather the relevant information.
             champion_name, skin_id, skin_name, chroma_name = gather_league_data(
-                parsed_data=parsed_data, summoners_name=your_summoner_name
+                player=player
             )
             if game_mode == "Arena":
                 level, gold = get_level(), get_gold()
@@ -121,9 +129,20 @@ def gather_ingame_information() -> tuple[str, str, str, int, str, int, int]:
     )
 
 
+def find_player(
+    players: list[dict[str, Any]], riot_id: str
+) -> Optional[dict[str, Any]]:
+    """
+    Returns the entry of the player with the given riot id, from the allPlayers of allgamedata.
+    """
+    for player in players:
+        if player["riotId"] == riot_id:
+            return player
+    return None
+
+
 def gather_league_data(
-    parsed_data: dict[str, Any],
-    summoners_name: str,
+    player: Optional[dict[str, Any]],
 ) -> tuple[Optional[str], int, Optional[str], Optional[str]]:
     """
     If the gamemode is LEAGUE, gather the relevant information and return it to RPC.
@@ -137,45 +156,42 @@ def gather_league_data(
         league_processes=["LeagueClient.exe", "LeagueClientUx.exe"]
     )
 
-    for player in parsed_data["allPlayers"]:
-        if player["riotId"] == summoners_name:
-            raw_champion_name: str = player["rawChampionName"].split("_")[-1]
-            champion_data: dict[str, Any] = get_specific_champion_data(
+    if player:
+        raw_champion_name: str = player["rawChampionName"].split("_")[-1]
+        champion_data: dict[str, Any] = get_specific_champion_data(
+            name=raw_champion_name,
+            locale=locale,
+        )
+        champion_name = champion_data["data"][raw_champion_name]["id"]
+        skin_name = player.get("skinName", None)
+        skin_id = player.get("skinID", None)
+
+        if skin_name:
+            base_skin_id = [
+                x["num"]
+                for x in champion_data["data"][raw_champion_name]["skins"]
+                if x["name"] == skin_name
+            ][0]
+        if skin_id != base_skin_id:
+            # Chroma detected: Get the name of the chroma:
+            chroma_data = get_specific_chroma_data(
                 name=raw_champion_name,
-                locale=locale,
+                locale="en-US",
             )
-            champion_name = champion_data["data"][raw_champion_name]["id"]
-            skin_name = player.get("skinName", None)
-            skin_id = player.get("skinID", None)
-
-            if skin_name:
-                base_skin_id = [
-                    x["num"]
-                    for x in champion_data["data"][raw_champion_name]["skins"]
-                    if x["name"] == skin_name
-                ][0]
-            if skin_id != base_skin_id:
-                # Chroma detected: Get the name of the chroma:
-                chroma_data = get_specific_chroma_data(
-                    name=raw_champion_name,
-                    locale="en-US",
-                )
-                _skin_data: dict[str, Any] = [
-                    x
-                    for x in chroma_data["skins"]
-                    if str(x["id"]).endswith(str(base_skin_id))
-                ][0]
-                chroma_name = [
-                    x["name"]
-                    for x in _skin_data["chromas"]
-                    if str(x["id"]).endswith(str(skin_id))
-                ][0]
-
-            break
-        continue
+            _skin_data: dict[str, Any] = [
+                x
+                for x in chroma_data["skins"]
+                if str(x["id"]).endswith(str(base_skin_id))
+            ][0]
+            chroma_name = [
+                x["name"]
+                for x in _skin_data["chromas"]
+                if str(x["id"]).endswith(str(skin_id))
+            ][0]
     return champion_name, base_skin_id, skin_name, chroma_name
 
 
+@traced(category=SOURCE_CDN)
 def get_skin_asset(
     champion_name: str,
     skin_id: int,
@@ -203,4 +219,7 @@ def check_url(url: str) -> bool:
     returns a boolean value depending on if the request,
     was successful (200 OK) or not.
     """
-    return requests.head(url=url, timeout=15).status_code == HTTPStatus.OK
+    response: requests.Response = timed_request(
+        "HEAD", url, source=SOURCE_CDN, endpoint=host_label(url), timeout=15
+    )
+    return response.status_code == HTTPStatus.OK
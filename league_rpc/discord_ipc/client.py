@@ -0,0 +1,241 @@
+"""
+A small asyncio client for Discord's local RPC (IPC) protocol.
+Every call takes a deadline, so a hanging Discord can never block the caller for longer than that.
+"""
+
+import asyncio
+import json
+import os
+import struct
+import sys
+import uuid
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from league_rpc.discord_ipc.discovery import get_discord_ipc_paths
+from league_rpc.utils.const import DISCORD_IPC_CALL_TIMEOUT
+
+# Opcodes of the IPC framing: every frame is <opcode: u32 little endian><length: u32 little endian><json>.
+OP_HANDSHAKE = 0
+OP_FRAME = 1
+OP_CLOSE = 2
+OP_PING = 3
+OP_PONG = 4
+
+HEADER = struct.Struct("<II")
+IPC_VERSION = 1
+INVALID_CLIENT_ID_CODE = 4000
+
+
+class DiscordIpcError(Exception):
+    """Raised when a call to Discord's IPC failed."""
+
+
+class DiscordIpcClosed(DiscordIpcError):
+    """The connection to Discord is closed, and has to be reconnected."""
+
+
+class DiscordIpcNotFound(DiscordIpcClosed):
+    """No Discord IPC endpoint could be connected to."""
+
+
+class DiscordIpcTimeout(DiscordIpcClosed):
+    """Discord did not answer before the deadline. The connection is closed, as it can't be trusted anymore."""
+
+
+class DiscordIpcInvalidClientId(DiscordIpcError):
+    """Discord rejected the client id in the handshake."""
+
+
+def build_activity(
+    state: Optional[str] = None,
+    details: Optional[str] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    large_image: Optional[str] = None,
+    large_text: Optional[str] = None,
+    small_image: Optional[str] = None,
+    small_text: Optional[str] = None,
+    buttons: Optional[list[dict[str, str]]] = None,
+) -> dict[str, Any]:
+    """
+    Builds the activity object of a SET_ACTIVITY command, from the same keyword arguments as pypresence's Presence.update.
+    Empty values are left out, as Discord rejects null fields.
+    """
+    activity: dict[str, Any] = {
+        "state": state,
+        "details": details,
+        "timestamps": {
+            "start": int(start) if start else None,
+            "end": int(end) if end else None,
+        },
+        "assets": {
+            "large_image": large_image,
+            "large_text": large_text,
+            "small_image": small_image,
+            "small_text": small_text,
+        },
+        "buttons": buttons,
+    }
+    for key in ("timestamps", "assets"):
+        activity[key] = {k: v for k, v in activity[key].items() if v is not None}
+    return {k: v for k, v in activity.items() if v}
+
+
+@dataclass
+class DiscordIpcClient:
+    """One connection to a Discord IPC endpoint. Calls must not run concurrently on the same client."""
+
+    client_id: str
+    # Connect to this endpoint only, instead of the first one that accepts the connection.
+    path: Optional[str] = None
+    timeout: float = DISCORD_IPC_CALL_TIMEOUT
+    connected_path: Optional[str] = None
+
+    _reader: Optional[asyncio.StreamReader] = None
+    _writer: Optional[Any] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the connection is open, and Discord did not close its end of it."""
+        return self.connected and not self._reader.at_eof()  # type: ignore
+
+    async def connect(self, timeout: Optional[float] = None) -> None:
+        """Opens the connection and performs the handshake."""
+        await self.close()
+        paths: list[str] = [self.path] if self.path else get_discord_ipc_paths()
+        try:
+            await asyncio.wait_for(self._connect(paths), timeout or self.timeout)
+        except asyncio.TimeoutError as exc:
+            await self.close()
+            raise DiscordIpcTimeout(
+                "Discord did not complete the handshake in time"
+            ) from exc
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _connect(self, paths: list[str]) -> None:
+        for path in paths:
+            try:
+                self._reader, self._writer = await self._open(path)
+            except OSError:
+                continue
+            self.connected_path = path
+            break
+        else:
+            raise DiscordIpcNotFound("Could not find a running Discord to connect to")
+
+        self._send(OP_HANDSHAKE, {"v": IPC_VERSION, "client_id": self.client_id})
+        opcode, payload = await self._read()
+        if opcode == OP_CLOSE:
+            if payload.get("code") == INVALID_CLIENT_ID_CODE:
+                raise DiscordIpcInvalidClientId(payload.get("message", ""))
+            raise DiscordIpcClosed(payload.get("message", "Handshake was refused"))
+
+    @staticmethod
+    async def _open(path: str) -> tuple[asyncio.StreamReader, Any]:
+        if sys.platform == "win32":
+            loop = asyncio.get_running_loop()
+            reader = asyncio.StreamReader()
+            protocol = asyncio.StreamReaderProtocol(reader)
+            transport, _ = await loop.create_pipe_connection(lambda: protocol, path)  # type: ignore
+            return reader, transport
+        return await asyncio.open_unix_connection(path)
+
+    async def set_activity(
+        self, activity: Optional[dict[str, Any]], timeout: Optional[float] = None
+    ) -> dict[str, Any]:
+        """Sets (or clears, with None) the activity, and returns Discord's response."""
+        return await self.command(
+            cmd="SET_ACTIVITY",
+            args={"pid": os.getpid(), "activity": activity},
+            timeout=timeout,
+        )
+
+    async def command(
+        self, cmd: str, args: dict[str, Any], timeout: Optional[float] = None
+    ) -> dict[str, Any]:
+        """Sends a command frame and waits for the response with the same nonce."""
+        if not self.connected:
+            raise DiscordIpcClosed("Not connected to Discord")
+        nonce: str = uuid.uuid4().hex
+        try:
+            return await asyncio.wait_for(
+                self._command(cmd=cmd, args=args, nonce=nonce),
+                timeout or self.timeout,
+            )
+        except asyncio.TimeoutError as exc:
+            await self.close()
+            raise DiscordIpcTimeout(f"Discord did not answer {cmd} in time") from exc
+        except DiscordIpcError:
+            raise
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _command(
+        self, cmd: str, args: dict[str, Any], nonce: str
+    ) -> dict[str, Any]:
+        self._send(OP_FRAME, {"cmd": cmd, "args": args, "nonce": nonce})
+        await self._writer_drain()
+        while True:
+            opcode, payload = await self._read()
+            if opcode == OP_PING:
+                self._send(OP_PONG, payload)
+                continue
+            if opcode == OP_CLOSE:
+                await self.close()
+                raise DiscordIpcClosed(
+                    payload.get("message", "Discord closed the connection")
+                )
+            if payload.get("nonce") != nonce:
+                # A response to an earlier, abandoned call, or an event we did not subscribe to.
+                continue
+            if payload.get("evt") == "ERROR":
+                raise DiscordIpcError(
+                    payload.get("data", {}).get("message", "Unknown error")
+                )
+            return payload
+
+    async def close(self) -> None:
+        """Closes the connection, if it's open."""
+        writer, self._writer, self._reader = self._writer, None, None
+        self.connected_path = None
+        if writer is None:
+            return
+        try:
+            writer.close()
+        except OSError:
+            pass
+
+    def _send(self, opcode: int, payload: dict[str, Any]) -> None:
+        data: bytes = json.dumps(payload).encode("utf-8")
+        self._writer.write(HEADER.pack(opcode, len(data)) + data)  # type: ignore
+
+    async def _writer_drain(self) -> None:
+        # Pipe transports on Windows have no drain(); their writes are buffered by the transport.
+        if isinstance(self._writer, asyncio.StreamWriter):
+            try:
+                await self._writer.drain()
+            except (ConnectionError, OSError) as exc:
+                await self.close()
+                raise DiscordIpcClosed(str(exc)) from exc
+
+    async def _read(self) -> tuple[int, dict[str, Any]]:
+        try:
+            header: bytes = await self._reader.readexactly(HEADER.size)  # type: ignore
+            opcode, length = HEADER.unpack(header)
+            data: bytes = await self._reader.readexactly(length)  # type: ignore
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as exc:
+            await self.close()
+            raise DiscordIpcClosed("Discord closed the connection") from exc
+        try:
+            return opcode, json.loads(data)
+        except ValueError as exc:
+            await self.close()
+            raise DiscordIpcClosed("Discord sent a malformed frame") from exc
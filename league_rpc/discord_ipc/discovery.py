@@ -0,0 +1,165 @@
+"""
+Holds functions to locate Discord's local IPC endpoint, and to check if it is accepting connections.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+from typing import Optional
+
+DISCORD_IPC_NAME = "discord-ipc-{index}"
+DISCORD_IPC_MAX_INDEX = 10
+
+# Sandboxed Discord installs create their socket in a sub directory of the runtime dir.
+FLATPAK_DISCORD_APP_IDS: list[str] = [
+    "com.discordapp.Discord",
+    "com.discordapp.DiscordPTB",
+    "com.discordapp.DiscordCanary",
+]
+SNAP_DISCORD_NAMES: list[str] = ["discord", "discord-ptb", "discord-canary"]
+
+
+def get_discord_ipc_dir() -> str:
+    """
+    Returns the directory a regular (not sandboxed) Discord creates its unix socket in.
+    """
+    return (
+        os.environ.get("XDG_RUNTIME_DIR")
+        or os.environ.get("TMPDIR")
+        or os.environ.get("TMP")
+        or os.environ.get("TEMP")
+        or tempfile.gettempdir()
+    )
+
+
+def get_discord_ipc_dirs() -> list[str]:
+    """
+    Returns every directory a Discord socket can be in, regular installs first, then Flatpak and Snap installs.
+    """
+    runtime_dirs: list[str] = [
+        path
+        for path in (
+            os.environ.get("XDG_RUNTIME_DIR"),
+            os.environ.get("TMPDIR"),
+            os.environ.get("TMP"),
+            os.environ.get("TEMP"),
+            tempfile.gettempdir(),
+            "/tmp",
+        )
+        if path
+    ]
+    sandbox_dirs: list[str] = [
+        os.path.join(runtime_dir, "app", app_id)
+        for runtime_dir in runtime_dirs
+        for app_id in FLATPAK_DISCORD_APP_IDS
+    ] + [
+        os.path.join(runtime_dir, f"snap.{snap_name}")
+        for runtime_dir in runtime_dirs
+        for snap_name in SNAP_DISCORD_NAMES
+    ]
+    # The same directory can be given twice, for example with TMPDIR=/tmp/ or through a symlink.
+    # dict.fromkeys drops the duplicates, while keeping the order.
+    return list(
+        dict.fromkeys(os.path.realpath(path) for path in runtime_dirs + sandbox_dirs)
+    )
+
+
+def get_discord_ipc_paths() -> list[str]:
+    """
+    Returns every path Discord is possibly listening on, in order of preference.
+    On Windows these are named pipes, everywhere else these are the discord-ipc-N sockets that exist,
+    found by scanning the runtime and temp directories, including the ones of Flatpak and Snap installs.
+    """
+    if sys.platform == "win32":
+        return [
+            rf"\\?\pipe\{DISCORD_IPC_NAME.format(index=index)}"
+            for index in range(DISCORD_IPC_MAX_INDEX)
+        ]
+
+    names: list[str] = [
+        DISCORD_IPC_NAME.format(index=index) for index in range(DISCORD_IPC_MAX_INDEX)
+    ]
+    paths: list[str] = []
+    # A sandboxed Discord's socket is often symlinked into the runtime dir. Both paths lead to the same Discord,
+    # which must only be connected to once, so sockets are told apart by their device and inode.
+    sockets: set[tuple[int, int]] = set()
+    for directory in get_discord_ipc_dirs():
+        try:
+            entries: set[str] = set(os.listdir(directory))
+        except OSError:
+            continue
+        for name in names:
+            if name not in entries:
+                continue
+            path: str = os.path.join(directory, name)
+            try:
+                stat: os.stat_result = os.stat(path)
+            except OSError:
+                # A dangling symlink, or a socket that was just removed.
+                continue
+            if (stat.st_dev, stat.st_ino) in sockets:
+                continue
+            sockets.add((stat.st_dev, stat.st_ino))
+            paths.append(path)
+    return paths
+
+
+def get_accepting_discord_ipc_paths() -> list[str]:
+    """
+    Returns the Discord IPC paths that accept a connection right now. Stale sockets of a crashed Discord are left out.
+    """
+    return [path for path in get_discord_ipc_paths() if ipc_accepting(path)]
+
+
+def ipc_accepting(path: str, timeout: float = 0.5) -> bool:
+    """
+    Checks if the given IPC path accepts a connection.
+    Named pipes can only be checked for existence without consuming a pipe instance.
+    """
+    if sys.platform == "win32":
+        return os.path.exists(path)
+
+    if not os.path.exists(path):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def discord_ipc_ready() -> bool:
+    """
+    Returns True if any Discord IPC endpoint is accepting connections.
+    """
+    return any(ipc_accepting(path) for path in get_discord_ipc_paths())
+
+
+async def async_ipc_accepting(path: str, timeout: float = 0.5) -> bool:
+    """
+    Same as ipc_accepting, without blocking the event loop.
+    """
+    if sys.platform == "win32" or not os.path.exists(path):
+        return os.path.exists(path)
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_unix_connection(path), timeout=timeout
+        )
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def async_discord_ipc_ready(paths: Optional[list[str]] = None) -> bool:
+    """
+    Returns True if any of the given Discord IPC endpoints (all of them by default) is accepting connections.
+    """
+    for path in paths or get_discord_ipc_paths():
+        if await async_ipc_accepting(path):
+            return True
+    return False
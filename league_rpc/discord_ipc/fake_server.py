@@ -0,0 +1,408 @@
+"""
+A local stand-in for Discord's IPC server, to exercise the presence code without a real Discord.
+It listens on a discord-ipc-N socket, answers the handshake and SET_ACTIVITY commands like Discord does,
+and records every payload it receives. Latency, errors, disconnects and rate limiting can be injected.
+
+Usage:
+    python -m league_rpc.discord_ipc.fake_server [--latency 0.2] [--error-rate 0.1] [--disconnect-rate 0.05]
+                                                 [--rate-limit 5] [--record payloads.jsonl]
+    python -m league_rpc.discord_ipc.fake_server --bench 500
+
+    Without --bench it serves until CTRL + C, and then prints its counters. LeagueRPC started in the same
+    session will connect to it, as long as no real Discord took a lower discord-ipc-N index.
+    With --bench it measures the SET_ACTIVITY throughput of the IPC client, and how long the PresenceWriter
+    takes to deliver a presence again after the server was restarted.
+
+    Only unix sockets are supported, so this does not run on Windows.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+from league_rpc.discord_ipc.client import (
+    HEADER,
+    INVALID_CLIENT_ID_CODE,
+    OP_CLOSE,
+    OP_FRAME,
+    OP_HANDSHAKE,
+    OP_PING,
+    OP_PONG,
+    DiscordIpcClient,
+    build_activity,
+)
+from league_rpc.discord_ipc.discovery import (
+    DISCORD_IPC_MAX_INDEX,
+    DISCORD_IPC_NAME,
+    get_discord_ipc_dir,
+    ipc_accepting,
+)
+from league_rpc.models.presence_writer import (
+    PRESENCE_EVENT_SENT,
+    PresenceEvent,
+    PresenceWriter,
+)
+from league_rpc.utils.color import Color
+
+RATE_LIMITED_MESSAGE = "You are being rate limited."
+INJECTED_ERROR_MESSAGE = "Injected error"
+
+
+@dataclass
+class FakeDiscordCounters:
+    """Counts what the fake server received and did."""
+
+    connections: int = 0
+    handshakes: int = 0
+    commands: int = 0
+    activities: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    disconnects: int = 0
+    pings: int = 0
+
+
+@dataclass
+class FakeDiscordServer:
+    """A fake Discord IPC server. Every injection rate is a probability between 0 and 1, per command."""
+
+    # Defaults to the first discord-ipc-N path that nothing is listening on.
+    path: Optional[str] = None
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    disconnect_rate: float = 0.0
+    # Amount of SET_ACTIVITY commands accepted per rate_period. 0 disables rate limiting.
+    rate_limit: int = 0
+    rate_period: float = 20.0
+    reject_client_id: bool = False
+    record_path: Optional[str] = None
+    seed: Optional[int] = None
+
+    counters: FakeDiscordCounters = field(default_factory=FakeDiscordCounters)
+    payloads: list[dict[str, Any]] = field(default_factory=list)
+
+    _server: Optional[asyncio.AbstractServer] = None
+    _writers: set[asyncio.StreamWriter] = field(default_factory=set)
+    _handlers: set[asyncio.Task[None]] = field(default_factory=set)
+    _activity_times: deque[float] = field(default_factory=deque)
+    _random: random.Random = field(default_factory=random.Random)
+
+    async def start(self) -> None:
+        """Starts listening. Stale sockets on the path are removed first."""
+        if self.seed is not None:
+            self._random.seed(self.seed)
+        if self.path is None:
+            self.path = next(
+                path
+                for path in (
+                    os.path.join(
+                        get_discord_ipc_dir(), DISCORD_IPC_NAME.format(index=index)
+                    )
+                    for index in range(DISCORD_IPC_MAX_INDEX)
+                )
+                if not ipc_accepting(path)
+            )
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+
+    async def stop(self) -> None:
+        """Stops listening, drops every connection and removes the socket, like a Discord that was closed."""
+        await self.disconnect_all()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def disconnect_all(self) -> None:
+        """Drops every open connection, while still accepting new ones."""
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+        # The handlers return as soon as they notice their connection is closed.
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.counters.connections += 1
+        self._writers.add(writer)
+        handler: asyncio.Task[None] = asyncio.current_task()  # type: ignore
+        self._handlers.add(handler)
+        try:
+            while True:
+                try:
+                    opcode, length = HEADER.unpack(
+                        await reader.readexactly(HEADER.size)
+                    )
+                    payload: dict[str, Any] = json.loads(
+                        await reader.readexactly(length)
+                    )
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                    return
+                if not await self._respond(opcode, payload, writer):
+                    return
+        finally:
+            self._writers.discard(writer)
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _respond(
+        self, opcode: int, payload: dict[str, Any], writer: asyncio.StreamWriter
+    ) -> bool:
+        """Answers one frame. Returns whether the connection stays open."""
+        if opcode == OP_HANDSHAKE:
+            self.counters.handshakes += 1
+            if self.reject_client_id:
+                self._send(
+                    writer,
+                    OP_CLOSE,
+                    {"code": INVALID_CLIENT_ID_CODE, "message": "Invalid Client ID"},
+                )
+                return False
+            self._send(
+                writer,
+                OP_FRAME,
+                {"cmd": "DISPATCH", "evt": "READY", "data": {"v": 1}, "nonce": None},
+            )
+            return True
+        if opcode == OP_PING:
+            self.counters.pings += 1
+            self._send(writer, OP_PONG, payload)
+            return True
+        if opcode == OP_CLOSE:
+            return False
+        if opcode != OP_FRAME:
+            return True
+
+        self.counters.commands += 1
+        self._record(payload)
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+        if self._random.random() < self.disconnect_rate:
+            self.counters.disconnects += 1
+            return False
+        if self._random.random() < self.error_rate:
+            self.counters.errors += 1
+            self._send_error(writer, payload, INJECTED_ERROR_MESSAGE)
+            return True
+        if payload.get("cmd") == "SET_ACTIVITY":
+            if self._rate_limited():
+                self.counters.rate_limited += 1
+                self._send_error(writer, payload, RATE_LIMITED_MESSAGE)
+                return True
+            self.counters.activities += 1
+
+        self._send(
+            writer,
+            OP_FRAME,
+            {
+                "cmd": payload.get("cmd"),
+                "evt": None,
+                "data": payload.get("args", {}).get("activity"),
+                "nonce": payload.get("nonce"),
+            },
+        )
+        return True
+
+    def _rate_limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now: float = time.monotonic()
+        while self._activity_times and now - self._activity_times[0] > self.rate_period:
+            self._activity_times.popleft()
+        if len(self._activity_times) >= self.rate_limit:
+            return True
+        self._activity_times.append(now)
+        return False
+
+    def _record(self, payload: dict[str, Any]) -> None:
+        self.payloads.append(payload)
+        if self.record_path:
+            with open(self.record_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps({"t": time.time(), **payload}) + "\n")
+
+    def _send_error(
+        self, writer: asyncio.StreamWriter, payload: dict[str, Any], message: str
+    ) -> None:
+        self._send(
+            writer,
+            OP_FRAME,
+            {
+                "cmd": payload.get("cmd"),
+                "evt": "ERROR",
+                "data": {"code": 4000, "message": message},
+                "nonce": payload.get("nonce"),
+            },
+        )
+
+    @staticmethod
+    def _send(
+        writer: asyncio.StreamWriter, opcode: int, payload: dict[str, Any]
+    ) -> None:
+        data: bytes = json.dumps(payload).encode("utf-8")
+        writer.write(HEADER.pack(opcode, len(data)) + data)
+
+    def print_counters(self) -> None:
+        print(f"\n{Color.cyan}Fake Discord counters{Color.reset}")
+        for name, value in asdict(self.counters).items():
+            print(f"  {name:<14} {value}")
+
+
+async def benchmark(server: FakeDiscordServer, updates: int) -> None:
+    """Measures the update throughput of the IPC client, and the reconnect time of the PresenceWriter."""
+    client = DiscordIpcClient(client_id="0", path=server.path)
+    await client.connect()
+    latencies: list[float] = []
+    started: float = time.perf_counter()
+    for index in range(updates):
+        call_started: float = time.perf_counter()
+        await client.set_activity(build_activity(state=f"Update {index}"))
+        latencies.append(time.perf_counter() - call_started)
+    duration: float = time.perf_counter() - started
+    await client.close()
+
+    print(f"\n{Color.cyan}Fake Discord benchmark{Color.reset}")
+    print(
+        f"SET_ACTIVITY: {updates} updates in {duration:.2f}s ({updates / duration:.0f}/s), "
+        f"median={statistics.median(latencies) * 1000:.2f}ms max={max(latencies) * 1000:.2f}ms"
+    )
+
+    delivered = asyncio.Event()
+
+    def on_event(event: PresenceEvent) -> None:
+        if event.kind == PRESENCE_EVENT_SENT:
+            delivered.set()
+
+    writer = PresenceWriter(
+        client_id="0", paths=[server.path], listeners=[on_event]  # type: ignore
+    )
+    await writer.connect()
+    writer.update(phase="Before", state="Before the restart")
+    await delivered.wait()
+
+    await server.stop()
+    delivered.clear()
+    writer.update(phase="After", state="After the restart")
+    # Give the writer time to notice that Discord is gone.
+    await asyncio.sleep(1.0)
+    await server.start()
+    restarted: float = time.perf_counter()
+    await delivered.wait()
+    print(
+        f"Presence delivered {(time.perf_counter() - restarted) * 1000:.0f}ms after the server came back"
+    )
+    await writer.close()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = FakeDiscordServer(
+        path=args.path,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        disconnect_rate=args.disconnect_rate,
+        rate_limit=args.rate_limit,
+        rate_period=args.rate_period,
+        reject_client_id=args.invalid_client_id,
+        record_path=args.record,
+        seed=args.seed,
+    )
+    await server.start()
+    print(
+        f"{Color.green}Fake Discord listening on {Color.blue}{server.path}{Color.reset}"
+    )
+    try:
+        if args.bench:
+            await benchmark(server=server, updates=args.bench)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        server.print_counters()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run a fake Discord IPC server, for testing the presence without Discord."
+    )
+    parser.add_argument(
+        "--path",
+        default=None,
+        help="Socket path. Defaults to the first free discord-ipc-N in $XDG_RUNTIME_DIR.",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds to wait before answering."
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Up to this many extra seconds of random latency.",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Probability that a command is answered with an error.",
+    )
+    parser.add_argument(
+        "--disconnect-rate",
+        type=float,
+        default=0.0,
+        help="Probability that a command closes the connection instead.",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=0,
+        help="SET_ACTIVITY commands accepted per --rate-period. Discord accepts 5 per 20 seconds. 0 is unlimited.",
+    )
+    parser.add_argument(
+        "--rate-period",
+        type=float,
+        default=20.0,
+        help="Length of the rate limit window in seconds.",
+    )
+    parser.add_argument(
+        "--invalid-client-id",
+        action="store_true",
+        help="Reject every handshake, like Discord does for an unknown client id.",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        metavar="FILE",
+        help="Append every received command to this JSON lines file.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed for the injected failures."
+    )
+    parser.add_argument(
+        "--bench",
+        type=int,
+        default=0,
+        metavar="UPDATES",
+        help="Run a benchmark with this many updates, and exit.",
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Any
+
 import urllib3
 from requests import Response
 
@@ -12,41 +14,21 @@ def get_kda() -> str:
     """
     Get the current KDA of your game.
     """
-    response = get_current_user_stats()
-    if isinstance(response, Response):
-        parsed_data = response.json()
-        kills = str(parsed_data["kills"])
-        deaths = str(parsed_data["deaths"])
-        assists = str(parsed_data["assists"])
-
-        return f"{kills}/{deaths}/{assists}"
-    return ""
+    return format_kda(scores=get_player_scores())
 
 
 def get_level() -> int:
     """
     Get the current Level of your game.
     """
-    response = get_current_active_player_stats()
-    if isinstance(response, Response):
-        parsed_data = response.json()
-        level = int(parsed_data["level"])
-
-        return level
-    return 0
+    return int(get_active_player().get("level", 0))
 
 
 def get_gold() -> int:
     """
     Get the current gold of your game.
     """
-    response = get_current_active_player_stats()
-    if isinstance(response, Response):
-        parsed_data = response.json()
-        gold = int(parsed_data["currentGold"])
-
-        return gold
-    return 0
+    return int(get_active_player().get("currentGold", 0))
 
 
 def get_creepscore() -> str:
@@ -54,13 +36,41 @@ def get_creepscore() -> str:
     Get the current creepScore of your live game
     creepScore is updated every 10cs by Riot.
     """
+    return format_creepscore(scores=get_player_scores())
+
+
+def get_player_scores() -> dict[str, Any]:
+    """
+    Get the scores of your live game (kills, deaths, assists, creepScore, wardScore) in a single request.
+    Empty when they could not be found.
+    """
     response = get_current_user_stats()
     if isinstance(response, Response):
-        parsed_data = response.json()
-        creep_score = str(parsed_data["creepScore"])
-        return f"{creep_score}cs"
+        return response.json()
+    return {}
+
+
+def get_active_player() -> dict[str, Any]:
+    """
+    Get the stats of your champion (level, currentGold, ...) in a single request.
+    Empty when they could not be found.
+    """
+    response = get_current_active_player_stats()
+    if isinstance(response, Response):
+        return response.json()
+    return {}
+
+
+def format_kda(scores: dict[str, Any]) -> str:
+    if not scores:
+        return ""
+    return f"{scores['kills']}/{scores['deaths']}/{scores['assists']}"
+
 
-    return ""
+def format_creepscore(scores: dict[str, Any]) -> str:
+    if not scores:
+        return ""
+    return f"{scores['creepScore']}cs"
 
 
 def get_current_user_stats() -> Response | None:
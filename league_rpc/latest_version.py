@@ -1,10 +1,16 @@
-import requests
-
 from league_rpc.utils.const import DDRAGON_API_VERSIONS
+from league_rpc.utils.metrics import SOURCE_CDN, host_label
+from league_rpc.utils.polling import timed_request
 
 
 def get_latest_version() -> str:
-    response = requests.get(url=DDRAGON_API_VERSIONS, timeout=15)
+    response = timed_request(
+        "GET",
+        DDRAGON_API_VERSIONS,
+        source=SOURCE_CDN,
+        endpoint=host_label(DDRAGON_API_VERSIONS),
+        timeout=15,
+    )
 
     data = response.json()
     latest_version = data[0]
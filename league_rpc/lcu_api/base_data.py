@@ -1,36 +1,112 @@
-from typing import Any
+import asyncio
+from http import HTTPStatus
+from typing import Any, Coroutine
 
-from aiohttp import ClientResponse
+from aiohttp import ClientError, ClientResponse
 from lcu_driver.connection import Connection
 
-from league_rpc.models.client_data import ArenaStats, ClientData, RankedStats, TFTStats
-from league_rpc.models.lcu.current_chat_status import LolChatUser
-from league_rpc.models.lcu.current_queue import LolGameQueuesQueue
-from league_rpc.models.lcu.current_summoner import Summoner
-from league_rpc.models.lcu.gameflow_phase import (
-    GameFlowPhase,
-    LolGameflowLobbyStatus,
-    LolGameflowPlayerStatus,
+from league_rpc.lcu_api.client_data_mapping import (
+    CHAT_MAPPING,
+    GAMEFLOW_PHASE_MAPPING,
+    PLAYER_STATUS_MAPPING,
+    QUEUE_LOBBY_CONFIG_MAPPING,
+    QUEUE_MAPPING,
+    RANKED_MAPPING,
+    SUMMONER_MAPPING,
+    TELEMETRY_MAPPING,
+    apply_mapping,
 )
+from league_rpc.models.client_data import ClientData
+from league_rpc.models.lcu.gameflow_phase import GameFlowPhase
 from league_rpc.models.module_data import ModuleData
+from league_rpc.models.queue_catalog import QueueCatalog
+from league_rpc.utils.color import Color
+from league_rpc.utils.const import LCU_READY_TIMEOUT, LCU_REQUEST_TIMEOUT
+from league_rpc.utils.polling import async_wait_for_condition
+from league_rpc.utils.tracing import traced
+
+# Endpoints that must respond before the base data can be gathered.
+LCU_READINESS_ENDPOINTS: tuple[str, ...] = (
+    "/lol-summoner/v1/current-summoner",
+    "/lol-gameflow/v1/gameflow-phase",
+    "/lol-chat/v1/me",
+)
+
+
+async def wait_for_lcu_ready(
+    connection: Connection,
+    timeout: float = LCU_READY_TIMEOUT,
+) -> bool:
+    """
+    Probes the LCU API until every readiness endpoint returns 200,
+    so base data is gathered as soon as the client has loaded.
+    """
+
+    async def endpoints_ready() -> bool:
+        for endpoint in LCU_READINESS_ENDPOINTS:
+            try:
+                response: ClientResponse = await connection.request(
+                    method="GET", endpoint=endpoint
+                )
+            except ClientError:
+                return False
+            if response.status != HTTPStatus.OK:
+                return False
+        return True
+
+    return await async_wait_for_condition(
+        condition=endpoints_ready, timeout=timeout, interval=0.2
+    )
 
 
 # Base Data
 # Gather base data from the LCU API on startup
+@traced(category="lcu")
 async def gather_base_data(connection: Connection, module_data: ModuleData) -> None:
     data: ClientData = module_data.client_data
 
-    # Epoch time from which league client was started.
-    await gather_telemetry_data(connection=connection, data=data)
+    # Queue and map definitions are static for the session, so they are fetched once here.
+    catalog_loaded: asyncio.Future[bool] = asyncio.ensure_future(
+        gather_with_timeout(
+            gather_queue_catalog(
+                connection=connection, catalog=module_data.queue_catalog
+            )
+        )
+    )
 
-    await gather_summoner_data(connection=connection, data=data)
+    # These are independent local requests, so they are issued concurrently.
+    # A failing or slow request only leaves its own fields at their defaults.
+    await asyncio.gather(
+        # Epoch time from which league client was started.
+        gather_with_timeout(gather_telemetry_data(connection=connection, data=data)),
+        gather_with_timeout(gather_summoner_data(connection=connection, data=data)),
+        # get Online/Away status
+        gather_with_timeout(gather_chat_status_data(connection=connection, data=data)),
+        gather_with_timeout(gather_ranked_data(connection=connection, data=data)),
+        gather_gameflow_chain(
+            connection=connection,
+            module_data=module_data,
+            catalog_loaded=catalog_loaded,
+        ),
+        catalog_loaded,
+    )
 
-    # get Online/Away status
-    await gather_chat_status_data(connection=connection, data=data)
 
-    await gather_ranked_data(connection=connection, data=data)
+async def gather_gameflow_chain(
+    connection: Connection,
+    module_data: ModuleData,
+    catalog_loaded: asyncio.Future[bool],
+) -> None:
+    """
+    Gathers the gameflow phase, and then the lobby and queue data that depend on it.
+    Runs alongside the independent requests, so each step starts as soon as its input is known.
+    """
+    data: ClientData = module_data.client_data
 
-    await gather_gameflow_data(connection=connection, data=data)
+    if not await gather_with_timeout(
+        gather_gameflow_data(connection=connection, data=data)
+    ):
+        return
 
     if data.gameflow_phase == GameFlowPhase.IN_PROGRESS:
         # In Game
@@ -40,7 +116,10 @@ async def gather_base_data(connection: Connection, module_data: ModuleData) -> N
         # In Client
         return
 
-    await gather_lobby_data(connection=connection, data=data)
+    if not await gather_with_timeout(
+        gather_lobby_data(connection=connection, data=data)
+    ):
+        return
 
     if data.queue_id == -1:
         # custom game / practice tool / tutorial lobby
@@ -54,22 +133,73 @@ async def gather_base_data(connection: Connection, module_data: ModuleData) -> N
 
         return
 
-    await gather_queue_data(connection=connection, data=data)
+    await catalog_loaded
+    await gather_with_timeout(
+        gather_queue_data(
+            connection=connection, data=data, catalog=module_data.queue_catalog
+        )
+    )
+
+
+async def gather_with_timeout(
+    gatherer: Coroutine[Any, Any, None],
+    timeout: float = LCU_REQUEST_TIMEOUT,
+) -> bool:
+    """
+    Awaits a single gatherer with a deadline.
+    Failures are reported and swallowed, so one bad endpoint doesn't stop the others.
+    Returns whether the gatherer succeeded.
+    """
+    try:
+        await asyncio.wait_for(gatherer, timeout=timeout)
+    except asyncio.TimeoutError:
+        print(
+            f"{Color.orange}{gatherer.__name__} timed out after {timeout} seconds.{Color.reset}"
+        )
+        return False
+    except (ClientError, KeyError, TypeError, ValueError) as exc:
+        print(f"{Color.orange}{gatherer.__name__} failed: {exc!r}{Color.reset}")
+        return False
+    return True
+
+
+async def gather_queue_catalog(connection: Connection, catalog: QueueCatalog) -> None:
+    queues_raw, maps_raw = await asyncio.gather(
+        connection.request(method="GET", endpoint="/lol-game-queues/v1/queues"),
+        connection.request(method="GET", endpoint="/lol-maps/v2/maps"),
+    )
+    catalog.load_queues(queues=await queues_raw.json())
+    catalog.load_maps(maps=await maps_raw.json())
+
+
+async def get_queue_info(
+    connection: Connection, catalog: QueueCatalog, queue_id: int
+) -> dict[str, Any]:
+    """
+    Returns the queue definition from the catalog.
+    Only requests it from the LCU API if the catalog doesn't know the queue, and then remembers it.
+    """
+    if (queue_info := catalog.get_queue(queue_id)) is not None:
+        return queue_info
+
+    queue_info_raw: ClientResponse = await connection.request(
+        method="GET", endpoint="/lol-game-queues/v1/queues/" + str(queue_id)
+    )
+    queue_info = await queue_info_raw.json()
+    catalog.queues[queue_id] = queue_info
+    return queue_info
 
 
-async def gather_queue_data(connection: Connection, data: ClientData) -> None:
-    lobby_queue_info_raw: ClientResponse = await connection.request(
-        method="GET", endpoint="/lol-game-queues/v1/queues/" + str(data.queue_id)
+async def gather_queue_data(
+    connection: Connection, data: ClientData, catalog: QueueCatalog
+) -> None:
+    lobby_queue_info: dict[str, Any] = await get_queue_info(
+        connection=connection, catalog=catalog, queue_id=data.queue_id
     )
-    lobby_queue_info: Any = await lobby_queue_info_raw.json()
-    data.queue = lobby_queue_info[LolGameQueuesQueue.NAME]
-    data.queue_type = lobby_queue_info[LolGameQueuesQueue.TYPE]
-    data.max_players = int(
-        lobby_queue_info[LolGameQueuesQueue.MAXIMUM_PARTICIPANT_LIST_SIZE]
+    apply_mapping(data=data, mapping=QUEUE_MAPPING, payload=lobby_queue_info)
+    apply_mapping(
+        data=data, mapping=QUEUE_LOBBY_CONFIG_MAPPING, payload=lobby_queue_info
     )
-    data.map_id = lobby_queue_info[LolGameQueuesQueue.MAP_ID]
-    data.gamemode = lobby_queue_info[LolGameQueuesQueue.GAME_MODE]
-    data.queue_is_ranked = lobby_queue_info[LolGameQueuesQueue.IS_RANKED]
 
 
 async def gather_lobby_data(connection: Connection, data: ClientData) -> None:
@@ -77,24 +207,7 @@ async def gather_lobby_data(connection: Connection, data: ClientData) -> None:
         method="GET", endpoint="/lol-gameflow/v1/gameflow-metadata/player-status"
     )
     lobby_data: dict[str, Any] = await lobby_raw_data.json()
-
-    data.queue_id = lobby_data[LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS][
-        LolGameflowLobbyStatus.QUEUE_ID
-    ]
-    data.lobby_id = lobby_data[LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS][
-        LolGameflowLobbyStatus.LOBBY_ID
-    ]
-    data.players = len(
-        lobby_data[LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS][
-            LolGameflowLobbyStatus.MEMBER_SUMMONER_IDS
-        ]
-    )
-    data.is_practice = lobby_data[LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS][
-        LolGameflowLobbyStatus.IS_PRACTICE_TOOL
-    ]
-    data.is_custom = lobby_data[LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS][
-        LolGameflowLobbyStatus.IS_CUSTOM
-    ]
+    apply_mapping(data=data, mapping=PLAYER_STATUS_MAPPING, payload=lobby_data)
 
 
 async def gather_gameflow_data(connection: Connection, data: ClientData) -> None:
@@ -102,7 +215,7 @@ async def gather_gameflow_data(connection: Connection, data: ClientData) -> None
         method="GET", endpoint="/lol-gameflow/v1/gameflow-phase"
     )
     game_flow_data: str = await game_flow_data_raw.json()
-    data.gameflow_phase = game_flow_data
+    apply_mapping(data=data, mapping=GAMEFLOW_PHASE_MAPPING, payload=game_flow_data)
 
 
 async def gather_ranked_data(connection: Connection, data: ClientData) -> None:
@@ -110,18 +223,7 @@ async def gather_ranked_data(connection: Connection, data: ClientData) -> None:
         method="GET", endpoint="/lol-ranked/v1/current-ranked-stats/"
     )
     ranked_data: dict[str, Any] = await ranked_data_raw.json()
-
-    data.summoner_rank = RankedStats.from_map(
-        obj_map=ranked_data,
-        ranked_type="RANKED_SOLO_5x5",
-    )
-    data.summoner_rank_flex = RankedStats.from_map(
-        obj_map=ranked_data,
-        ranked_type="RANKED_FLEX_SR",
-    )
-
-    data.arena_rank = ArenaStats.from_map(obj_map=ranked_data)
-    data.tft_rank = TFTStats.from_map(obj_map=ranked_data)
+    apply_mapping(data=data, mapping=RANKED_MAPPING, payload=ranked_data)
 
 
 async def gather_chat_status_data(connection: Connection, data: ClientData) -> None:
@@ -129,24 +231,15 @@ async def gather_chat_status_data(connection: Connection, data: ClientData) -> N
         method="GET", endpoint="/lol-chat/v1/me"
     )
     chat_data: dict[str, Any] = await chat_data_raw.json()
-
-    match chat_data[LolChatUser.AVAILABILITY]:
-        case LolChatUser.CHAT:
-            data.availability = LolChatUser.ONLINE.capitalize()
-        case LolChatUser.AWAY:
-            data.availability = LolChatUser.AWAY.capitalize()
-        case _:
-            ...
+    apply_mapping(data=data, mapping=CHAT_MAPPING, payload=chat_data)
 
 
 async def gather_summoner_data(connection: Connection, data: ClientData) -> None:
     summoner_data_raw: ClientResponse = await connection.request(
         method="GET", endpoint="/lol-summoner/v1/current-summoner"
     )
-    summoner_data = await summoner_data_raw.json()
-
-    data.summoner_level = summoner_data.get(Summoner.SUMMONER_LEVEL, 0)
-    data.summoner_icon = summoner_data[Summoner.PROFILE_ICON_ID]
+    summoner_data: dict[str, Any] = await summoner_data_raw.json()
+    apply_mapping(data=data, mapping=SUMMONER_MAPPING, payload=summoner_data)
 
 
 async def gather_telemetry_data(connection: Connection, data: ClientData) -> None:
@@ -154,4 +247,4 @@ async def gather_telemetry_data(connection: Connection, data: ClientData) -> Non
         method="GET", endpoint="/telemetry/v1/application-start-time"
     )
     application_start_time: int = await application_start_time_raw.json()
-    data.application_start_time = application_start_time
+    apply_mapping(data=data, mapping=TELEMETRY_MAPPING, payload=application_start_time)
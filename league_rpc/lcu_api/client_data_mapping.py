@@ -0,0 +1,221 @@
+"""
+This module declares how the payloads of the LCU endpoints map onto ClientData fields.
+Both the REST gatherers in base_data.py and the WebSocket handlers in lcu_connector.py parse
+their payloads through these mappings, and apply them with field level change tracking,
+so the RPCUpdater knows exactly which fields changed.
+
+Usage:
+    changed = apply_mapping(data=client_data, mapping=SUMMONER_MAPPING, payload=payload)
+    rpc_updater.delay_update(module_data=module_data, changed=changed)
+"""
+
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable
+
+from league_rpc.models.client_data import ClientData
+from league_rpc.models.lcu.current_chat_status import LolChatUser
+from league_rpc.models.lcu.current_lobby import (
+    LolLobbyLobbyDto,
+    LolLobbyLobbyGameConfigDto,
+)
+from league_rpc.models.lcu.current_queue import LolGameQueuesQueue
+from league_rpc.models.lcu.current_ranked_stats import ArenaStats, RankedStats, TFTStats
+from league_rpc.models.lcu.current_summoner import Summoner
+from league_rpc.models.lcu.gameflow_phase import (
+    LolGameflowLobbyStatus,
+    LolGameflowPlayerStatus,
+)
+
+# Returned by a path lookup or a converter, when the field should be left untouched.
+MISSING: Any = object()
+
+PRACTICE_TOOL_GAME_MODE = "PRACTICETOOL"
+
+
+def identity(value: Any) -> Any:
+    return value
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Declares a single ClientData field: where its value is in the payload, and how to convert it.
+    An empty path means the whole payload.
+    """
+
+    field: str
+    path: tuple[str, ...] = ()
+    convert: Callable[[Any], Any] = identity
+
+
+def availability_label(availability: str) -> Any:
+    """Converts a chat availability into the label shown on Discord. Other statuses are ignored."""
+    match availability:
+        case LolChatUser.CHAT:
+            return LolChatUser.ONLINE.capitalize()
+        case LolChatUser.AWAY:
+            return LolChatUser.AWAY.capitalize()
+        case _:
+            return MISSING
+
+
+def is_practice_tool(game_mode: str) -> bool:
+    return game_mode == PRACTICE_TOOL_GAME_MODE
+
+
+# /lol-summoner/v1/current-summoner
+SUMMONER_MAPPING: tuple[FieldSpec, ...] = (
+    FieldSpec("summoner_level", (Summoner.SUMMONER_LEVEL,)),
+    FieldSpec("summoner_icon", (Summoner.PROFILE_ICON_ID,)),
+)
+
+# /lol-chat/v1/me
+CHAT_MAPPING: tuple[FieldSpec, ...] = (
+    FieldSpec("availability", (LolChatUser.AVAILABILITY,), availability_label),
+)
+
+# /lol-gameflow/v1/gameflow-phase, returns the plain string of the phase
+GAMEFLOW_PHASE_MAPPING: tuple[FieldSpec, ...] = (FieldSpec("gameflow_phase"),)
+
+# /telemetry/v1/application-start-time, epoch time from which the league client was started
+TELEMETRY_MAPPING: tuple[FieldSpec, ...] = (FieldSpec("application_start_time"),)
+
+# /lol-ranked/v1/current-ranked-stats
+RANKED_MAPPING: tuple[FieldSpec, ...] = (
+    FieldSpec(
+        "summoner_rank",
+        convert=partial(RankedStats.from_map, ranked_type="RANKED_SOLO_5x5"),
+    ),
+    FieldSpec(
+        "summoner_rank_flex",
+        convert=partial(RankedStats.from_map, ranked_type="RANKED_FLEX_SR"),
+    ),
+    FieldSpec("arena_rank", convert=ArenaStats.from_map),
+    FieldSpec("tft_rank", convert=TFTStats.from_map),
+)
+
+# /lol-lobby/v2/lobby
+LOBBY_MAPPING: tuple[FieldSpec, ...] = (
+    FieldSpec(
+        "queue_id",
+        (LolLobbyLobbyDto.GAME_CONFIG, LolLobbyLobbyGameConfigDto.QUEUE_ID),
+        int,
+    ),
+    FieldSpec("lobby_id", (LolLobbyLobbyDto.PARTY_ID,)),
+    FieldSpec("players", (LolLobbyLobbyDto.MEMBERS,), len),
+    FieldSpec(
+        "max_players",
+        (LolLobbyLobbyDto.GAME_CONFIG, LolLobbyLobbyGameConfigDto.MAX_LOBBY_SIZE),
+        int,
+    ),
+    FieldSpec(
+        "map_id", (LolLobbyLobbyDto.GAME_CONFIG, LolLobbyLobbyGameConfigDto.MAP_ID)
+    ),
+    FieldSpec(
+        "gamemode",
+        (LolLobbyLobbyDto.GAME_CONFIG, LolLobbyLobbyGameConfigDto.GAME_MODE),
+    ),
+    FieldSpec(
+        "is_custom",
+        (LolLobbyLobbyDto.GAME_CONFIG, LolLobbyLobbyGameConfigDto.IS_CUSTOM),
+    ),
+    FieldSpec(
+        "is_practice",
+        (LolLobbyLobbyDto.GAME_CONFIG, LolLobbyLobbyGameConfigDto.GAME_MODE),
+        is_practice_tool,
+    ),
+)
+
+# /lol-gameflow/v1/gameflow-metadata/player-status
+PLAYER_STATUS_MAPPING: tuple[FieldSpec, ...] = (
+    FieldSpec(
+        "queue_id",
+        (LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS, LolGameflowLobbyStatus.QUEUE_ID),
+    ),
+    FieldSpec(
+        "lobby_id",
+        (LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS, LolGameflowLobbyStatus.LOBBY_ID),
+    ),
+    FieldSpec(
+        "players",
+        (
+            LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS,
+            LolGameflowLobbyStatus.MEMBER_SUMMONER_IDS,
+        ),
+        len,
+    ),
+    FieldSpec(
+        "is_practice",
+        (
+            LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS,
+            LolGameflowLobbyStatus.IS_PRACTICE_TOOL,
+        ),
+    ),
+    FieldSpec(
+        "is_custom",
+        (
+            LolGameflowPlayerStatus.CURRENT_LOBBY_STATUS,
+            LolGameflowLobbyStatus.IS_CUSTOM,
+        ),
+    ),
+)
+
+# /lol-game-queues/v1/queues/{id}, or an entry of the QueueCatalog
+QUEUE_MAPPING: tuple[FieldSpec, ...] = (
+    FieldSpec("queue", (LolGameQueuesQueue.NAME,)),
+    FieldSpec("queue_type", (LolGameQueuesQueue.TYPE,)),
+    FieldSpec("queue_is_ranked", (LolGameQueuesQueue.IS_RANKED,)),
+)
+
+# The lobby configuration of a queue, used when the lobby itself didn't provide it.
+QUEUE_LOBBY_CONFIG_MAPPING: tuple[FieldSpec, ...] = (
+    FieldSpec("max_players", (LolGameQueuesQueue.MAXIMUM_PARTICIPANT_LIST_SIZE,), int),
+    FieldSpec("map_id", (LolGameQueuesQueue.MAP_ID,)),
+    FieldSpec("gamemode", (LolGameQueuesQueue.GAME_MODE,)),
+)
+
+
+def get_path(payload: Any, path: tuple[str, ...]) -> Any:
+    """Returns the value at the given path of the payload, or MISSING if any key is absent."""
+    value: Any = payload
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return MISSING
+        value = value[key]
+    return value
+
+
+def parse_payload(mapping: tuple[FieldSpec, ...], payload: Any) -> dict[str, Any]:
+    """Parses a payload into a dict of ClientData field names and their new values."""
+    updates: dict[str, Any] = {}
+    for spec in mapping:
+        value: Any = get_path(payload=payload, path=spec.path)
+        if value is MISSING:
+            continue
+        value = spec.convert(value)
+        if value is MISSING:
+            continue
+        updates[spec.field] = value
+    return updates
+
+
+def apply_updates(data: ClientData, updates: dict[str, Any]) -> set[str]:
+    """
+    Sets the given fields on the ClientData, and returns the names of the fields that actually changed.
+    Unchanged values are not assigned, so equal objects (such as ranked stats) are reused.
+    """
+    changed: set[str] = set()
+    for name, value in updates.items():
+        if getattr(data, name) != value:
+            setattr(data, name, value)
+            changed.add(name)
+    return changed
+
+
+def apply_mapping(
+    data: ClientData, mapping: tuple[FieldSpec, ...], payload: Any
+) -> set[str]:
+    """Parses the payload with the given mapping, and applies it to the ClientData."""
+    return apply_updates(
+        data=data, updates=parse_payload(mapping=mapping, payload=payload)
+    )
@@ -0,0 +1,126 @@
+"""
+This module provides the EventDispatcher class, a thin layer between the lcu_driver WebSocket
+and the LCU event handlers. The League client fires bursts of UPDATE events, many of them identical,
+so the dispatcher coalesces them per URI and skips handlers whose input did not change.
+
+Usage:
+    Register handlers through EventDispatcher.register instead of connector.ws.register.
+    Each handler can pass a fingerprint function, which extracts the part of the payload the handler reads.
+    While a handler runs, newer events for the same URI replace older pending ones (latest wins),
+    and an event whose fingerprint equals the last handled one does not run the handler at all.
+"""
+
+import asyncio
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+
+from lcu_driver.connection import Connection  # type:ignore
+from lcu_driver.connector import Connector  # type:ignore
+from lcu_driver.events.responses import WebsocketEventResponse  # type:ignore
+
+from league_rpc.utils.color import Color
+from league_rpc.utils.tracing import tracer
+
+EventHandler = Callable[[Connection, WebsocketEventResponse], Awaitable[None]]
+Fingerprint = Callable[[Any], Hashable]
+# Called after every event that reached a handler: (handler name, event, seconds spent, skipped).
+DispatchListener = Callable[[str, WebsocketEventResponse, float, bool], None]
+
+# Marks that no event has been handled yet, since None is a valid fingerprint.
+NOT_HANDLED = object()
+
+
+@dataclass
+class EventDispatcher:
+    """A dataclass that coalesces LCU WebSocket events per URI, and suppresses events with unchanged payloads."""
+
+    connector: Connector
+    _pending: dict[tuple[str, str], tuple[Connection, WebsocketEventResponse]] = field(
+        default_factory=dict
+    )
+    _draining: set[tuple[str, str]] = field(default_factory=set)
+    _fingerprints: dict[tuple[str, str], Hashable] = field(default_factory=dict)
+    listeners: list[DispatchListener] = field(default_factory=list)
+
+    def register(
+        self,
+        uri: str,
+        event_types: Iterable[str] = ("CREATE", "UPDATE", "DELETE"),
+        fingerprint: Optional[Fingerprint] = None,
+    ) -> Callable[[EventHandler], EventHandler]:
+        """Registers a handler for the given URI, behind the coalescing layer."""
+
+        def register_wrapper(handler: EventHandler) -> EventHandler:
+            async def enqueue(
+                connection: Connection, event: WebsocketEventResponse
+            ) -> None:
+                key: tuple[str, str] = (handler.__name__, event.uri)
+                # Latest wins: an event that was not handled yet is simply replaced.
+                self._pending[key] = (connection, event)
+                if key not in self._draining:
+                    self._draining.add(key)
+                    # Named after the handler, so every drain of it shares one trace track.
+                    asyncio.create_task(
+                        self._drain(key, handler, fingerprint),
+                        name=f"{handler.__name__} {event.uri}",
+                    )
+
+            self.connector.ws.register(uri=uri, event_types=tuple(event_types))(enqueue)
+            return handler
+
+        return register_wrapper
+
+    def reset(self) -> None:
+        """Forgets every fingerprint, so the next event of each URI is always handled."""
+        self._fingerprints.clear()
+
+    async def _drain(
+        self,
+        key: tuple[str, str],
+        handler: EventHandler,
+        fingerprint: Optional[Fingerprint],
+    ) -> None:
+        try:
+            while key in self._pending:
+                connection, event = self._pending.pop(key)
+
+                if fingerprint is not None:
+                    current: Hashable = fingerprint(event.data)
+                    if self._fingerprints.get(key, NOT_HANDLED) == current:
+                        self._notify(handler.__name__, event, 0.0, True)
+                        continue
+                else:
+                    current = NOT_HANDLED
+
+                started: float = time.perf_counter()
+                try:
+                    with tracer.span(handler.__name__, "lcu_handler", uri=event.uri):
+                        await handler(connection, event)
+                except Exception:
+                    # A failing handler must not stop the events that come after it.
+                    print(
+                        f"{Color.red}Failed to handle {event.type} {event.uri} in {handler.__name__}{Color.reset}"
+                    )
+                    traceback.print_exc()
+                    continue
+                finally:
+                    self._notify(
+                        handler.__name__, event, time.perf_counter() - started, False
+                    )
+
+                if fingerprint is not None:
+                    self._fingerprints[key] = current
+        finally:
+            self._draining.discard(key)
+
+    def _notify(
+        self,
+        handler_name: str,
+        event: WebsocketEventResponse,
+        duration: float,
+        skipped: bool,
+    ) -> None:
+        for listener in self.listeners:
+            listener(handler_name, event, duration, skipped)
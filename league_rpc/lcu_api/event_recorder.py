@@ -0,0 +1,85 @@
+"""
+This module provides the EventRecorder class, which records an LCU session to a gzip compressed JSONL file.
+Every received WebSocket event, and every REST response the handlers requested, is written as one line,
+together with a monotonic timestamp relative to the start of the recording.
+
+Usage:
+    Start LeagueRPC with --record-events <file>, and play as usual.
+    The recording can be fed back into the same handlers with league_rpc.lcu_api.event_replay.
+"""
+
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from typing import IO, Any, Optional
+
+from aiohttp import ClientResponse
+from lcu_driver.connection import Connection  # type:ignore
+from lcu_driver.connector import Connector  # type:ignore
+from lcu_driver.events.responses import WebsocketEventResponse  # type:ignore
+
+from league_rpc.utils.color import Color
+
+RECORD_KIND_EVENT = "event"
+RECORD_KIND_REQUEST = "request"
+
+
+@dataclass
+class EventRecorder:
+    """A dataclass that writes LCU events and REST responses to a compressed JSONL recording."""
+
+    path: str
+    started_at: float = field(default_factory=time.monotonic)
+    _file: Optional[IO[str]] = None
+
+    def attach(self, connector: Connector) -> None:
+        """Subscribes to every WebSocket event, and records the REST responses of every new connection."""
+        self._file = gzip.open(filename=self.path, mode="wt", encoding="utf-8")
+        connector.open(self._on_open)
+        connector.close(self._on_close)
+        # A uri ending with a slash matches every event starting with it, so "/" matches all of them.
+        connector.ws.register(uri="/", event_types=("CREATE", "UPDATE", "DELETE"))(
+            self._on_event
+        )
+        print(f"{Color.dgray}Recording LCU events to {self.path}{Color.reset}")
+
+    def write(self, kind: str, **record: Any) -> None:
+        """Writes a single record. The gzip stream buffers it, so this does not hit the disk per event."""
+        if self._file is None:
+            return
+        record.update(kind=kind, t=round(time.monotonic() - self.started_at, 6))
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        """Flushes and closes the recording."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def _on_event(self, _: Connection, event: WebsocketEventResponse) -> None:
+        self.write(RECORD_KIND_EVENT, uri=event.uri, type=event.type, data=event.data)
+
+    async def _on_open(self, connection: Connection) -> None:
+        request = connection.request
+
+        async def recording_request(
+            method: str, endpoint: str, **kwargs: Any
+        ) -> ClientResponse:
+            response: ClientResponse = await request(method, endpoint, **kwargs)
+            # aiohttp caches the body, so the handler can still read it afterwards.
+            body: bytes = await response.read()
+            self.write(
+                RECORD_KIND_REQUEST,
+                method=method,
+                endpoint=endpoint,
+                status=response.status,
+                body=body.decode("utf-8", errors="replace"),
+            )
+            return response
+
+        connection.request = recording_request
+
+    async def _on_close(self, _: Connection) -> None:
+        if self._file is not None:
+            self._file.flush()
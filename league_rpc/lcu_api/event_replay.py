@@ -0,0 +1,306 @@
+"""
+Replays an LCU recording made with --record-events, through the same handlers and RPCUpdater
+that a live session uses. Discord is replaced by a stand-in that only counts the presence updates,
+and REST requests are answered with the responses captured during the recording.
+
+Usage:
+    python -m league_rpc.lcu_api.event_replay <recording.jsonl.gz> [--speed 1 | --speed 10 | --speed 0]
+
+    --speed 1 replays in real time, --speed 10 ten times faster, and --speed 0 as fast as possible.
+    At the end a report is printed with the handler latencies, the amount of rpc.update calls,
+    the delay from an LCU event until the presence reflecting it was sent, and the lag of the event loop.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gzip
+import json
+import os
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from lcu_driver.events.managers import WebsocketEventManager  # type:ignore
+from lcu_driver.events.responses import WebsocketEventResponse  # type:ignore
+
+from league_rpc.discord_ipc.client import DiscordIpcClient
+from league_rpc.lcu_api import lcu_connector
+from league_rpc.lcu_api.event_recorder import RECORD_KIND_EVENT, RECORD_KIND_REQUEST
+from league_rpc.models.client_data_snapshot import STATE_FILE_NAME, ClientDataSnapshot
+from league_rpc.models.presence_writer import PresenceWriter
+from league_rpc.models.rank_timeline import RANK_TIMELINE_FILE_NAME, RankTimeline
+from league_rpc.utils.color import Color
+from league_rpc.utils.loop_monitor import LoopLagMonitor
+from league_rpc.utils.tracing import tracer
+
+# Time to wait after the last event, so the delayed RPC update of the last batch is counted as well.
+REPLAY_SETTLE_TIME = 1.5
+
+
+@dataclass
+class ReplayResponse:
+    """Stands in for an aiohttp ClientResponse, serving a recorded body."""
+
+    status: int
+    body: str
+
+    async def read(self) -> bytes:
+        return self.body.encode("utf-8")
+
+    async def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+
+@dataclass
+class ReplayConnection:
+    """Stands in for an lcu_driver Connection, answering requests with the recorded responses."""
+
+    responses: dict[tuple[str, str], list[tuple[float, ReplayResponse]]]
+    clock: Callable[[], float]
+
+    async def request(self, method: str, endpoint: str, **_: Any) -> ReplayResponse:
+        recorded = self.responses.get((method.upper(), endpoint))
+        if not recorded:
+            return ReplayResponse(status=404, body="")
+
+        # The latest response recorded before the current position in the recording.
+        chosen: ReplayResponse = recorded[0][1]
+        for recorded_at, response in recorded:
+            if recorded_at > self.clock():
+                break
+            chosen = response
+        return chosen
+
+
+class ReplayIpcClient(DiscordIpcClient):
+    """Stands in for Discord, and reports every presence update instead of sending it."""
+
+    def __init__(self, on_update: Callable[[dict[str, Any]], None]) -> None:
+        super().__init__(client_id="replay")
+        self.on_update = on_update
+
+    @property
+    def connected(self) -> bool:
+        return True
+
+    @property
+    def alive(self) -> bool:
+        return True
+
+    async def set_activity(
+        self, activity: Optional[dict[str, Any]], timeout: Optional[float] = None
+    ) -> dict[str, Any]:
+        self.on_update(activity or {})
+        return {"evt": None, "data": activity}
+
+
+@dataclass
+class ReplayReport:
+    """Collects the measurements of a replay."""
+
+    events: int = 0
+    handled: int = 0
+    skipped: int = 0
+    handler_latencies: dict[str, list[float]] = field(default_factory=dict)
+    rpc_updates: int = 0
+    presence_delays: list[float] = field(default_factory=list)
+    duration: float = 0.0
+    loop_lag: LoopLagMonitor = field(default_factory=LoopLagMonitor)
+
+    def print(self) -> None:
+        print(f"\n{Color.cyan}Replay report{Color.reset}")
+        print(f"Replayed {self.events} events in {self.duration:.2f}s")
+        print(
+            f"Handlers ran {self.handled} times, skipped {self.skipped} unchanged events, "
+            f"coalesced {self.events - self.handled - self.skipped} events"
+        )
+        for handler_name, latencies in sorted(self.handler_latencies.items()):
+            print(f"  {handler_name:<24} {format_latencies(latencies)}")
+        print(f"rpc.update calls: {self.rpc_updates}")
+        print(f"Event to presence delay: {format_latencies(self.presence_delays)}")
+        print(
+            f"Event loop lag: avg {self.loop_lag.average_lag * 1000:.2f}ms, "
+            f"max {self.loop_lag.max_lag * 1000:.2f}ms ({self.loop_lag.samples} samples)"
+        )
+
+
+def format_latencies(latencies: list[float]) -> str:
+    """Formats a list of durations in seconds, as count, median, p95 and max in milliseconds."""
+    if not latencies:
+        return "n=0"
+    ordered: list[float] = sorted(latencies)
+    p95: float = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"n={len(ordered)} median={statistics.median(ordered) * 1000:.2f}ms "
+        f"p95={p95 * 1000:.2f}ms max={ordered[-1] * 1000:.2f}ms"
+    )
+
+
+def load_recording(
+    path: str,
+) -> tuple[
+    list[dict[str, Any]], dict[tuple[str, str], list[tuple[float, ReplayResponse]]]
+]:
+    """Reads a recording, and splits it into the WebSocket events and the REST responses."""
+    events: list[dict[str, Any]] = []
+    responses: dict[tuple[str, str], list[tuple[float, ReplayResponse]]] = {}
+
+    with gzip.open(filename=path, mode="rt", encoding="utf-8") as file:
+        for line in file:
+            record: dict[str, Any] = json.loads(line)
+            if record["kind"] == RECORD_KIND_EVENT:
+                events.append(record)
+            elif record["kind"] == RECORD_KIND_REQUEST:
+                responses.setdefault(
+                    (record["method"].upper(), record["endpoint"]), []
+                ).append(
+                    (
+                        record["t"],
+                        ReplayResponse(status=record["status"], body=record["body"]),
+                    )
+                )
+    return events, responses
+
+
+async def replay(path: str, speed: float) -> ReplayReport:
+    """Feeds a recording into the LCU handlers, and measures what they do."""
+    events, responses = load_recording(path=path)
+    return await replay_events(events=events, responses=responses, speed=speed)
+
+
+async def replay_events(
+    events: list[dict[str, Any]],
+    responses: dict[tuple[str, str], list[tuple[float, ReplayResponse]]],
+    speed: float,
+    on_event: Optional[Callable[[float], None]] = None,
+) -> ReplayReport:
+    """
+    Feeds recorded events into the LCU handlers, with the REST requests served from the recorded responses.
+    `on_event` is called with the position in the recording (seconds) after every event.
+    """
+    report = ReplayReport()
+    position: float = 0.0
+    first_unrendered_event: Optional[float] = None
+
+    def on_update(_: dict[str, Any]) -> None:
+        # Called from the PresenceWriter's channel, on the same event loop as the handlers.
+        nonlocal first_unrendered_event
+        report.rpc_updates += 1
+        if first_unrendered_event is not None:
+            report.presence_delays.append(time.perf_counter() - first_unrendered_event)
+            first_unrendered_event = None
+
+    def on_dispatch(
+        handler_name: str, _: WebsocketEventResponse, duration: float, skipped: bool
+    ) -> None:
+        if skipped:
+            report.skipped += 1
+            return
+        report.handled += 1
+        report.handler_latencies.setdefault(handler_name, []).append(duration)
+
+    module_data = lcu_connector.module_data
+    module_data.presence = PresenceWriter(
+        client_id="replay",
+        clients=[ReplayIpcClient(on_update=on_update)],
+        discover=False,
+    )
+    # The League Client is running in the recording, even though its process is not.
+    module_data.gameflow.update(client_running=True)
+    module_data.cli_args = argparse.Namespace(
+        show_emojis=False, no_rank=False, no_stats=False
+    )
+    # Never overwrite the real state files with replayed data.
+    state_dir: str = tempfile.mkdtemp()
+    lcu_connector.rpc_updater.snapshot = ClientDataSnapshot(
+        path=os.path.join(state_dir, STATE_FILE_NAME)
+    )
+    module_data.rank_timeline = RankTimeline(
+        path=os.path.join(state_dir, RANK_TIMELINE_FILE_NAME)
+    )
+    lcu_connector.event_dispatcher.listeners.append(on_dispatch)
+
+    connection = ReplayConnection(responses=responses, clock=lambda: position)
+    # Measured and traced like the requests of a live connection.
+    await lcu_connector.measure_requests(connection)  # type:ignore
+    connector = module_data.connector
+
+    loop_lag_task = asyncio.create_task(report.loop_lag.run())
+    started: float = time.perf_counter()
+    if responses:
+        # Run the same ready handler as a live connection, served from the recorded responses.
+        asyncio.create_task(connector.run_event("ready", connection))
+
+    for event in events:
+        if speed > 0:
+            delay: float = started + event["t"] / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        position = event["t"]
+
+        if first_unrendered_event is None:
+            first_unrendered_event = time.perf_counter()
+        report.events += 1
+        WebsocketEventManager.match_event(
+            connector,
+            connection,
+            {"uri": event["uri"], "eventType": event["type"], "data": event["data"]},
+        )
+        # Let the handlers run, also when replaying as fast as possible.
+        await asyncio.sleep(0)
+        if on_event is not None:
+            on_event(position)
+
+    await asyncio.sleep(REPLAY_SETTLE_TIME)
+    report.duration = time.perf_counter() - started - REPLAY_SETTLE_TIME
+    loop_lag_task.cancel()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded LCU session through the LeagueRPC handlers."
+    )
+    parser.add_argument(
+        "recording", help="Path to a recording made with --record-events"
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed. 1 is real time, 10 is ten times faster, 0 is as fast as possible.",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Hide the output of the handlers, and only print the report.",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Write the spans of the replay to a Chrome trace file, to open in Perfetto.",
+    )
+    args: argparse.Namespace = parser.parse_args()
+    if args.trace:
+        tracer.start(path=args.trace)
+
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with (
+            contextlib.redirect_stdout(devnull)
+            if args.quiet
+            else contextlib.nullcontext()
+        ):
+            report: ReplayReport = asyncio.run(
+                replay(path=args.recording, speed=args.speed)
+            )
+    report.print()
+    tracer.save()
+
+
+if __name__ == "__main__":
+    main()
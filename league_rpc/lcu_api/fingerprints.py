@@ -0,0 +1,76 @@
+"""
+Holds the fingerprint functions of the LCU event handlers.
+A fingerprint extracts only the part of an event payload that its handler reads,
+so the EventDispatcher can skip events that would not change anything.
+"""
+
+from typing import Any, Hashable, Optional
+
+from league_rpc.models.lcu.current_chat_status import LolChatUser
+from league_rpc.models.lcu.current_lobby import (
+    LolLobbyLobbyDto,
+    LolLobbyLobbyGameConfigDto,
+)
+from league_rpc.models.lcu.current_ranked_stats import (
+    LolRankedRankedQueueStats,
+    LolRankedRankedStats,
+)
+from league_rpc.models.lcu.current_summoner import Summoner
+
+RANKED_QUEUE_FIELDS: tuple[str, ...] = (
+    LolRankedRankedQueueStats.DIVISION,
+    LolRankedRankedQueueStats.TIER,
+    LolRankedRankedQueueStats.LEAGUE_POINTS,
+    LolRankedRankedQueueStats.RATED_TIER,
+    LolRankedRankedQueueStats.RATED_RATING,
+    LolRankedRankedQueueStats.WINS,
+    LolRankedRankedQueueStats.LOSSES,
+)
+RANKED_QUEUE_TYPES: tuple[str, ...] = (
+    "RANKED_SOLO_5x5",
+    "RANKED_FLEX_SR",
+    "RANKED_TFT",
+    "CHERRY",
+)
+
+
+def summoner_fingerprint(event_data: dict[str, Any]) -> Hashable:
+    return (
+        event_data.get(Summoner.SUMMONER_LEVEL),
+        event_data.get(Summoner.PROFILE_ICON_ID),
+    )
+
+
+def chat_fingerprint(event_data: dict[str, Any]) -> Hashable:
+    return event_data.get(LolChatUser.AVAILABILITY)
+
+
+def gameflow_phase_fingerprint(event_data: Any) -> Hashable:
+    return event_data
+
+
+def lobby_fingerprint(event_data: Optional[dict[str, Any]]) -> Hashable:
+    if event_data is None:
+        return None
+
+    game_config: dict[str, Any] = event_data.get(LolLobbyLobbyDto.GAME_CONFIG, {})
+    return (
+        event_data.get(LolLobbyLobbyDto.PARTY_ID),
+        len(event_data.get(LolLobbyLobbyDto.MEMBERS, [])),
+        game_config.get(LolLobbyLobbyGameConfigDto.QUEUE_ID),
+        game_config.get(LolLobbyLobbyGameConfigDto.MAX_LOBBY_SIZE),
+        game_config.get(LolLobbyLobbyGameConfigDto.MAP_ID),
+        game_config.get(LolLobbyLobbyGameConfigDto.GAME_MODE),
+        game_config.get(LolLobbyLobbyGameConfigDto.IS_CUSTOM),
+    )
+
+
+def ranked_fingerprint(event_data: dict[str, Any]) -> Hashable:
+    queue_map: dict[str, Any] = event_data.get(LolRankedRankedStats.QUEUE_MAP, {})
+    return tuple(
+        tuple(
+            (queue_map.get(queue_type) or {}).get(field_name)
+            for field_name in RANKED_QUEUE_FIELDS
+        )
+        for queue_type in RANKED_QUEUE_TYPES
+    )
@@ -1,28 +1,61 @@
+import asyncio
+import atexit
 import time
 from argparse import Namespace
 from typing import Any, Optional
 
-from aiohttp import ClientResponse
 from lcu_driver.connection import Connection  # type:ignore
 from lcu_driver.events.responses import WebsocketEventResponse  # type:ignore
-from pypresence import Presence  # type:ignore
 
 from league_rpc.disable_native_rpc.disable import check_plugin_status, find_game_path
-from league_rpc.lcu_api.base_data import gather_base_data
-from league_rpc.models.client_data import ArenaStats, ClientData, RankedStats, TFTStats
-from league_rpc.models.lcu.current_chat_status import LolChatUser
-from league_rpc.models.lcu.current_lobby import (
-    LolLobbyLobbyDto,
-    LolLobbyLobbyGameConfigDto,
+from league_rpc.lcu_api.base_data import (
+    gather_base_data,
+    get_queue_info,
+    wait_for_lcu_ready,
 )
-from league_rpc.models.lcu.current_queue import LolGameQueuesQueue
-from league_rpc.models.lcu.current_summoner import Summoner
+from league_rpc.lcu_api.client_data_mapping import (
+    CHAT_MAPPING,
+    GAMEFLOW_PHASE_MAPPING,
+    LOBBY_MAPPING,
+    QUEUE_MAPPING,
+    RANKED_MAPPING,
+    SUMMONER_MAPPING,
+    apply_mapping,
+    apply_updates,
+)
+from league_rpc.lcu_api.event_dispatcher import EventDispatcher
+from league_rpc.lcu_api.event_recorder import EventRecorder
+from league_rpc.lcu_api.fingerprints import (
+    chat_fingerprint,
+    gameflow_phase_fingerprint,
+    lobby_fingerprint,
+    ranked_fingerprint,
+    summoner_fingerprint,
+)
+from league_rpc.models.client_data import ClientData
+from league_rpc.models.gameflow_state import ClientState, StateTransition
 from league_rpc.models.module_data import ModuleData
+from league_rpc.models.presence_writer import PresenceWriter
 from league_rpc.models.rpc_updater import RPCUpdater
+from league_rpc.processes.process import ProcessFinder, is_league_client_ux
 from league_rpc.utils.color import Color
+from league_rpc.utils.const import LCU_PROCESS_POLL_INTERVAL
+from league_rpc.utils.executor import run_blocking
+from league_rpc.utils.metrics import (
+    SOURCE_LCU,
+    endpoint_label,
+    http_request_duration,
+    http_requests,
+    lcu_events,
+    lcu_handler_duration,
+    reconnects,
+)
+from league_rpc.utils.tracing import tracer
 
 module_data = ModuleData()
 rpc_updater = RPCUpdater()
+event_dispatcher = EventDispatcher(connector=module_data.connector)
+ux_process_finder = ProcessFinder(matches=is_league_client_ux)
 
 ## WS Events ##
 
@@ -30,11 +63,21 @@ rpc_updater = RPCUpdater()
 @module_data.connector.ready  # type:ignore
 async def connect(connection: Connection) -> None:
     print(f"{Color.green}Successfully connected to the League Client API.{Color.reset}")
-    time.sleep(2)  # Give the client some time to load
+    # The client answering is all the proof needed that it runs, so leave the closed state without waiting for a scan.
+    module_data.gameflow.update(client_running=True)
+
+    # Give the client time to load, but only as long as it actually needs.
+    if not await wait_for_lcu_ready(connection=connection):
+        print(
+            f"{Color.orange}The League Client API is slow to respond. Gathering base data anyway.{Color.reset}"
+        )
 
     print(f"\n{Color.orange}Gathering base data.{Color.reset}")
-    time.sleep(2)
+    # Fresh base data replaces whatever the previous events set.
+    event_dispatcher.reset()
     await gather_base_data(connection=connection, module_data=module_data)
+    module_data.gameflow.update(phase=module_data.client_data.gameflow_phase)
+    module_data.rank_timeline.record(client_data=module_data.client_data)
 
     print(f"{Color.green}Successfully gathered base data.{Color.reset}")
 
@@ -44,8 +87,31 @@ async def connect(connection: Connection) -> None:
 
     print(f"\n{Color.cyan}LeagueRPC is ready{Color.reset}")
 
-    if game_path := find_game_path():
-        check_plugin_status(file_path=game_path)
+    if game_path := await run_blocking(find_game_path):
+        await run_blocking(check_plugin_status, file_path=game_path)
+
+
+@module_data.connector.open  # type:ignore
+async def measure_requests(connection: Connection) -> None:
+    """Records the latency and status of every request to the LCU API in the metrics, and traces it."""
+    request = connection.request
+
+    async def timed_request(method: str, endpoint: str, **kwargs: Any) -> Any:
+        label: str = endpoint_label(endpoint)
+        status: str = "error"
+        started: float = time.perf_counter()
+        try:
+            with tracer.span(f"{method} {label}", SOURCE_LCU, endpoint=endpoint):
+                response = await request(method, endpoint, **kwargs)
+            status = str(response.status)
+            return response
+        finally:
+            http_request_duration.observe(
+                time.perf_counter() - started, SOURCE_LCU, label
+            )
+            http_requests.inc(SOURCE_LCU, label, status)
+
+    connection.request = timed_request
 
 
 @module_data.connector.close  # type:ignore
@@ -53,51 +119,62 @@ async def disconnect(_: Connection) -> None:
     print(f"{Color.red}Disconnected from the League Client API.{Color.reset}")
 
 
-@module_data.connector.ws.register(  # type:ignore
-    uri="/lol-summoner/v1/current-summoner", event_types=("UPDATE",)
-)
-async def summoner_updated(_: Connection, event: WebsocketEventResponse) -> None:
-    data: ClientData = module_data.client_data
-    event_data: dict[str, Any] = event.data  # type:ignore
+def count_lcu_event(
+    handler_name: str, _: WebsocketEventResponse, duration: float, skipped: bool
+) -> None:
+    if skipped:
+        lcu_events.inc(handler_name, "skipped")
+        return
+    lcu_events.inc(handler_name, "handled")
+    lcu_handler_duration.observe(duration, handler_name)
 
-    data.summoner_level = event_data.get(Summoner.SUMMONER_LEVEL, 0)
-    data.summoner_icon = event_data.get(Summoner.PROFILE_ICON_ID, 0)
 
-    rpc_updater.delay_update(module_data=module_data)
+event_dispatcher.listeners.append(count_lcu_event)
 
 
-@module_data.connector.ws.register(  # type:ignore
-    uri="/lol-chat/v1/me", event_types=("UPDATE",)
+@event_dispatcher.register(
+    uri="/lol-summoner/v1/current-summoner",
+    event_types=("UPDATE",),
+    fingerprint=summoner_fingerprint,
 )
-async def chat_updated(_: Connection, event: WebsocketEventResponse) -> None:
-    data: ClientData = module_data.client_data
-    event_data: dict[str, Any] = event.data  # type:ignore
+async def summoner_updated(_: Connection, event: WebsocketEventResponse) -> None:
+    changed: set[str] = apply_mapping(
+        data=module_data.client_data, mapping=SUMMONER_MAPPING, payload=event.data
+    )
+    rpc_updater.delay_update(module_data=module_data, changed=changed)
 
-    match event_data[LolChatUser.AVAILABILITY]:
-        case LolChatUser.CHAT:
-            data.availability = LolChatUser.ONLINE.capitalize()
 
-        case LolChatUser.AWAY:
-            data.availability = LolChatUser.AWAY.capitalize()
-        case _:
-            ...
-    rpc_updater.delay_update(module_data=module_data)
+@event_dispatcher.register(
+    uri="/lol-chat/v1/me", event_types=("UPDATE",), fingerprint=chat_fingerprint
+)
+async def chat_updated(_: Connection, event: WebsocketEventResponse) -> None:
+    changed: set[str] = apply_mapping(
+        data=module_data.client_data, mapping=CHAT_MAPPING, payload=event.data
+    )
+    rpc_updater.delay_update(module_data=module_data, changed=changed)
 
 
-@module_data.connector.ws.register(  # type:ignore
-    "/lol-gameflow/v1/gameflow-phase", event_types=("UPDATE",)
+@event_dispatcher.register(
+    uri="/lol-gameflow/v1/gameflow-phase",
+    event_types=("UPDATE",),
+    fingerprint=gameflow_phase_fingerprint,
 )
 async def gameflow_phase_updated(_: Connection, event: WebsocketEventResponse) -> None:
-    data: ClientData = module_data.client_data
-    event_data: Any = event.data  # type:ignore
-
-    data.gameflow_phase = event_data  # returns plain string of the phase
-    rpc_updater.delay_update(module_data=module_data)
+    changed: set[str] = apply_mapping(
+        data=module_data.client_data,
+        mapping=GAMEFLOW_PHASE_MAPPING,
+        payload=event.data,
+    )
+    # Change state right away, so the work of the new state starts without waiting for the presence batch.
+    module_data.gameflow.update(phase=module_data.client_data.gameflow_phase)
+    rpc_updater.delay_update(module_data=module_data, changed=changed)
 
 
 # could be used for lobby instead: /lol-gameflow/v1/gameflow-metadata/player-status
-@module_data.connector.ws.register(  # type:ignore
-    uri="/lol-lobby/v2/lobby", event_types=("UPDATE", "CREATE", "DELETE")
+@event_dispatcher.register(
+    uri="/lol-lobby/v2/lobby",
+    event_types=("UPDATE", "CREATE", "DELETE"),
+    fingerprint=lobby_fingerprint,
 )
 async def in_lobby(connection: Connection, event: WebsocketEventResponse) -> None:
     data: ClientData = module_data.client_data
@@ -107,79 +184,45 @@ async def in_lobby(connection: Connection, event: WebsocketEventResponse) -> Non
         # Make an early return if data is not present in the event.
         return
 
-    data.queue_id = int(
-        event_data[LolLobbyLobbyDto.GAME_CONFIG][
-            LolLobbyLobbyGameConfigDto.QUEUE_ID
-        ]  # type:ignore
-    )
-    data.lobby_id = event_data[LolLobbyLobbyDto.PARTY_ID]
-    data.players = len(event_data[LolLobbyLobbyDto.MEMBERS])  # type:ignore
-    data.max_players = int(
-        event_data[LolLobbyLobbyDto.GAME_CONFIG][  # type:ignore
-            LolLobbyLobbyGameConfigDto.MAX_LOBBY_SIZE
-        ]
+    changed: set[str] = apply_mapping(
+        data=data, mapping=LOBBY_MAPPING, payload=event_data
     )
-    data.map_id = event_data[LolLobbyLobbyDto.GAME_CONFIG][
-        LolLobbyLobbyGameConfigDto.MAP_ID
-    ]
-    data.gamemode = event_data[LolLobbyLobbyDto.GAME_CONFIG][
-        LolLobbyLobbyGameConfigDto.GAME_MODE
-    ]
-    data.is_custom = event_data[LolLobbyLobbyDto.GAME_CONFIG][
-        LolLobbyLobbyGameConfigDto.IS_CUSTOM
-    ]
-    if (
-        event_data[LolLobbyLobbyDto.GAME_CONFIG][LolLobbyLobbyGameConfigDto.GAME_MODE]
-        == "PRACTICETOOL"
-    ):
-        data.is_practice = True
-        data.max_players = 1
-    else:
-        data.is_practice = False
+    if data.is_practice:
+        changed |= apply_updates(data=data, updates={"max_players": 1})
 
     if data.queue_id == -1:
         # custom game / practice tool / tutorial lobby
-        if data.is_practice:
-            data.queue = "Practice Tool"
-        else:
-            data.queue = "Custom Game"
-        rpc_updater.delay_update(module_data)
+        changed |= apply_updates(
+            data=data,
+            updates={"queue": "Practice Tool" if data.is_practice else "Custom Game"},
+        )
+        rpc_updater.delay_update(module_data=module_data, changed=changed)
         return
 
-    lobby_queue_info_raw: ClientResponse = await connection.request(
-        method="GET",
-        endpoint="/lol-game-queues/v1/queues/{id}".format_map({"id": data.queue_id}),
+    # Served from the queue catalog, so lobby updates need no extra requests.
+    lobby_queue_info: dict[str, Any] = await get_queue_info(
+        connection=connection,
+        catalog=module_data.queue_catalog,
+        queue_id=data.queue_id,
     )
-    lobby_queue_info: dict[str, Any] = await lobby_queue_info_raw.json()
+    changed |= apply_mapping(data=data, mapping=QUEUE_MAPPING, payload=lobby_queue_info)
 
-    data.queue = lobby_queue_info[LolGameQueuesQueue.NAME]
-    data.queue_type = lobby_queue_info[LolGameQueuesQueue.TYPE]
-    data.queue_is_ranked = lobby_queue_info[LolGameQueuesQueue.IS_RANKED]
-
-    rpc_updater.delay_update(module_data=module_data)
+    rpc_updater.delay_update(module_data=module_data, changed=changed)
 
 
 # ranked stats
-@module_data.connector.ws.register(  # type:ignore
-    uri="/lol-ranked/v1/current-ranked-stats", event_types=("UPDATE",)
+@event_dispatcher.register(
+    uri="/lol-ranked/v1/current-ranked-stats",
+    event_types=("UPDATE",),
+    fingerprint=ranked_fingerprint,
 )
 async def ranked(_: Connection, event: WebsocketEventResponse) -> None:
-    data: ClientData = module_data.client_data
-    event_data: dict[str, Any] = event.data  # type:ignore
-
-    data.summoner_rank = RankedStats.from_map(
-        obj_map=event_data,
-        ranked_type="RANKED_SOLO_5x5",
-    )
-    data.summoner_rank_flex = RankedStats.from_map(
-        obj_map=event_data,
-        ranked_type="RANKED_FLEX_SR",
+    changed: set[str] = apply_mapping(
+        data=module_data.client_data, mapping=RANKED_MAPPING, payload=event.data
     )
-
-    data.arena_rank = ArenaStats.from_map(obj_map=event_data)
-    data.tft_rank = TFTStats.from_map(obj_map=event_data)
-
-    rpc_updater.delay_update(module_data)
+    if changed:
+        module_data.rank_timeline.record(client_data=module_data.client_data)
+    rpc_updater.delay_update(module_data=module_data, changed=changed)
 
 
 ###### Debug ######
@@ -192,7 +235,58 @@ async def ranked(_: Connection, event: WebsocketEventResponse) -> None:
 #    print(f"DEBUG - {event.type}: {event.uri}")
 
 
-def start_connector(rpc_from_main: Presence, cli_args: Namespace) -> None:
-    module_data.rpc = rpc_from_main
+def show_client_started(_: StateTransition) -> None:
+    rpc_updater.delay_update(module_data=module_data)
+
+
+async def start_connector(
+    presence_from_main: PresenceWriter, cli_args: Namespace
+) -> None:
+    module_data.presence = presence_from_main
     module_data.cli_args = cli_args
-    module_data.connector.start()
+
+    if cli_args.record_events:
+        recorder = EventRecorder(path=cli_args.record_events)
+        recorder.attach(connector=module_data.connector)
+        atexit.register(recorder.close)
+
+    module_data.rank_timeline.load()
+
+    # Nothing is shown while the client is closed, so show the presence as soon as it is found running.
+    # The process watcher finds it before the LCU API answers, which is what shows the restored state early.
+    module_data.gameflow.on_exit(ClientState.CLOSED, show_client_started)
+
+    # Show the last known state right away, it will be reconciled once the LCU API is connected.
+    if rpc_updater.snapshot.load(data=module_data.client_data):
+        print(
+            f"{Color.dgray}Restored the last known client state. Showing it until fresh data arrives.{Color.reset}"
+        )
+        if module_data.gameflow.state != ClientState.CLOSED:
+            rpc_updater.delay_update(module_data=module_data)
+
+    await run_connector()
+
+
+async def run_connector() -> None:
+    """
+    Connects to the League Client, and connects again whenever it was restarted.
+    This is what the connector's start() does, but on the running event loop instead of a loop of its own.
+    Only new processes are inspected while waiting, so a restarted client is found within a second, at close to no CPU.
+    """
+    connector = module_data.connector
+    connected_before: bool = False
+    while True:
+        process = await run_blocking(ux_process_finder.find)
+        if process is None:
+            await asyncio.sleep(LCU_PROCESS_POLL_INTERVAL)
+            continue
+
+        if connected_before:
+            reconnects.inc("lcu")
+        connected_before = True
+        connection = Connection(connector, process)
+        connector.register_connection(connection)
+        await connection.init()
+
+        if not (connector._repeat_flag and connector.should_run_ws):  # type:ignore
+            break
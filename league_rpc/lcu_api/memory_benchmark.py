@@ -0,0 +1,318 @@
+"""
+Measures the memory footprint of a long session. A synthetic day of LCU events (lobbies, queues, games,
+ranked updates, chat status changes) is fed through the same handlers and RPCUpdater as a live session,
+with the event replay, and the resident memory is sampled along the way.
+
+Usage:
+    python -m league_rpc.lcu_api.memory_benchmark [--hours 24] [--speed 1440] [--tracemalloc]
+
+    --speed 1440 runs a simulated day in one minute. Samples taken during the first hour are the warm-up:
+    the growth after it is what a session left running for days would keep adding. With --tracemalloc,
+    the Python allocations that grew the most since the warm-up are listed as well.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import os
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import psutil
+
+from league_rpc.lcu_api.event_replay import ReplayResponse, replay_events
+from league_rpc.utils.color import Color
+
+# How often the memory is sampled, and how long the warm-up lasts (simulated seconds).
+MEMORY_SAMPLE_INTERVAL = 15 * 60
+MEMORY_WARMUP = 60 * 60
+
+# Time between two chat status updates of the synthetic session (simulated seconds).
+CHAT_UPDATE_INTERVAL = 120
+
+MIB = 1024 * 1024
+
+SYNTHETIC_QUEUE: dict[str, Any] = {
+    "id": 420,
+    "name": "Ranked Solo/Duo",
+    "type": "RANKED_SOLO_5x5",
+    "maximumParticipantListSize": 5,
+    "mapId": 11,
+    "gameMode": "CLASSIC",
+    "isRanked": True,
+}
+
+
+def ranked_payload(league_points: int) -> dict[str, Any]:
+    """A /lol-ranked/v1/current-ranked-stats payload, with the same rank in every queue."""
+    return {
+        "queueMap": {
+            queue: {"division": "II", "tier": "GOLD", "leaguePoints": league_points}
+            for queue in ("RANKED_SOLO_5x5", "RANKED_FLEX_SR", "RANKED_TFT")
+        }
+    }
+
+
+def lobby_payload(members: int) -> dict[str, Any]:
+    """A /lol-lobby/v2/lobby payload of a ranked solo/duo lobby."""
+    return {
+        "partyId": "benchmark",
+        "members": list(range(members)),
+        "gameConfig": {
+            "queueId": SYNTHETIC_QUEUE["id"],
+            "maxLobbySize": SYNTHETIC_QUEUE["maximumParticipantListSize"],
+            "mapId": SYNTHETIC_QUEUE["mapId"],
+            "gameMode": SYNTHETIC_QUEUE["gameMode"],
+            "isCustom": False,
+        },
+    }
+
+
+def synthetic_session(
+    hours: float, seed: int = 0
+) -> tuple[
+    list[dict[str, Any]], dict[tuple[str, str], list[tuple[float, ReplayResponse]]]
+]:
+    """
+    Builds the events and REST responses of a session of the given length: game after game, with
+    the time in queue, in game and idle varying like it would for a player.
+    """
+    rng = random.Random(seed)
+    end: float = hours * 3600
+    events: list[dict[str, Any]] = []
+
+    def add(moment: float, uri: str, data: Any) -> None:
+        events.append({"uri": uri, "type": "Update", "data": data, "t": moment})
+
+    def phase(moment: float, name: str) -> None:
+        add(moment, "/lol-gameflow/v1/gameflow-phase", name)
+
+    league_points: int = 40
+    level: int = 30
+    games: int = 0
+    now: float = 1.0
+    while now < end:
+        phase(now, "Lobby")
+        for members in range(1, rng.randint(1, 3) + 1):
+            now += rng.uniform(1, 20)
+            add(now, "/lol-lobby/v2/lobby", lobby_payload(members=members))
+        now += rng.uniform(10, 60)
+        phase(now, "Matchmaking")
+        now += rng.uniform(30, 300)
+        phase(now, "ReadyCheck")
+        now += 10
+        phase(now, "ChampSelect")
+        now += 90
+        phase(now, "GameStart")
+        now += 15
+        phase(now, "InProgress")
+        now += rng.uniform(15 * 60, 40 * 60)
+        phase(now, "WaitingForStats")
+        now += 15
+        phase(now, "PreEndOfGame")
+        now += 15
+        phase(now, "EndOfGame")
+
+        games += 1
+        league_points = min(max(league_points + rng.choice((-18, 22)), 0), 99)
+        now += 5
+        add(now, "/lol-ranked/v1/current-ranked-stats", ranked_payload(league_points))
+        if games % 3 == 0:
+            level += 1
+        add(
+            now,
+            "/lol-summoner/v1/current-summoner",
+            {"profileIconId": 1, "summonerLevel": level},
+        )
+        now += rng.uniform(20, 90)
+
+        if games % 4 == 0:
+            # A break in the client, between two sessions of games.
+            phase(now, "None")
+            now += rng.uniform(20 * 60, 60 * 60)
+
+    moment: float = 0.0
+    while moment < end:
+        moment += CHAT_UPDATE_INTERVAL
+        add(moment, "/lol-chat/v1/me", {"availability": rng.choice(("chat", "away"))})
+
+    events = sorted(
+        (event for event in events if event["t"] < end), key=lambda e: e["t"]
+    )
+
+    base_data: dict[str, Any] = {
+        "/lol-game-queues/v1/queues": [SYNTHETIC_QUEUE],
+        f"/lol-game-queues/v1/queues/{SYNTHETIC_QUEUE['id']}": SYNTHETIC_QUEUE,
+        "/lol-maps/v2/maps": [],
+        "/lol-gameflow/v1/gameflow-phase": "None",
+        "/lol-chat/v1/me": {"availability": "chat"},
+        "/lol-summoner/v1/current-summoner": {"profileIconId": 1, "summonerLevel": 30},
+        "/telemetry/v1/application-start-time": int(time.time() * 1000),
+        "/lol-ranked/v1/current-ranked-stats/": ranked_payload(league_points=40),
+    }
+    responses: dict[tuple[str, str], list[tuple[float, ReplayResponse]]] = {
+        ("GET", endpoint): [(0.0, ReplayResponse(status=200, body=json.dumps(body)))]
+        for endpoint, body in base_data.items()
+    }
+    return events, responses
+
+
+@dataclass
+class MemorySample:
+    """The memory in use at a moment of the session."""
+
+    # Simulated time since the start of the session (seconds).
+    position: float
+    rss: int
+    # Memory allocated by Python, when tracemalloc is running.
+    traced: Optional[int] = None
+
+
+@dataclass
+class MemoryReport:
+    """Collects the memory samples of a benchmark run."""
+
+    hours: float
+    events: int = 0
+    duration: float = 0.0
+    samples: list[MemorySample] = field(default_factory=list)
+    warmup_snapshot: Optional[tracemalloc.Snapshot] = None
+    final_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def after_warmup(self) -> MemorySample:
+        for sample in self.samples:
+            if sample.position >= MEMORY_WARMUP:
+                return sample
+        return self.samples[-1]
+
+    def print(self) -> None:
+        print(f"\n{Color.cyan}Memory report{Color.reset}")
+        print(
+            f"Simulated {self.hours:g}h of LCU events ({self.events} events) in {self.duration:.2f}s"
+        )
+        if not self.samples:
+            return
+        for sample in self.samples:
+            if sample.position % 3600 < MEMORY_SAMPLE_INTERVAL:
+                traced: str = (
+                    f", Python heap {sample.traced / MIB:6.2f} MiB"
+                    if sample.traced is not None
+                    else ""
+                )
+                print(
+                    f"  {sample.position / 3600:5.1f}h  RSS {sample.rss / MIB:6.2f} MiB{traced}"
+                )
+
+        start, last = self.after_warmup(), self.samples[-1]
+        hours: float = max((last.position - start.position) / 3600, 1e-9)
+        growth: int = last.rss - start.rss
+        print(
+            f"RSS after warm-up {start.rss / MIB:.2f} MiB, at the end {last.rss / MIB:.2f} MiB "
+            f"({growth / MIB:+.2f} MiB, {growth / MIB / hours:+.3f} MiB/h)"
+        )
+        if start.traced is not None and last.traced is not None:
+            growth = last.traced - start.traced
+            print(
+                f"Python heap after warm-up {start.traced / MIB:.2f} MiB, at the end {last.traced / MIB:.2f} MiB "
+                f"({growth / 1024:+.1f} KiB, {growth / 1024 / hours:+.2f} KiB/h)"
+            )
+        if self.warmup_snapshot is not None and self.final_snapshot is not None:
+            print("Largest growth since the warm-up:")
+            for stat in self.final_snapshot.compare_to(self.warmup_snapshot, "lineno")[
+                :10
+            ]:
+                print(f"  {stat}")
+
+
+async def run_benchmark(hours: float, speed: float) -> MemoryReport:
+    """Replays a synthetic session, and samples the memory in use every MEMORY_SAMPLE_INTERVAL."""
+    events, responses = synthetic_session(hours=hours)
+    report = MemoryReport(hours=hours, events=len(events))
+    process = psutil.Process(os.getpid())
+    next_sample: float = 0.0
+
+    def sample(position: float) -> None:
+        nonlocal next_sample
+        if position < next_sample:
+            return
+        next_sample += MEMORY_SAMPLE_INTERVAL
+        # Only what is still referenced counts, not what the collector did not get to yet.
+        gc.collect()
+        report.samples.append(
+            MemorySample(
+                position=position,
+                rss=process.memory_info().rss,
+                traced=(
+                    tracemalloc.get_traced_memory()[0]
+                    if tracemalloc.is_tracing()
+                    else None
+                ),
+            )
+        )
+        if (
+            tracemalloc.is_tracing()
+            and report.warmup_snapshot is None
+            and position >= MEMORY_WARMUP
+        ):
+            report.warmup_snapshot = tracemalloc.take_snapshot()
+
+    started: float = time.perf_counter()
+    await replay_events(
+        events=events, responses=responses, speed=speed, on_event=sample
+    )
+    report.duration = time.perf_counter() - started
+    sample(position=max(next_sample, hours * 3600))
+    if tracemalloc.is_tracing():
+        report.final_snapshot = tracemalloc.take_snapshot()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure the memory footprint of LeagueRPC over a simulated session."
+    )
+    parser.add_argument(
+        "--hours",
+        type=float,
+        default=24.0,
+        help="Length of the simulated session, in hours.",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1440.0,
+        help="Simulation speed. 1440 runs a simulated day in one minute.",
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="Also trace the Python allocations, and list the ones that grew the most.",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Hide the output of the handlers, and only print the report.",
+    )
+    args: argparse.Namespace = parser.parse_args()
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with (
+            contextlib.redirect_stdout(devnull)
+            if args.quiet
+            else contextlib.nullcontext()
+        ):
+            report: MemoryReport = asyncio.run(
+                run_benchmark(hours=args.hours, speed=args.speed)
+            )
+    report.print()
+
+
+if __name__ == "__main__":
+    main()
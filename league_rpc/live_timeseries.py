@@ -0,0 +1,335 @@
+"""
+Records the live game at a fixed rate (1 Hz by default) to a compact columnar file, for analysing games and for
+benchmarks that replay realistic games. Enabled with --record-game <directory>, which writes one file per game.
+
+Every field (game time, gold, level, creep score, kills, deaths, assists) is kept as a typed array, and written
+as one contiguous column after a fixed header and a column directory:
+
+    header     magic (8s) · version (H) · column count (H) · sample count (I) · sample interval (d) · started at (d)
+    directory  per column: name (16s) · array typecode (1s) · padding (7x) · offset of its data (Q)
+    data       the columns, each aligned to 8 bytes
+
+Everything is little-endian. read_timeseries() maps the file into memory, and returns the columns as memoryviews
+of the mapping, so nothing is copied when reading.
+
+The recorder samples the live client API from a thread of its own, with a keep-alive session, so it never waits
+in line with the presence loop for the blocking executor. The file is rewritten every TIMESERIES_FLUSH_INTERVAL
+and when the game ends.
+
+Usage:
+    python -m league_rpc.live_timeseries FILE
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+import requests
+import urllib3
+
+from league_rpc.utils.color import Color
+from league_rpc.utils.const import (
+    ACTIVE_PLAYER_URL,
+    GAME_STATS_URL,
+    PLAYER_KDA_SCORES_URL,
+    TIMESERIES_FLUSH_INTERVAL,
+    TIMESERIES_REQUEST_TIMEOUT,
+)
+from league_rpc.utils.metrics import SOURCE_LIVE_CLIENT
+from league_rpc.utils.polling import timed_request
+
+urllib3.disable_warnings()
+
+TIMESERIES_MAGIC = b"LRPCGAME"
+TIMESERIES_VERSION = 1
+TIMESERIES_SUFFIX = ".lrts"
+
+HEADER = struct.Struct("<8sHHIdd")
+COLUMN_ENTRY = struct.Struct("<16ss7xQ")
+COLUMN_ALIGNMENT = 8
+
+# The recorded fields, and the typecode of their array.
+COLUMNS: dict[str, str] = {
+    "game_time": "f",
+    "gold": "f",
+    "level": "B",
+    "creep_score": "H",
+    "kills": "H",
+    "deaths": "H",
+    "assists": "H",
+}
+
+
+def aligned(offset: int) -> int:
+    return -(-offset // COLUMN_ALIGNMENT) * COLUMN_ALIGNMENT
+
+
+@dataclass
+class TimeSeries:
+    """The samples of one game, as one typed array per field."""
+
+    sample_interval: float
+    started_at: float = field(default_factory=time.time)
+    columns: dict[str, array] = field(
+        default_factory=lambda: {
+            name: array(typecode) for name, typecode in COLUMNS.items()
+        }
+    )
+
+    def __len__(self) -> int:
+        return len(self.columns["game_time"])
+
+    def append(self, **values: float) -> None:
+        for name, column in self.columns.items():
+            column.append(values[name])
+
+    def to_bytes(self) -> bytes:
+        """Serializes the samples in the file format described in the module docstring."""
+        offset: int = aligned(HEADER.size + COLUMN_ENTRY.size * len(self.columns))
+        directory: list[bytes] = []
+        data: list[bytes] = []
+        for name, column in self.columns.items():
+            directory.append(
+                COLUMN_ENTRY.pack(
+                    name.encode("ascii"), column.typecode.encode(), offset
+                )
+            )
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            chunk: bytes = column.tobytes()
+            padding: bytes = bytes(aligned(len(chunk)) - len(chunk))
+            data.append(chunk + padding)
+            offset += len(chunk) + len(padding)
+
+        header: bytes = HEADER.pack(
+            TIMESERIES_MAGIC,
+            TIMESERIES_VERSION,
+            len(self.columns),
+            len(self),
+            self.sample_interval,
+            self.started_at,
+        ) + b"".join(directory)
+        return header + bytes(aligned(len(header)) - len(header)) + b"".join(data)
+
+    def save(self, path: str) -> None:
+        """Writes the file atomically, so a reader never sees half of it."""
+        temp_path: str = f"{path}.tmp"
+        with open(file=temp_path, mode="wb") as file:
+            file.write(self.to_bytes())
+        os.replace(src=temp_path, dst=path)
+
+
+@dataclass
+class MappedTimeSeries:
+    """A recorded game, mapped into memory. The columns are views of the mapping, valid until close()."""
+
+    sample_interval: float
+    started_at: float
+    samples: int
+    columns: dict[str, memoryview]
+    _mapping: mmap.mmap
+
+    def close(self) -> None:
+        for column in self.columns.values():
+            column.release()
+        self._mapping.close()
+
+    def __enter__(self) -> "MappedTimeSeries":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+def read_timeseries(path: str) -> MappedTimeSeries:
+    """Maps a recorded game into memory, without copying its columns. Raises a ValueError if it isn't one."""
+    with open(file=path, mode="rb") as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    columns: dict[str, memoryview] = {}
+    try:
+        magic, version, column_count, samples, sample_interval, started_at = (
+            HEADER.unpack_from(mapping, 0)
+        )
+        if magic != TIMESERIES_MAGIC or version != TIMESERIES_VERSION:
+            raise ValueError(f"{path} is not a recorded game.")
+        if sys.byteorder == "big":
+            raise ValueError(
+                "Recorded games can only be mapped on little-endian machines."
+            )
+
+        view = memoryview(mapping)
+        for index in range(column_count):
+            name, typecode, offset = COLUMN_ENTRY.unpack_from(
+                mapping, HEADER.size + index * COLUMN_ENTRY.size
+            )
+            size: int = array(typecode.decode()).itemsize * samples
+            columns[name.rstrip(b"\0").decode("ascii")] = view[
+                offset : offset + size
+            ].cast(typecode.decode())
+        view.release()
+    except (struct.error, ValueError, TypeError):
+        for column in columns.values():
+            column.release()
+        mapping.close()
+        raise
+    return MappedTimeSeries(
+        sample_interval=sample_interval,
+        started_at=started_at,
+        samples=samples,
+        columns=columns,
+        _mapping=mapping,
+    )
+
+
+@dataclass
+class LiveGameRecorder:
+    """A dataclass sampling the live client API on a thread of its own, writing one file per game to `directory`."""
+
+    directory: str
+    rate: float = 1.0
+
+    _thread: Optional[threading.Thread] = None
+    _stop: threading.Event = field(default_factory=threading.Event)
+
+    def start(self) -> None:
+        """
+        Starts recording a new game. Does nothing while one is recorded. The thread of the last game may still
+        be saving it, or waiting for a request: it is left to finish on its own, with its own path and stop event.
+        """
+        if (
+            self._thread is not None
+            and self._thread.is_alive()
+            and not self._stop.is_set()
+        ):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path: str = os.path.join(
+            self.directory,
+            f"game-{datetime.now():%Y%m%d-%H%M%S}{TIMESERIES_SUFFIX}",
+        )
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(path, self._stop),
+            name="live-timeseries",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, wait: bool = False) -> None:
+        """Stops recording. The thread writes the file before it ends; with `wait`, that is waited for."""
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def _run(self, path: str, stop: threading.Event) -> None:
+        interval: float = 1 / self.rate
+        series = TimeSeries(sample_interval=interval)
+        riot_id: Optional[str] = None
+        next_sample: float = time.monotonic()
+        next_flush: float = next_sample + TIMESERIES_FLUSH_INTERVAL
+
+        with requests.Session() as session:
+            while not stop.is_set():
+                try:
+                    riot_id = self._sample(
+                        series=series, session=session, riot_id=riot_id
+                    )
+                except (requests.exceptions.RequestException, ValueError, KeyError):
+                    # The game is loading, or just ended.
+                    pass
+
+                now: float = time.monotonic()
+                if now >= next_flush and len(series):
+                    self._save(series=series, path=path)
+                    next_flush = now + TIMESERIES_FLUSH_INTERVAL
+                # Skip the samples that were missed, rather than catching up on them.
+                next_sample = max(next_sample + interval, now)
+                stop.wait(next_sample - now)
+
+        if len(series):
+            self._save(series=series, path=path)
+            print(
+                f"{Color.dgray}Recorded {len(series)} samples of the game to {path}{Color.reset}"
+            )
+
+    @staticmethod
+    def _sample(
+        series: TimeSeries, session: requests.Session, riot_id: Optional[str]
+    ) -> str:
+        """Adds a sample, unless the game time did not move since the last one. Returns the riot id of the player."""
+
+        def get(url: str) -> Any:
+            response: requests.Response = timed_request(
+                "GET",
+                url,
+                source=SOURCE_LIVE_CLIENT,
+                session=session,
+                timeout=TIMESERIES_REQUEST_TIMEOUT,
+                verify=False,
+            )
+            response.raise_for_status()
+            return response.json()
+
+        active_player: dict[str, Any] = get(ACTIVE_PLAYER_URL)
+        riot_id = riot_id or active_player["riotId"]
+        game_time: float = float(get(GAME_STATS_URL)["gameTime"])
+        game_times: array = series.columns["game_time"]
+        if game_times and game_time <= game_times[-1]:
+            # Paused, or still loading.
+            return riot_id
+        scores: dict[str, Any] = get(
+            PLAYER_KDA_SCORES_URL.format_map({"riotId": riot_id})
+        )
+        series.append(
+            game_time=game_time,
+            gold=float(active_player.get("currentGold", 0)),
+            level=int(active_player.get("level", 0)),
+            creep_score=int(scores.get("creepScore", 0)),
+            kills=int(scores.get("kills", 0)),
+            deaths=int(scores.get("deaths", 0)),
+            assists=int(scores.get("assists", 0)),
+        )
+        return riot_id
+
+    @staticmethod
+    def _save(series: TimeSeries, path: str) -> None:
+        try:
+            series.save(path)
+        except OSError as exc:
+            print(
+                f"{Color.orange}Could not save the game recording: {exc}{Color.reset}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Print the summary of a game recorded with --record-game."
+    )
+    parser.add_argument("file", help="A recorded game.")
+    args: argparse.Namespace = parser.parse_args()
+
+    with read_timeseries(args.file) as series:
+        print(
+            f"{series.samples} samples, every {series.sample_interval:g}s, "
+            f"recorded {datetime.fromtimestamp(series.started_at):%Y-%m-%d %H:%M}"
+        )
+        if not series.samples:
+            return
+        for name, column in series.columns.items():
+            print(
+                f"  {name:<12} {column.format:>2}  first {column[0]:>8g}  last {column[-1]:>8g}"
+            )
+
+
+if __name__ == "__main__":
+    main()
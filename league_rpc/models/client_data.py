@@ -18,7 +18,7 @@ from dataclasses import dataclass, field
 from league_rpc.models.lcu.current_ranked_stats import ArenaStats, RankedStats, TFTStats
 
 
-@dataclass
+@dataclass(slots=True)
 class ClientData:
     """Stores data relevant to the player's current session, including their availability,
     game mode, lobby details, and ranked statistics. The class uses the dataclass decorator
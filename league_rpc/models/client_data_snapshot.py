@@ -0,0 +1,171 @@
+"""
+This module defines the ClientDataSnapshot class, which persists the last known ClientData to a small
+state file, so a restarted LeagueRPC can publish a provisional presence before the LCU API is reachable.
+
+Only the fields that change slowly are persisted: the summoner icon and level, the ranks, the availability and
+the queue. The gameflow phase, the lobby and the timestamps describe a session that is over after a restart,
+so they are never saved nor restored.
+
+Usage:
+    Call save() whenever the ClientData changed. Writes are coalesced, so bursts of changes only
+    result in a single write. Call load() on startup, before the base data is gathered from the LCU API,
+    and the fresh data will simply overwrite the restored fields once it arrives.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from threading import Lock
+from typing import Any, Optional
+
+from league_rpc.models.client_data import ClientData
+from league_rpc.models.lcu.current_ranked_stats import (
+    ArenaStats,
+    RankedStats,
+    TFTStats,
+    intern_stats,
+)
+from league_rpc.utils.color import Color
+from league_rpc.utils.const import CLIENT_STATE_MIN_WRITE_INTERVAL
+from league_rpc.utils.executor import blocking_executor
+from league_rpc.utils.paths import get_data_file
+
+STATE_FILE_NAME = "client_state.json"
+STATE_FILE_VERSION = 1
+
+# The fields of ClientData that are saved and restored.
+PERSISTED_FIELDS: tuple[str, ...] = (
+    "availability",
+    "queue",
+    "queue_type",
+    "queue_id",
+    "queue_is_ranked",
+    "summoner_icon",
+    "summoner_level",
+    "summoner_rank",
+    "summoner_rank_flex",
+    "arena_rank",
+    "tft_rank",
+)
+
+# Nested dataclasses in ClientData, and how to rebuild them from a plain dict.
+NESTED_FIELDS: dict[str, type] = {
+    "summoner_rank": RankedStats,
+    "summoner_rank_flex": RankedStats,
+    "arena_rank": ArenaStats,
+    "tft_rank": TFTStats,
+}
+
+
+@dataclass
+class ClientDataSnapshot:
+    """A dataclass responsible for reading and writing the ClientData state file,
+    writing at most once every `min_interval` seconds, and only when the data actually changed.
+    """
+
+    path: str = field(default_factory=lambda: get_data_file(STATE_FILE_NAME))
+    min_interval: float = CLIENT_STATE_MIN_WRITE_INTERVAL
+
+    _last_written: Optional[str] = None
+    _last_write_time: float = 0.0
+    _pending: Optional[str] = None
+    _timer: Optional[asyncio.TimerHandle] = None
+    _lock: Lock = field(default_factory=Lock)
+
+    def load(self, data: ClientData) -> bool:
+        """Restores the last known state into the given ClientData. Returns whether anything was restored."""
+        try:
+            with open(file=self.path, mode="r", encoding="utf-8") as file:
+                state: dict[str, Any] = json.load(fp=file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        if state.get("version") != STATE_FILE_VERSION:
+            return False
+
+        for name, value in state.get("client_data", {}).items():
+            if name not in PERSISTED_FIELDS:
+                continue
+            if name in NESTED_FIELDS:
+                try:
+                    value = intern_stats(NESTED_FIELDS[name](**value))
+                except TypeError:
+                    # Saved by a version whose ranked stats had other fields: the LCU API will fill them in.
+                    continue
+            setattr(data, name, value)
+
+        self._last_written = self._serialize(data)
+        return True
+
+    def save(self, data: ClientData) -> None:
+        """
+        Schedules a write of the given ClientData, coalescing it with other writes in the same interval.
+        On the event loop, the write is done in the executor, so the loop never waits for the disk.
+        """
+        serialized: str = self._serialize(data)
+        with self._lock:
+            if serialized == self._last_written:
+                self._pending = None
+                return
+            self._pending = serialized
+
+            if self._timer is not None:
+                # A write is already scheduled, and will pick up the latest state.
+                return
+
+            try:
+                loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                delay: float = max(
+                    self._last_write_time + self.min_interval - time.monotonic(), 0
+                )
+                self._timer = loop.call_later(
+                    delay, loop.run_in_executor, blocking_executor, self.flush
+                )
+                return
+
+        self.flush()
+
+    def flush(self) -> None:
+        """Writes the pending state to disk, if there is any."""
+        with self._lock:
+            if self._timer is not None:
+                # Flushing now makes the scheduled write redundant.
+                self._timer.cancel()
+                self._timer = None
+            serialized: Optional[str] = self._pending
+            self._pending = None
+            if serialized is None:
+                return
+            self._last_written = serialized
+            self._last_write_time = time.monotonic()
+
+        temp_path: str = f"{self.path}.tmp"
+        try:
+            with open(file=temp_path, mode="w", encoding="utf-8") as file:
+                file.write(serialized)
+            # Replace the state file atomically, so a crash never leaves a half written file.
+            os.replace(src=temp_path, dst=self.path)
+        except OSError as exc:
+            print(f"{Color.orange}Could not save the client state: {exc}{Color.reset}")
+
+    @staticmethod
+    def _serialize(data: ClientData) -> str:
+        return json.dumps(
+            {
+                "version": STATE_FILE_VERSION,
+                "client_data": {
+                    name: (
+                        asdict(getattr(data, name))
+                        if name in NESTED_FIELDS
+                        else getattr(data, name)
+                    )
+                    for name in PERSISTED_FIELDS
+                },
+            },
+            sort_keys=True,
+        )
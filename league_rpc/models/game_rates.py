@@ -0,0 +1,177 @@
+"""
+This module defines the GameRates class, which turns the values sampled by the in-game loop (creep score, gold,
+kills, deaths and assists) into per-minute rates and a KDA ratio, to show next to the raw stats in the presence.
+
+Usage:
+    Call sample() on every refresh of the in-game presence, with the game time from gametime.py and the scores
+    from kda.py. Every sample is an O(1) update: the rates are taken between the newest sample and the oldest one
+    still in a fixed-size ring buffer, so they follow the last few minutes of the game without ever going
+    through the history again.
+
+    Which rates are shown can be chosen per game mode with --rates, for example `--rates ARAM=kda,gold cs`.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from league_rpc.utils.const import GAME_MODE_CONVERT_MAP, RATE_WINDOW_SAMPLES
+
+RATE_CS = "cs"
+RATE_GOLD = "gold"
+RATE_KDA = "kda"
+ALL_RATES: tuple[str, ...] = (RATE_CS, RATE_GOLD, RATE_KDA)
+
+# The key of the rates that are shown in every game mode without a selection of its own.
+ALL_GAME_MODES = "*"
+
+
+@dataclass(slots=True)
+class RingBuffer:
+    """Holds the last `capacity` samples of a value, as (game time, value) pairs. The oldest sample is overwritten."""
+
+    capacity: int
+    _times: list[float] = field(default_factory=list)
+    _values: list[float] = field(default_factory=list)
+    # Index of the oldest sample, once the buffer is full.
+    _start: int = 0
+
+    def append(self, time: float, value: float) -> None:
+        if len(self._times) < self.capacity:
+            self._times.append(time)
+            self._values.append(value)
+            return
+        self._times[self._start] = time
+        self._values[self._start] = value
+        self._start = (self._start + 1) % self.capacity
+
+    def oldest(self) -> tuple[float, float]:
+        return self._times[self._start], self._values[self._start]
+
+    def newest(self) -> tuple[float, float]:
+        index: int = (self._start - 1) % len(self._times)
+        return self._times[index], self._values[index]
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+
+@dataclass(slots=True)
+class PerMinuteRate:
+    """The per-minute rate of a value that only grows, such as the creep score, over the samples in its window."""
+
+    samples: RingBuffer
+
+    def add(self, time: float, total: float) -> None:
+        self.samples.append(time=time, value=total)
+
+    @property
+    def per_minute(self) -> Optional[float]:
+        if len(self.samples) < 2:
+            return None
+        (first_time, first_total), (last_time, last_total) = (
+            self.samples.oldest(),
+            self.samples.newest(),
+        )
+        if last_time <= first_time:
+            return None
+        return (last_total - first_total) * 60 / (last_time - first_time)
+
+
+def new_rate(window: int) -> PerMinuteRate:
+    return PerMinuteRate(samples=RingBuffer(capacity=window))
+
+
+@dataclass
+class GameRates:
+    """A dataclass computing the CS/min, gold/min and KDA ratio of the game that is being played."""
+
+    window: int = RATE_WINDOW_SAMPLES
+
+    kills: int = 0
+    deaths: int = 0
+    assists: int = 0
+    cs: PerMinuteRate = field(init=False)
+    gold: PerMinuteRate = field(init=False)
+    # The live client API only reports the gold that can be spent, so the earned gold is summed from its increases.
+    gold_earned: float = 0.0
+    _last_gold: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        self.cs = new_rate(window=self.window)
+        self.gold = new_rate(window=self.window)
+        # Every game starts without creeps, so the early rate is the one of the whole game so far.
+        self.cs.add(time=0, total=0)
+
+    def sample(
+        self,
+        game_time: float,
+        creep_score: Optional[int] = None,
+        gold: Optional[float] = None,
+        kills: Optional[int] = None,
+        deaths: Optional[int] = None,
+        assists: Optional[int] = None,
+    ) -> None:
+        """Adds the values of one refresh. Values that were not fetched are left out."""
+        if creep_score is not None:
+            self.cs.add(time=game_time, total=creep_score)
+        if gold is not None:
+            if self._last_gold is not None and gold > self._last_gold:
+                self.gold_earned += gold - self._last_gold
+            self._last_gold = gold
+            self.gold.add(time=game_time, total=self.gold_earned)
+        if kills is not None:
+            self.kills = kills
+        if deaths is not None:
+            self.deaths = deaths
+        if assists is not None:
+            self.assists = assists
+
+    @property
+    def kda_ratio(self) -> float:
+        return (self.kills + self.assists) / max(self.deaths, 1)
+
+    def format(self, rates: tuple[str, ...]) -> str:
+        """Returns the selected rates as presence text, such as "· 7.2 cs/min · 6.0 KDA". Empty if none are known yet."""
+        parts: list[str] = []
+        for rate in rates:
+            if rate == RATE_CS and (cs_per_minute := self.cs.per_minute) is not None:
+                parts.append(f"{cs_per_minute:.1f} cs/min")
+            elif (
+                rate == RATE_GOLD
+                and (gold_per_minute := self.gold.per_minute) is not None
+            ):
+                parts.append(f"{gold_per_minute:.0f} g/min")
+            elif rate == RATE_KDA:
+                parts.append(f"{self.kda_ratio:.1f} KDA")
+        return "".join(f" · {part}" for part in parts)
+
+
+def parse_rates(values: list[str]) -> dict[str, tuple[str, ...]]:
+    """
+    Parses the values of --rates. Each one is either a list of rates for every game mode ("cs,kda"),
+    or for one game mode ("ARAM=kda,gold"). Raises a ValueError on an unknown rate.
+    """
+    selection: dict[str, tuple[str, ...]] = {}
+    for value in values:
+        game_mode, _, names = value.rpartition("=")
+        rates: tuple[str, ...] = tuple(
+            name.strip().lower() for name in names.split(",") if name.strip()
+        )
+        if unknown := [rate for rate in rates if rate not in ALL_RATES]:
+            raise ValueError(
+                f"Unknown rate {', '.join(unknown)}. Choose from {', '.join(ALL_RATES)}."
+            )
+        key: str = (
+            GAME_MODE_CONVERT_MAP.get(game_mode.upper(), game_mode).lower()
+            if game_mode
+            else ALL_GAME_MODES
+        )
+        selection[key] = rates
+    return selection
+
+
+def rates_for_game_mode(
+    selection: dict[str, tuple[str, ...]], game_mode: str
+) -> tuple[str, ...]:
+    """Returns the rates to show in the game mode, as shown in the presence (such as "Summoner's Rift")."""
+    return selection.get(game_mode.lower(), selection.get(ALL_GAME_MODES, ()))
@@ -0,0 +1,272 @@
+"""
+This module defines the GameflowStateMachine class, the single source of truth for where the player is: in the
+client, in a lobby, in queue, in champ select, in game or in the post-game screens. It combines the gameflow phase
+reported by the LCU API with the League processes that are running, so the LCU handlers and the in-game loop can
+never disagree about who owns the presence, for example while reconnecting to a game, or after a failed launch.
+
+Usage:
+    Feed the machine with update(), whenever the gameflow phase or the running processes change. Every change of
+    state goes through the TRANSITIONS table, runs the exit hooks of the old state and the entry hooks of the new
+    one, and adds the time spent in the old state to `durations`. Work that is only relevant to one state, such as
+    polling the live client API while in game, is started by an entry hook and stopped by an exit hook, and
+    poll_interval tells the process watcher how often to look again in the current state.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from league_rpc.models.lcu.gameflow_phase import GameFlowPhase
+from league_rpc.utils.color import Color
+
+
+class ClientState:
+    """Enumerates the states the player can be in, each covering one or more gameflow phases."""
+
+    CLOSED = "Closed"
+    IN_CLIENT = "InClient"
+    IN_LOBBY = "InLobby"
+    IN_QUEUE = "InQueue"
+    IN_CHAMP_SELECT = "InChampSelect"
+    IN_GAME = "InGame"
+    POST_GAME = "PostGame"
+
+
+# The state of every gameflow phase. Phases missing here are shown as in client.
+GAMEFLOW_STATES: dict[str, str] = {
+    GameFlowPhase.NONE: ClientState.IN_CLIENT,
+    GameFlowPhase.TERMINATED_IN_ERROR: ClientState.IN_CLIENT,
+    GameFlowPhase.LOBBY: ClientState.IN_LOBBY,
+    GameFlowPhase.CHECKED_INTO_TOURNAMENT: ClientState.IN_LOBBY,
+    GameFlowPhase.MATCHMAKING: ClientState.IN_QUEUE,
+    GameFlowPhase.READY_CHECK: ClientState.IN_QUEUE,
+    GameFlowPhase.CHAMP_SELECT: ClientState.IN_CHAMP_SELECT,
+    GameFlowPhase.GAME_START: ClientState.IN_CHAMP_SELECT,
+    # The game is about to start. The client offers to try again, so keep showing champ select.
+    GameFlowPhase.FAILED_TO_LAUNCH: ClientState.IN_CHAMP_SELECT,
+    GameFlowPhase.IN_PROGRESS: ClientState.IN_GAME,
+    # The game is still going on while the player reconnects to it.
+    GameFlowPhase.RECONNECT: ClientState.IN_GAME,
+    GameFlowPhase.WAITING_FOR_STATS: ClientState.POST_GAME,
+    GameFlowPhase.PRE_END_OF_GAME: ClientState.POST_GAME,
+    GameFlowPhase.END_OF_GAME: ClientState.POST_GAME,
+}
+
+ALL_STATES: frozenset[str] = frozenset(
+    {
+        ClientState.CLOSED,
+        ClientState.IN_CLIENT,
+        ClientState.IN_LOBBY,
+        ClientState.IN_QUEUE,
+        ClientState.IN_CHAMP_SELECT,
+        ClientState.IN_GAME,
+        ClientState.POST_GAME,
+    }
+)
+
+# The states each state can change to. Any other change means events were missed: it is still followed,
+# as the LCU API and the processes are always right, but it is counted in unexpected_transitions.
+TRANSITIONS: dict[str, frozenset[str]] = {
+    # The client can be (re)started in any state, for example in the middle of a game.
+    ClientState.CLOSED: ALL_STATES - {ClientState.CLOSED},
+    ClientState.IN_CLIENT: frozenset(
+        {
+            ClientState.CLOSED,
+            ClientState.IN_LOBBY,
+            ClientState.IN_GAME,
+            ClientState.POST_GAME,
+        }
+    ),
+    ClientState.IN_LOBBY: frozenset(
+        {
+            ClientState.CLOSED,
+            ClientState.IN_CLIENT,
+            ClientState.IN_QUEUE,
+            ClientState.IN_CHAMP_SELECT,
+            ClientState.IN_GAME,
+        }
+    ),
+    ClientState.IN_QUEUE: frozenset(
+        {
+            ClientState.CLOSED,
+            ClientState.IN_CLIENT,
+            ClientState.IN_LOBBY,
+            ClientState.IN_CHAMP_SELECT,
+        }
+    ),
+    ClientState.IN_CHAMP_SELECT: frozenset(
+        {
+            ClientState.CLOSED,
+            ClientState.IN_CLIENT,
+            ClientState.IN_LOBBY,
+            ClientState.IN_QUEUE,
+            ClientState.IN_GAME,
+        }
+    ),
+    ClientState.IN_GAME: frozenset(
+        {
+            ClientState.CLOSED,
+            ClientState.IN_CLIENT,
+            ClientState.IN_LOBBY,
+            ClientState.POST_GAME,
+        }
+    ),
+    ClientState.POST_GAME: frozenset(
+        {
+            ClientState.CLOSED,
+            ClientState.IN_CLIENT,
+            ClientState.IN_LOBBY,
+            ClientState.IN_QUEUE,
+        }
+    ),
+}
+
+# How often the League processes are checked in each state (seconds). Queue and champ select are checked
+# often, as the game process starts soon. In the other states the LCU events already report every change.
+POLL_INTERVALS: dict[str, float] = {
+    ClientState.CLOSED: 5.0,
+    ClientState.IN_CLIENT: 10.0,
+    ClientState.IN_LOBBY: 10.0,
+    ClientState.IN_QUEUE: 2.0,
+    ClientState.IN_CHAMP_SELECT: 2.0,
+    ClientState.IN_GAME: 10.0,
+    ClientState.POST_GAME: 5.0,
+}
+
+# States in which a running game process means the player is in game, even before the LCU API says so.
+GAME_PROCESS_STATES: frozenset[str] = frozenset(
+    {ClientState.IN_CLIENT, ClientState.IN_CHAMP_SELECT}
+)
+
+
+@dataclass
+class StateTransition:
+    """A change of state, passed to the entry and exit hooks."""
+
+    previous: str
+    current: str
+    phase: str
+    # How long the previous state lasted (seconds).
+    duration: float
+    expected: bool = True
+
+
+StateHook = Callable[[StateTransition], None]
+
+
+@dataclass
+class GameflowStateMachine:
+    """A dataclass tracking the state of the player, running the entry and exit hooks on every change of state,
+    and recording how much time is spent in each state.
+    """
+
+    state: str = ClientState.CLOSED
+    phase: str = GameFlowPhase.NONE
+    client_running: bool = False
+    game_running: bool = False
+
+    # Total time spent in each state, not counting the current one (seconds).
+    durations: dict[str, float] = field(default_factory=dict)
+    transitions: int = 0
+    unexpected_transitions: int = 0
+
+    _entered_at: float = field(default_factory=time.monotonic)
+    _entry_hooks: dict[str, list[StateHook]] = field(default_factory=dict)
+    _exit_hooks: dict[str, list[StateHook]] = field(default_factory=dict)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def on_enter(self, state: str, hook: StateHook) -> None:
+        """Runs the hook every time the state is entered."""
+        self._entry_hooks.setdefault(state, []).append(hook)
+
+    def on_exit(self, state: str, hook: StateHook) -> None:
+        """Runs the hook every time the state is left."""
+        self._exit_hooks.setdefault(state, []).append(hook)
+
+    @property
+    def poll_interval(self) -> float:
+        return POLL_INTERVALS[self.state]
+
+    def time_in_state(self, state: Optional[str] = None) -> float:
+        """Returns the total time spent in the given state (the current one by default), including right now."""
+        state = state or self.state
+        total: float = self.durations.get(state, 0.0)
+        if state == self.state:
+            total += time.monotonic() - self._entered_at
+        return total
+
+    def resolve(self) -> str:
+        """Returns the state that the current phase and processes add up to."""
+        if not self.client_running:
+            return ClientState.CLOSED
+        state: str = GAMEFLOW_STATES.get(self.phase, ClientState.IN_CLIENT)
+        if self.game_running and state in GAME_PROCESS_STATES:
+            # The game process is up before the LCU API reports it, and also when the app started mid-game.
+            return ClientState.IN_GAME
+        return state
+
+    def update(
+        self,
+        phase: Optional[str] = None,
+        client_running: Optional[bool] = None,
+        game_running: Optional[bool] = None,
+    ) -> bool:
+        """
+        Updates the inputs that were given, and changes state if needed. Returns whether the state changed.
+        Must be called from the event loop, as the hooks may start tasks.
+        """
+        if phase is not None:
+            self.phase = phase
+        if client_running is not None:
+            self.client_running = client_running
+        if game_running is not None:
+            self.game_running = game_running
+
+        state: str = self.resolve()
+        if state == self.state:
+            return False
+        self._transition(state)
+        return True
+
+    def _transition(self, state: str) -> None:
+        now: float = time.monotonic()
+        transition = StateTransition(
+            previous=self.state,
+            current=state,
+            phase=self.phase,
+            duration=now - self._entered_at,
+            expected=state in TRANSITIONS[self.state],
+        )
+        self.durations[self.state] = (
+            self.durations.get(self.state, 0.0) + transition.duration
+        )
+        self.transitions += 1
+        if not transition.expected:
+            self.unexpected_transitions += 1
+            print(
+                f"{Color.dgray}Unexpected change from {transition.previous} to {state} ({self.phase}){Color.reset}"
+            )
+
+        for hook in self._exit_hooks.get(transition.previous, []):
+            hook(transition)
+        self.state = state
+        self._entered_at = now
+        for hook in self._entry_hooks.get(state, []):
+            hook(transition)
+
+        # Wake up whoever waits for the next change of state.
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> Awaitable[bool]:
+        """Waits until the state changes after this call, or the timeout passed. Returns whether the state changed."""
+        return self._wait(changed=self._changed, timeout=timeout)
+
+    @staticmethod
+    async def _wait(changed: asyncio.Event, timeout: Optional[float]) -> bool:
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
@@ -11,10 +11,17 @@ Usage:
     statistical analysis, and integration with other systems or user interfaces.
 """
 
+import functools
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, ClassVar, Optional, TypeVar
 
-from league_rpc.utils.const import LEAGUE_CHERRY_RANKED_EMBLEM, LEAGUE_RANKED_EMBLEM
+from league_rpc.utils.const import (
+    LEAGUE_CHERRY_RANKED_EMBLEM,
+    LEAGUE_RANKED_EMBLEM,
+    RANKED_STATS_CACHE_SIZE,
+)
+
+S = TypeVar("S", "RankedStats", "ArenaStats", "TFTStats")
 
 
 class LolRankedRankedQueueWarnings:
@@ -71,7 +78,16 @@ class LolRankedRankedStats:
     # Constructor and other methods as needed
 
 
-@dataclass
+@functools.lru_cache(maxsize=RANKED_STATS_CACHE_SIZE)
+def intern_stats(stats: S) -> S:
+    """
+    Returns the first instance that was equal to the given one. Ranked events repeat the same rank
+    all day long, so an unchanged rank stays one shared object instead of a new one per event.
+    """
+    return stats
+
+
+@dataclass(frozen=True, slots=True)
 class RankedStats:
     """A dataclass to encapsulate specific ranked statistics for standard ranked queues,
     providing methods for easy initialization from API data and formatted string representation.
@@ -80,6 +96,8 @@ class RankedStats:
     division: Optional[str] = None
     tier: Optional[str] = None
     league_points: Optional[int] = None
+    wins: Optional[int] = None
+    losses: Optional[int] = None
 
     @classmethod
     def from_map(
@@ -87,16 +105,24 @@ class RankedStats:
         obj_map: dict[str, Any],
         ranked_type: str,
     ) -> "RankedStats":
-        return cls(
-            division=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
-                LolRankedRankedQueueStats.DIVISION
-            ],
-            tier=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
-                LolRankedRankedQueueStats.TIER
-            ].capitalize(),
-            league_points=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
-                LolRankedRankedQueueStats.LEAGUE_POINTS
-            ],
+        return intern_stats(
+            cls(
+                division=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
+                    LolRankedRankedQueueStats.DIVISION
+                ],
+                tier=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
+                    LolRankedRankedQueueStats.TIER
+                ].capitalize(),
+                league_points=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
+                    LolRankedRankedQueueStats.LEAGUE_POINTS
+                ],
+                wins=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type].get(
+                    LolRankedRankedQueueStats.WINS
+                ),
+                losses=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type].get(
+                    LolRankedRankedQueueStats.LOSSES
+                ),
+            )
         )
 
     def __str__(self) -> str:
@@ -109,7 +135,7 @@ class RankedStats:
         return small_text, small_image
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ArenaStats:
     """Similar to RankedStats, but tailored for the Arena (Project Cherry) ranked mode,
     including unique fields and mappings specific to this mode.
@@ -119,7 +145,7 @@ class ArenaStats:
     tier: Optional[str] = None
     rated_rating: Optional[int] = None
 
-    tier_label_mapper = {
+    tier_label_mapper: ClassVar[dict[str, str]] = {
         "NONE": "",
         "GRAY": "Wood",
         "GREEN": "Bronze",
@@ -137,17 +163,19 @@ class ArenaStats:
         if not obj_map[LolRankedRankedStats.QUEUE_MAP].get(ranked_type):
             # Arena (CHERRY) is not always available to play.
             # So when it's not, we make an early return of an instance with default values.
-            return cls()
+            return intern_stats(cls())
 
         rated_tier = obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
             LolRankedRankedQueueStats.RATED_TIER
         ]
-        return cls(
-            rated_tier=rated_tier,
-            tier=cls.tier_label_mapper[rated_tier],
-            rated_rating=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
-                LolRankedRankedQueueStats.RATED_RATING
-            ],
+        return intern_stats(
+            cls(
+                rated_tier=rated_tier,
+                tier=cls.tier_label_mapper[rated_tier],
+                rated_rating=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
+                    LolRankedRankedQueueStats.RATED_RATING
+                ],
+            )
         )
 
     def __str__(self) -> str:
@@ -160,7 +188,7 @@ class ArenaStats:
         return small_text, small_image
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TFTStats:
     """A dataclass for encapsulating Teamfight Tactics (TFT) ranked data, structured similarly to RankedStats,
     with methods for data extraction and formatted output.
@@ -169,6 +197,8 @@ class TFTStats:
     division: Optional[str] = None
     league_points: Optional[int] = None
     tier: Optional[str] = None
+    wins: Optional[int] = None
+    losses: Optional[int] = None
 
     @classmethod
     def from_map(
@@ -176,16 +206,24 @@ class TFTStats:
         obj_map: dict[str, Any],
         ranked_type: str = "RANKED_TFT",
     ) -> "TFTStats":
-        return cls(
-            division=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
-                LolRankedRankedQueueStats.DIVISION
-            ],
-            league_points=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
-                LolRankedRankedQueueStats.LEAGUE_POINTS
-            ],
-            tier=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
-                LolRankedRankedQueueStats.TIER
-            ].capitalize(),
+        return intern_stats(
+            cls(
+                division=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
+                    LolRankedRankedQueueStats.DIVISION
+                ],
+                league_points=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
+                    LolRankedRankedQueueStats.LEAGUE_POINTS
+                ],
+                tier=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type][
+                    LolRankedRankedQueueStats.TIER
+                ].capitalize(),
+                wins=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type].get(
+                    LolRankedRankedQueueStats.WINS
+                ),
+                losses=obj_map[LolRankedRankedStats.QUEUE_MAP][ranked_type].get(
+                    LolRankedRankedQueueStats.LOSSES
+                ),
+            )
         )
 
     def __str__(self) -> str:
@@ -0,0 +1,33 @@
+"""
+This module contains the fields for extracting information from /lol-maps/v2/maps
+"""
+
+
+class LolMapsMaps:
+    """Contains constants for the fields of a single map entry, which describes a map and game mode combination,
+    including its display names and the client assets used to represent it.
+    """
+
+    ASSETS = "assets"
+    CATEGORIZED_CONTENT_BUNDLES = "categorizedContentBundles"
+    DESCRIPTION = "description"
+    GAME_MODE = "gameMode"
+    GAME_MODE_NAME = "gameModeName"
+    GAME_MODE_SHORT_NAME = "gameModeShortName"
+    GAME_MUTATOR = "gameMutator"
+    ID = "id"
+    IS_RGM = "isRGM"
+    MAP_STRING_ID = "mapStringId"
+    NAME = "name"
+    PLATFORM_ID = "platformId"
+    PLATFORM_NAME = "platformName"
+    PROPERTIES = "properties"
+
+
+class LolMapsMapAssets:
+    """Holds the asset keys of a map entry that are relevant to the presence."""
+
+    GAME_SELECT_ICON_HOVER = "game-select-icon-hover"
+
+    # Asset paths look like: .../gamemodeassets/{map_name}/img/game-select-icon-hover.png
+    GAME_MODE_ASSETS_DIR = "gamemodeassets/"
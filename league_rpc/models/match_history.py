@@ -0,0 +1,385 @@
+"""
+This module defines the MatchHistory class, a local, append-only record of every finished game: the champion and
+skin that were played, the game mode and queue, how long it lasted, the final score, and the LP before and after
+the game. It is stored in a SQLite database in WAL mode, next to the client state file.
+
+Usage:
+    The MatchRecorder follows the game that is being played: start() when the in-game data was gathered, sample()
+    on every refresh of the in-game presence, and finish() once the game is over and the ranked data after it came
+    in. finish() hands the record to MatchHistory.add(), which never touches the disk itself: records are batched,
+    and written by the blocking executor, so the in-game loop never waits for the disk.
+
+    last_games() returns the most recent games, and champion_summary() the totals of one champion. Both may read
+    the database, so call them with run_blocking. The summaries are kept in memory once they were read, and
+    updated with every new game, so the in-game presence shows the record of the champion that is played
+    ("24 games · 3.2 KDA") without querying the database again.
+"""
+
+import asyncio
+import sqlite3
+import time
+from dataclasses import astuple, dataclass, field, fields
+from threading import Lock
+from typing import Optional
+
+from league_rpc.models.client_data import ClientData
+from league_rpc.models.lcu.current_ranked_stats import ArenaStats, RankedStats, TFTStats
+from league_rpc.utils.color import Color
+from league_rpc.utils.const import MATCH_HISTORY_FLUSH_DELAY
+from league_rpc.utils.executor import blocking_executor
+from league_rpc.utils.paths import get_data_file
+
+MATCH_HISTORY_FILE_NAME = "match_history.sqlite3"
+
+SCHEMA: tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS matches (
+        id INTEGER PRIMARY KEY,
+        ended_at INTEGER NOT NULL,
+        champion TEXT NOT NULL,
+        skin TEXT NOT NULL,
+        game_mode TEXT NOT NULL,
+        queue TEXT NOT NULL,
+        queue_type TEXT NOT NULL,
+        duration INTEGER NOT NULL,
+        kills INTEGER NOT NULL,
+        deaths INTEGER NOT NULL,
+        assists INTEGER NOT NULL,
+        creep_score INTEGER NOT NULL,
+        gold INTEGER NOT NULL,
+        level INTEGER NOT NULL,
+        rank_before TEXT,
+        lp_before INTEGER,
+        rank_after TEXT,
+        lp_after INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS matches_by_end ON matches (ended_at)",
+    "CREATE INDEX IF NOT EXISTS matches_by_champion ON matches (champion, ended_at)",
+)
+
+
+@dataclass(slots=True)
+class MatchRecord:
+    """A finished game. The rank and LP are only known for ranked queues."""
+
+    ended_at: int
+    champion: str
+    skin: str = ""
+    game_mode: str = ""
+    queue: str = ""
+    queue_type: str = ""
+    # Length of the game (seconds).
+    duration: int = 0
+    kills: int = 0
+    deaths: int = 0
+    assists: int = 0
+    creep_score: int = 0
+    # The gold earned over the game, not the gold left unspent at its end.
+    gold: int = 0
+    level: int = 0
+    rank_before: Optional[str] = None
+    lp_before: Optional[int] = None
+    rank_after: Optional[str] = None
+    lp_after: Optional[int] = None
+
+    @property
+    def lp_change(self) -> Optional[int]:
+        """The LP won or lost, if the rank stayed the same. Promotions and demotions reset the LP."""
+        if (
+            self.lp_before is None
+            or self.lp_after is None
+            or self.rank_before != self.rank_after
+        ):
+            return None
+        return self.lp_after - self.lp_before
+
+
+COLUMNS: tuple[str, ...] = tuple(f.name for f in fields(MatchRecord))
+
+
+@dataclass(slots=True)
+class ChampionSummary:
+    """The totals of every recorded game of one champion."""
+
+    champion: str
+    games: int = 0
+    kills: int = 0
+    deaths: int = 0
+    assists: int = 0
+    creep_score: int = 0
+    # Epoch time of the end of the last game.
+    last_played: int = 0
+
+    @property
+    def kda_ratio(self) -> float:
+        return (self.kills + self.assists) / max(self.deaths, 1)
+
+    @property
+    def average_creep_score(self) -> float:
+        return self.creep_score / self.games if self.games else 0.0
+
+    def format(self) -> str:
+        """Returns the record as presence text, such as "24 games · 3.2 KDA". Empty before the first game."""
+        if not self.games:
+            return ""
+        return f"{self.games} {'game' if self.games == 1 else 'games'} · {self.kda_ratio:.1f} KDA"
+
+    def add(self, record: MatchRecord) -> None:
+        self.games += 1
+        self.kills += record.kills
+        self.deaths += record.deaths
+        self.assists += record.assists
+        self.creep_score += record.creep_score
+        self.last_played = max(self.last_played, record.ended_at)
+
+
+def ranked_stats_for_queue(
+    client_data: ClientData, queue_type: str
+) -> Optional[RankedStats | ArenaStats | TFTStats]:
+    """Returns the ranked stats of the queue type, or None if it has no ranked stats."""
+    match queue_type:
+        case "RANKED_SOLO_5x5":
+            return client_data.summoner_rank
+        case "RANKED_FLEX_SR":
+            return client_data.summoner_rank_flex
+        case "RANKED_TFT":
+            return client_data.tft_rank
+        case "CHERRY":
+            return client_data.arena_rank
+        case _:
+            return None
+
+
+def rank_and_points(
+    stats: Optional[RankedStats | ArenaStats | TFTStats],
+) -> tuple[Optional[str], Optional[int]]:
+    """Returns the rank (such as "Gold II") and the LP (or the rating, in Arena) of the ranked stats."""
+    if stats is None:
+        return None, None
+    if isinstance(stats, ArenaStats):
+        return stats.tier, stats.rated_rating
+    return f"{stats.tier} {stats.division}", stats.league_points
+
+
+@dataclass
+class MatchHistory:
+    """A dataclass storing MatchRecords in the match history database. Writes are batched for
+    `flush_delay` seconds, and done in the blocking executor when an event loop is running.
+    """
+
+    path: str = field(default_factory=lambda: get_data_file(MATCH_HISTORY_FILE_NAME))
+    flush_delay: float = MATCH_HISTORY_FLUSH_DELAY
+
+    _pending: list[MatchRecord] = field(default_factory=list)
+    _timer: Optional[asyncio.TimerHandle] = None
+    _summaries: dict[str, ChampionSummary] = field(default_factory=dict)
+    # Guards the pending records and the summaries. Never held during disk I/O.
+    _lock: Lock = field(default_factory=Lock)
+    # Guards the connection, which is used from the executor threads.
+    _db_lock: Lock = field(default_factory=Lock)
+    _connection: Optional[sqlite3.Connection] = None
+
+    def add(self, record: MatchRecord) -> None:
+        """Queues the record to be written with the next batch. Never blocks on the disk."""
+        with self._lock:
+            self._pending.append(record)
+            if (summary := self._summaries.get(record.champion)) is not None:
+                summary.add(record)
+
+            if self._timer is not None:
+                # The scheduled write picks this record up as well.
+                return
+            try:
+                loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self._timer = loop.call_later(
+                    self.flush_delay,
+                    loop.run_in_executor,
+                    blocking_executor,
+                    self.flush,
+                )
+                return
+
+        self.flush()
+
+    def flush(self) -> None:
+        """Writes the pending records in a single transaction."""
+        with self._db_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                records: list[MatchRecord] = self._pending
+                self._pending = []
+            if not records:
+                return
+
+            try:
+                connection: sqlite3.Connection = self._connect()
+                with connection:
+                    connection.executemany(
+                        f"INSERT INTO matches ({', '.join(COLUMNS)}) "
+                        f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                        [astuple(record) for record in records],
+                    )
+            except sqlite3.Error as exc:
+                print(
+                    f"{Color.orange}Could not save the match history: {exc}{Color.reset}"
+                )
+
+    def last_games(self, count: int = 10) -> list[MatchRecord]:
+        """Returns the last `count` games, the most recent first. Reads the database, so call it with run_blocking."""
+        self.flush()
+        with self._db_lock:
+            rows: list[tuple[object, ...]] = (
+                self._connect()
+                .execute(
+                    f"SELECT {', '.join(COLUMNS)} FROM matches ORDER BY ended_at DESC LIMIT ?",
+                    (count,),
+                )
+                .fetchall()
+            )
+        return [MatchRecord(*row) for row in rows]  # type: ignore
+
+    def champion_summary(self, champion: str) -> ChampionSummary:
+        """
+        Returns the totals of every game of the champion. Only the first call for a champion reads the database,
+        so call it with run_blocking. Later calls are answered from memory.
+        """
+        with self._lock:
+            if (summary := self._summaries.get(champion)) is not None:
+                return summary
+
+        with self._db_lock:
+            try:
+                row: tuple[int, ...] = (
+                    self._connect()
+                    .execute(
+                        "SELECT COUNT(*), TOTAL(kills), TOTAL(deaths), TOTAL(assists), TOTAL(creep_score), "
+                        "COALESCE(MAX(ended_at), 0) FROM matches WHERE champion = ?",
+                        (champion,),
+                    )
+                    .fetchone()
+                )
+            except sqlite3.Error as exc:
+                print(
+                    f"{Color.orange}Could not read the match history: {exc}{Color.reset}"
+                )
+                return ChampionSummary(champion)
+            with self._lock:
+                summary = ChampionSummary(champion, *(int(value) for value in row))
+                # Games that were not written yet are not in the row.
+                for record in self._pending:
+                    if record.champion == champion:
+                        summary.add(record)
+                return self._summaries.setdefault(champion, summary)
+
+    def close(self) -> None:
+        """Writes the pending records, and closes the database."""
+        self.flush()
+        with self._db_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            # Readers never wait for the writer, and a write only syncs the log file, not the database.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+            self._connection = connection
+        return self._connection
+
+
+@dataclass
+class MatchRecorder:
+    """A dataclass following the game that is being played, and adding it to the MatchHistory once it's over."""
+
+    history: MatchHistory = field(default_factory=MatchHistory)
+
+    _current: Optional[MatchRecord] = None
+    # The live client API only reports the gold that can be spent, so the earned gold is summed from its increases.
+    _gold_earned: float = 0.0
+    _last_gold: Optional[float] = None
+
+    def start(
+        self,
+        client_data: ClientData,
+        champion: str,
+        skin: str = "",
+        game_mode: str = "",
+    ) -> None:
+        """Starts recording a game, with the rank the player has before it."""
+        rank_before, lp_before = rank_and_points(
+            ranked_stats_for_queue(client_data, client_data.queue_type)
+            if client_data.queue_is_ranked
+            else None
+        )
+        self._current = MatchRecord(
+            ended_at=0,
+            champion=champion,
+            skin=skin,
+            game_mode=game_mode,
+            queue=client_data.queue,
+            queue_type=client_data.queue_type,
+            rank_before=rank_before,
+            lp_before=lp_before,
+        )
+        self._gold_earned = 0.0
+        self._last_gold = None
+
+    def sample(
+        self,
+        game_time: Optional[int] = None,
+        kills: Optional[int] = None,
+        deaths: Optional[int] = None,
+        assists: Optional[int] = None,
+        creep_score: Optional[int] = None,
+        current_gold: Optional[float] = None,
+        level: Optional[int] = None,
+    ) -> None:
+        """
+        Records the latest values of the game. Only the values that were given are changed.
+        `current_gold` is the gold the player has now, as reported by the live client API.
+        """
+        record: Optional[MatchRecord] = self._current
+        if record is None:
+            return
+        if game_time is not None:
+            record.duration = game_time
+        if kills is not None:
+            record.kills = kills
+        if deaths is not None:
+            record.deaths = deaths
+        if assists is not None:
+            record.assists = assists
+        if creep_score is not None:
+            record.creep_score = creep_score
+        if current_gold is not None:
+            if self._last_gold is not None and current_gold > self._last_gold:
+                self._gold_earned += current_gold - self._last_gold
+                record.gold = int(self._gold_earned)
+            self._last_gold = current_gold
+        if level is not None:
+            record.level = level
+
+    def finish(self, client_data: ClientData) -> None:
+        """Adds the game to the history, with the rank the player has after it. Does nothing if no game was started."""
+        record: Optional[MatchRecord] = self._current
+        if record is None:
+            return
+        self._current = None
+        record.ended_at = int(time.time())
+        if record.rank_before is not None:
+            # The ranked data is updated at the end of the game, before the player leaves the post-game screens.
+            record.rank_after, record.lp_after = rank_and_points(
+                ranked_stats_for_queue(client_data, record.queue_type)
+            )
+        self.history.add(record)
@@ -17,13 +17,16 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 from lcu_driver.connector import Connector
-from pypresence import Presence
 
 from league_rpc.models.client_data import ClientData
+from league_rpc.models.gameflow_state import GameflowStateMachine
+from league_rpc.models.presence_writer import PresenceWriter
+from league_rpc.models.queue_catalog import QueueCatalog
+from league_rpc.models.rank_timeline import RankTimeline
 
 
 # contains module internal data
-@dataclass
+@dataclass(slots=True)
 class ModuleData:
     """A dataclass designed to store the operational state of a module, including connections to the
     League client and the current state of any ongoing Rich Presence integrations.
@@ -31,5 +34,11 @@ class ModuleData:
 
     connector: Connector = field(default_factory=Connector)
     client_data: ClientData = field(default_factory=ClientData)
-    rpc: Optional[Presence] = None
+    queue_catalog: QueueCatalog = field(default_factory=QueueCatalog)
+    # Where the player is, fed by the LCU events and the process watcher.
+    gameflow: GameflowStateMachine = field(default_factory=GameflowStateMachine)
+    # The rank changes of every ranked queue, for the LP won today and the win or loss streak.
+    rank_timeline: RankTimeline = field(default_factory=RankTimeline)
+    # Every presence update goes through this writer, which owns the Discord connection.
+    presence: Optional[PresenceWriter] = None
     cli_args: Optional[Namespace] = None
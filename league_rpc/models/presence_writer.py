@@ -0,0 +1,404 @@
+"""
+This module defines the PresenceWriter class, the single writer of the Discord Rich Presence. Every presence
+update, whether it comes from the LCU event handlers or from the in-game loops, goes through it, so the
+Discord connections have a single user, and the activity rate limit of Discord is respected.
+
+Usage:
+    Call update() with the same keyword arguments as pypresence's Presence.update, plus the phase the
+    presence belongs to. Updates are never sent right away: only the latest pending update is kept, and
+    it is sent as soon as the token bucket allows it. An update for a new phase (entering a lobby, a queue
+    or a game) may use the tokens that are held back from routine refreshes of the same phase, so phase
+    transitions show up without delay, even after a burst of stat refreshes.
+
+    The writer talks to Discord through the asyncio DiscordIpcClient, on the event loop of the application.
+    update() never blocks, every call to Discord has a deadline, and failures never reach the callers of
+    update(): they are reported as PresenceEvents to the listeners instead.
+
+    Every Discord client that is running (for example Discord stable next to PTB or Canary) gets the
+    presence. Each IPC socket has its own PresenceChannel, with its own pending update, token bucket and
+    reconnect loop, so a slow or restarting client never delays the others.
+
+    A Discord that comes back often does so on another discord-ipc-N socket, for example when Canary took
+    its old one, or when a crash left it stale. So while a channel waits for its Discord, and another socket
+    accepts connections, the channel retires, and the discovery connects to whichever sockets are there.
+    A channel whose socket is gone for DISCORD_CHANNEL_RETIRE_DELAY retires as well, so the sockets of
+    Discord clients that were closed for good are not probed for the rest of the session.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from league_rpc.discord_ipc.client import (
+    DiscordIpcClient,
+    DiscordIpcClosed,
+    DiscordIpcError,
+    DiscordIpcInvalidClientId,
+    DiscordIpcNotFound,
+    build_activity,
+)
+from league_rpc.discord_ipc.discovery import async_ipc_accepting, get_discord_ipc_paths
+from league_rpc.reconnect import discord_reconnect_attempt
+from league_rpc.utils.color import Color
+from league_rpc.utils.const import (
+    DISCORD_ACTIVITY_RATE_LIMIT,
+    DISCORD_ACTIVITY_RATE_PERIOD,
+    DISCORD_ACTIVITY_RESERVED_TOKENS,
+    DISCORD_CHANNEL_RETIRE_DELAY,
+    DISCORD_CONNECTION_CHECK_INTERVAL,
+    DISCORD_DISCOVERY_INTERVAL,
+)
+from league_rpc.utils.tracing import tracer
+
+PRESENCE_EVENT_SENT = "sent"
+PRESENCE_EVENT_FAILED = "failed"
+PRESENCE_EVENT_DISCONNECTED = "disconnected"
+PRESENCE_EVENT_RECONNECTED = "reconnected"
+
+# The phase of a cleared presence, which is sent as an empty activity.
+PRESENCE_CLEARED_PHASE = "Cleared"
+
+
+@dataclass
+class PresenceEvent:
+    """Something that happened to the presence connection, such as a sent update or a failure."""
+
+    kind: str
+    activity: Optional[dict[str, Any]] = None
+    error: Optional[DiscordIpcError] = None
+    # The IPC socket of the Discord client it happened to.
+    path: Optional[str] = None
+
+
+PresenceListener = Callable[[PresenceEvent], None]
+
+
+@dataclass
+class TokenBucket:
+    """A token bucket holding up to `capacity` tokens, refilled with `capacity` tokens every `period` seconds."""
+
+    capacity: int = DISCORD_ACTIVITY_RATE_LIMIT
+    period: float = DISCORD_ACTIVITY_RATE_PERIOD
+
+    tokens: float = float(DISCORD_ACTIVITY_RATE_LIMIT)
+    _refilled_at: float = field(default_factory=time.monotonic)
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self._refilled_at) * self.capacity / self.period,
+        )
+        self._refilled_at = now
+
+    def time_until_available(self, reserved: int = 0) -> float:
+        """Returns how many seconds to wait until a token can be taken, while leaving `reserved` tokens."""
+        self._refill()
+        missing: float = reserved + 1 - self.tokens
+        return max(missing, 0.0) * self.period / self.capacity
+
+    def take(self) -> None:
+        """Takes one token from the bucket."""
+        self._refill()
+        self.tokens -= 1
+
+
+@dataclass
+class PresenceChannel:
+    """A dataclass sending the presence to one Discord client. Its run() task sends the latest pending
+    update, dropping the updates it superseded, at the rate its token bucket allows.
+    """
+
+    client: DiscordIpcClient
+    bucket: TokenBucket = field(default_factory=TokenBucket)
+    reserved_tokens: int = DISCORD_ACTIVITY_RESERVED_TOKENS
+    listeners: list[PresenceListener] = field(default_factory=list)
+    # Asked while Discord is closed. Once it returns True, the channel stops, and leaves reconnecting to discovery.
+    retire: Optional[Callable[[], Awaitable[bool]]] = None
+
+    _pending: Optional[dict[str, Any]] = None
+    _pending_phase: Optional[str] = None
+    # The last update that was submitted, sent again as soon as a lost connection is back.
+    _latest: Optional[dict[str, Any]] = None
+    _latest_phase: Optional[str] = None
+    _sent: Optional[dict[str, Any]] = None
+    _sent_phase: Optional[str] = None
+    _closed: bool = False
+    _wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def submit(self, activity: dict[str, Any], phase: str) -> None:
+        """Replaces the pending update. Must be called from the writer's event loop."""
+        if self._closed:
+            return
+        self._pending, self._pending_phase = activity, phase
+        self._latest, self._latest_phase = activity, phase
+        self._wakeup.set()
+
+    async def close(self) -> None:
+        self._closed = True
+        self._pending = None
+        self._wakeup.set()
+        await self.client.close()
+
+    def _notify(self, event: PresenceEvent) -> None:
+        event.path = self.client.path
+        for listener in self.listeners:
+            listener(event)
+
+    async def _wait(self, timeout: Optional[float] = None) -> None:
+        """Waits until an update is submitted, or the timeout passed."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def _is_transition(self) -> bool:
+        return self._pending_phase != self._sent_phase
+
+    async def run(self) -> None:
+        """Sends the pending updates, until the channel is closed or retires."""
+        while not self._closed:
+            if self._pending is None:
+                await self._wait(timeout=DISCORD_CONNECTION_CHECK_INTERVAL)
+                if (
+                    not self._closed
+                    and self._sent is not None
+                    and not self.client.alive
+                ):
+                    # Discord was closed while there was nothing to send.
+                    await self._reconnect(
+                        error=DiscordIpcClosed("Discord closed the connection")
+                    )
+                continue
+
+            if self._pending == self._sent:
+                # Discord already shows this exact presence.
+                self._pending = None
+                continue
+
+            # Routine refreshes leave some tokens for the next phase transition.
+            wait: float = self.bucket.time_until_available(
+                reserved=0 if self._is_transition() else self.reserved_tokens
+            )
+            if wait > 0:
+                # A newer update wakes us up, and might be a transition that can be sent sooner.
+                await self._wait(timeout=wait)
+                continue
+
+            activity, phase = self._pending, self._pending_phase
+            self._pending = None
+            self.bucket.take()
+            if await self._send(activity=activity):
+                self._sent, self._sent_phase = activity, phase
+
+    async def _send(self, activity: dict[str, Any]) -> bool:
+        """Sends the activity to Discord. Returns whether it was sent."""
+        try:
+            if not self.client.connected:
+                raise DiscordIpcClosed("Not connected to Discord")
+            with tracer.span("SET_ACTIVITY", "discord", path=self.client.path):
+                # An empty activity clears the presence.
+                await self.client.set_activity(activity=activity or None)
+        except DiscordIpcClosed as exc:
+            await self._reconnect(error=exc)
+            return False
+        except DiscordIpcError as exc:
+            self._notify(PresenceEvent(PRESENCE_EVENT_FAILED, activity, exc))
+            print(
+                f"{Color.orange}Discord refused the presence update: {exc}{Color.reset}"
+            )
+            return False
+
+        self._notify(PresenceEvent(PRESENCE_EVENT_SENT, activity))
+        return True
+
+    async def _reconnect(self, error: DiscordIpcClosed) -> None:
+        """Waits until Discord is back, and then sends the latest presence again right away."""
+        self._notify(PresenceEvent(PRESENCE_EVENT_DISCONNECTED, self._latest, error))
+        print(
+            f"{Color.red}Discord seems to be closed, will attempt to reconnect! {Color.dgray}({self.client.path}){Color.reset}"
+        )
+        self._sent = self._sent_phase = None
+        downtime: Optional[float] = await discord_reconnect_attempt(
+            client=self.client, give_up=self.retire
+        )
+        if downtime is None:
+            print(
+                f"{Color.dgray}Stopped waiting for this Discord client, it will be found again if it comes back. ({self.client.path}){Color.reset}"
+            )
+            await self.close()
+            return
+        self._notify(PresenceEvent(PRESENCE_EVENT_RECONNECTED))
+        # Discord starts without our presence, so the latest one is a transition and is sent without delay.
+        if self._pending is None:
+            self._pending, self._pending_phase = self._latest, self._latest_phase
+
+
+@dataclass
+class PresenceWriter:
+    """A dataclass owning the Discord connections. It keeps a PresenceChannel for every Discord IPC socket
+    that accepts connections, and hands every update to all of them.
+    """
+
+    client_id: str
+    # Only use these sockets, instead of every Discord that is found.
+    paths: Optional[list[str]] = None
+    # Clients to send to from the start, next to the discovered ones.
+    clients: list[DiscordIpcClient] = field(default_factory=list)
+    discover: bool = True
+    listeners: list[PresenceListener] = field(default_factory=list)
+    discovery_interval: float = DISCORD_DISCOVERY_INTERVAL
+    retire_delay: float = DISCORD_CHANNEL_RETIRE_DELAY
+
+    channels: dict[str, PresenceChannel] = field(default_factory=dict)
+    _latest: Optional[tuple[dict[str, Any], str]] = None
+    _started: bool = False
+    _closed: bool = False
+    _tasks: set[asyncio.Task[None]] = field(default_factory=set)
+
+    def start(self) -> None:
+        """Starts the channels of the given clients and the discovery, on the running event loop."""
+        if self._started:
+            return
+        self._started = True
+        for client in self.clients:
+            self._add_channel(client)
+        if self.discover:
+            self._spawn(self._discover())
+
+    async def connect(self, timeout: Optional[float] = None) -> None:
+        """Connects to every running Discord, raising a DiscordIpcError if none could be connected."""
+        self.start()
+        clients: list[DiscordIpcClient] = [
+            DiscordIpcClient(client_id=self.client_id, path=path)
+            for path in (self.paths or get_discord_ipc_paths())
+            if path not in self.channels
+        ]
+        results: list[Optional[BaseException]] = await asyncio.gather(
+            *(client.connect(timeout=timeout) for client in clients),
+            return_exceptions=True,
+        )
+        errors: list[BaseException] = []
+        for client, result in zip(clients, results):
+            if result is None:
+                self._add_channel(client)
+            else:
+                errors.append(result)
+
+        if self.channels:
+            return
+        # A rejected client id is the most useful error to report, as retrying won't help.
+        for error in errors:
+            if isinstance(error, DiscordIpcInvalidClientId):
+                raise error
+        raise (
+            errors[0]
+            if errors
+            else DiscordIpcNotFound("Could not find a running Discord to connect to")
+        )
+
+    def update(self, phase: str, **activity: Any) -> None:
+        """
+        Queues a presence update for the given phase, replacing any update that was not sent yet.
+        The keyword arguments are the ones of pypresence's Presence.update. Never blocks.
+        """
+        if self._closed:
+            return
+        with tracer.span("rpc.update", "presence", phase=phase):
+            self.start()
+            activity_object: dict[str, Any] = build_activity(**activity)
+            self._latest = (activity_object, phase)
+            for channel in self.channels.values():
+                channel.submit(activity_object, phase)
+
+    def clear(self) -> None:
+        """Clears the presence on every Discord, replacing any update that was not sent yet. The connections stay open."""
+        self.update(phase=PRESENCE_CLEARED_PHASE)
+
+    async def close(self) -> None:
+        """Stops the channels, dropping any pending update, and closes the Discord connections."""
+        self._closed = True
+        for task in list(self._tasks):
+            # Stops the channels, also the ones still waiting for Discord to come back.
+            task.cancel()
+        await asyncio.gather(
+            *(channel.close() for channel in self.channels.values()),
+            return_exceptions=True,
+        )
+
+    def _spawn(self, coroutine: Any) -> None:
+        task: asyncio.Task[None] = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _add_channel(self, client: DiscordIpcClient) -> PresenceChannel:
+        channel = PresenceChannel(
+            client=client,
+            listeners=self.listeners,
+            # Without discovery, nothing would connect to a retired channel's Discord again.
+            retire=(
+                self._retire_check(client.path)
+                if self.discover and client.path
+                else None
+            ),
+        )
+        key: str = client.path or client.client_id
+        self.channels[key] = channel
+        if self._latest is not None:
+            channel.submit(*self._latest)
+        self._spawn(self._run_channel(key=key, channel=channel))
+        return channel
+
+    async def _run_channel(self, key: str, channel: PresenceChannel) -> None:
+        await channel.run()
+        # The channel retired: discovery connects to its socket again once it accepts connections.
+        if self.channels.get(key) is channel:
+            del self.channels[key]
+
+    def _retire_check(self, path: str) -> Callable[[], Awaitable[bool]]:
+        """
+        Returns the check of whether the channel of `path` should retire: when another Discord socket
+        accepts connections, or when `path` is gone for `retire_delay`. It looks at the sockets at most
+        once per discovery interval.
+        """
+        checked_at: float = time.monotonic()
+        gone_since: Optional[float] = None
+
+        async def should_retire() -> bool:
+            nonlocal checked_at, gone_since
+            now: float = time.monotonic()
+            if os.path.exists(path):
+                gone_since = None
+            elif gone_since is None:
+                gone_since = now
+            if gone_since is not None and now - gone_since >= self.retire_delay:
+                return True
+            if now - checked_at < self.discovery_interval:
+                return False
+            checked_at = now
+            for other_path in self.paths or get_discord_ipc_paths():
+                if other_path != path and await async_ipc_accepting(other_path):
+                    return True
+            return False
+
+        return should_retire
+
+    async def _discover(self) -> None:
+        """Connects to Discord clients that were started later on."""
+        while not self._closed:
+            await asyncio.sleep(self.discovery_interval)
+            for path in self.paths or get_discord_ipc_paths():
+                if path in self.channels or not await async_ipc_accepting(path):
+                    continue
+                client = DiscordIpcClient(client_id=self.client_id, path=path)
+                try:
+                    await client.connect()
+                except DiscordIpcError:
+                    continue
+                print(
+                    f"{Color.green}Found another Discord client, showing your presence there too. {Color.dgray}({path}){Color.reset}"
+                )
+                self._add_channel(client)
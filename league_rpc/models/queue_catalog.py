@@ -0,0 +1,66 @@
+"""
+This module defines the QueueCatalog class, which holds every queue and map definition of the League client,
+indexed for constant time lookups. Queue and map definitions do not change during a client session,
+so they are fetched once when connecting to the LCU API, instead of once per lobby event.
+
+Usage:
+    The catalog is filled by the base data gatherers, and read by the lobby handlers and the RPCUpdater.
+    Lookups fall back to the hard-coded tables in utils/const.py, in case the catalog could not be loaded.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from league_rpc.models.lcu.current_queue import LolGameQueuesQueue
+from league_rpc.models.lcu.game_maps import LolMapsMapAssets, LolMapsMaps
+from league_rpc.utils.const import GAME_MODE_CONVERT_MAP, MAP_ICON_CONVERT_MAP
+
+
+@dataclass
+class QueueCatalog:
+    """A dataclass storing the queue definitions by queue id, and the map definitions by (map id, game mode)."""
+
+    queues: dict[int, dict[str, Any]] = field(default_factory=dict)
+    maps: dict[tuple[int, str], dict[str, Any]] = field(default_factory=dict)
+
+    def load_queues(self, queues: list[dict[str, Any]]) -> None:
+        """Indexes the response of /lol-game-queues/v1/queues."""
+        self.queues = {queue[LolGameQueuesQueue.ID]: queue for queue in queues}
+
+    def load_maps(self, maps: list[dict[str, Any]]) -> None:
+        """Indexes the response of /lol-maps/v2/maps."""
+        self.maps = {
+            (game_map[LolMapsMaps.ID], game_map[LolMapsMaps.GAME_MODE]): game_map
+            for game_map in maps
+        }
+
+    def get_queue(self, queue_id: int) -> Optional[dict[str, Any]]:
+        """Returns the queue definition for the given id, if it's known."""
+        return self.queues.get(queue_id)
+
+    def get_map(self, map_id: int, game_mode: str) -> Optional[dict[str, Any]]:
+        """Returns the map definition for the given map and game mode, if it's known."""
+        return self.maps.get((map_id, game_mode))
+
+    def game_mode_name(self, map_id: int, game_mode: str) -> str:
+        """Returns a display name for the game mode, such as "Howling Abyss (ARAM)"."""
+        if game_map := self.get_map(map_id=map_id, game_mode=game_mode):
+            map_name: str = game_map.get(LolMapsMaps.NAME, "")
+            mode_name: str = game_map.get(LolMapsMaps.GAME_MODE_NAME, "")
+            if map_name and mode_name and mode_name not in map_name:
+                return f"{map_name} ({mode_name})"
+            if map_name or mode_name:
+                return map_name or mode_name
+        return GAME_MODE_CONVERT_MAP.get(game_mode, game_mode)
+
+    def map_icon_name(self, map_id: int, game_mode: str) -> Optional[str]:
+        """Returns the name of the game mode asset folder, used to build the map icon url."""
+        if game_map := self.get_map(map_id=map_id, game_mode=game_mode):
+            icon_path: str = game_map.get(LolMapsMaps.ASSETS, {}).get(
+                LolMapsMapAssets.GAME_SELECT_ICON_HOVER, ""
+            )
+            if LolMapsMapAssets.GAME_MODE_ASSETS_DIR in icon_path:
+                return icon_path.split(LolMapsMapAssets.GAME_MODE_ASSETS_DIR)[1].split(
+                    "/"
+                )[0]
+        return MAP_ICON_CONVERT_MAP.get(map_id)
@@ -0,0 +1,310 @@
+"""
+This module defines the RankTimeline class, which keeps a short history of the rank of every ranked queue:
+a point for every change of tier, division or LP (or rating, in Arena), or of the games won and lost,
+with the time it was seen.
+It is stored in a small state file next to the client state, so it outlives restarts.
+
+Usage:
+    Call record() with the ClientData whenever the ranked stats were gathered or updated by a ranked event.
+    Unchanged ranks and records are ignored, so the ranked events that repeat the same rank all day long add nothing.
+    summary() turns the timeline of a queue into presence text, such as "+18 LP today · 3W streak",
+    without any request to the League Client: the timeline holds all it needs.
+
+    Every queue keeps at most RANK_TIMELINE_MAX_POINTS points, and points older than
+    RANK_TIMELINE_RETENTION_DAYS are dropped when the file is loaded.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from dataclasses import astuple, dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Any, Optional
+
+from league_rpc.models.client_data import ClientData
+from league_rpc.models.lcu.current_ranked_stats import ArenaStats
+from league_rpc.models.match_history import ranked_stats_for_queue
+from league_rpc.utils.color import Color
+from league_rpc.utils.const import (
+    RANK_TIMELINE_FLUSH_DELAY,
+    RANK_TIMELINE_MAX_POINTS,
+    RANK_TIMELINE_RETENTION_DAYS,
+    RANK_TIMELINE_STREAK_MIN,
+)
+from league_rpc.utils.executor import blocking_executor
+from league_rpc.utils.paths import get_data_file
+
+RANK_TIMELINE_FILE_NAME = "rank_timeline.json"
+RANK_TIMELINE_FILE_VERSION = 1
+
+# The queues with a rank, as named by the ranked stats and the queue types.
+RANKED_QUEUE_TYPES: tuple[str, ...] = (
+    "RANKED_SOLO_5x5",
+    "RANKED_FLEX_SR",
+    "RANKED_TFT",
+    "CHERRY",
+)
+
+TIERS: tuple[str, ...] = (
+    "Iron",
+    "Bronze",
+    "Silver",
+    "Gold",
+    "Platinum",
+    "Emerald",
+    "Diamond",
+    "Master",
+    "Grandmaster",
+    "Challenger",
+)
+DIVISIONS: tuple[str, ...] = ("IV", "III", "II", "I")
+# From Master on there are no divisions, and the LP keeps counting up.
+APEX_TIERS: frozenset[str] = frozenset({"Master", "Grandmaster", "Challenger"})
+LP_PER_DIVISION = 100
+
+
+@dataclass(frozen=True, slots=True)
+class RankPoint:
+    """
+    The rank of a queue, from the moment it was seen (epoch seconds). `points` is the LP, or the Arena rating.
+    `wins` and `losses` are the games of the season, if the queue counts them (Arena doesn't).
+    """
+
+    at: int
+    tier: str
+    division: Optional[str]
+    points: int
+    wins: Optional[int] = None
+    losses: Optional[int] = None
+
+    @property
+    def standing(self) -> tuple[str, Optional[str], int, Optional[int], Optional[int]]:
+        return self.tier, self.division, self.points, self.wins, self.losses
+
+    @property
+    def score(self) -> int:
+        """
+        The rank as a single number, so a promotion from Gold I 90 LP to Platinum IV 10 LP counts as +20.
+        The Arena rating already is one.
+        """
+        if self.tier not in TIERS:
+            return self.points
+        tier_index: int = TIERS.index(self.tier)
+        if self.tier in APEX_TIERS:
+            return (
+                TIERS.index("Master") * len(DIVISIONS) * LP_PER_DIVISION + self.points
+            )
+        division_index: int = (
+            DIVISIONS.index(self.division) if self.division in DIVISIONS else 0
+        )
+        return (
+            tier_index * len(DIVISIONS) + division_index
+        ) * LP_PER_DIVISION + self.points
+
+
+def start_of_day(now: Optional[float] = None) -> int:
+    """The epoch time of the last local midnight."""
+    moment: datetime = datetime.fromtimestamp(time.time() if now is None else now)
+    return int(moment.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+
+@dataclass
+class RankTimeline:
+    """A dataclass holding the rank changes of every ranked queue, and writing them to the rank timeline file.
+    Writes are batched for `flush_delay` seconds, and done in the blocking executor when an event loop is running.
+    """
+
+    path: str = field(default_factory=lambda: get_data_file(RANK_TIMELINE_FILE_NAME))
+    max_points: int = RANK_TIMELINE_MAX_POINTS
+    flush_delay: float = RANK_TIMELINE_FLUSH_DELAY
+
+    _queues: dict[str, deque[RankPoint]] = field(default_factory=dict)
+    _dirty: bool = False
+    _timer: Optional[asyncio.TimerHandle] = None
+    _lock: Lock = field(default_factory=Lock)
+
+    def load(self) -> None:
+        """Reads the timeline file, dropping the points that are past the retention."""
+        try:
+            with open(file=self.path, mode="r", encoding="utf-8") as file:
+                state: dict[str, Any] = json.load(fp=file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if (
+            not isinstance(state, dict)
+            or state.get("version") != RANK_TIMELINE_FILE_VERSION
+        ):
+            return
+
+        oldest: float = time.time() - RANK_TIMELINE_RETENTION_DAYS * 24 * 3600
+        try:
+            queues: list[tuple[str, deque[RankPoint]]] = [
+                (
+                    queue_type,
+                    deque(
+                        (RankPoint(*point) for point in points if point[0] >= oldest),
+                        maxlen=self.max_points,
+                    ),
+                )
+                for queue_type, points in state.get("queues", {}).items()
+            ]
+        except (AttributeError, IndexError, TypeError, ValueError):
+            # Written by hand, or corrupted: start over, as with a file that isn't JSON.
+            return
+        with self._lock:
+            self._queues.update(queues)
+
+    def record(self, client_data: ClientData, now: Optional[float] = None) -> bool:
+        """Adds a point to every queue whose rank, wins or losses changed. Returns whether any did."""
+        at: int = int(time.time() if now is None else now)
+        changed: bool = False
+        with self._lock:
+            for queue_type in RANKED_QUEUE_TYPES:
+                point: Optional[RankPoint] = self._point(
+                    client_data=client_data, queue_type=queue_type, at=at
+                )
+                if point is None:
+                    continue
+                points: deque[RankPoint] = self._queues.setdefault(
+                    queue_type, deque(maxlen=self.max_points)
+                )
+                if points and points[-1].standing == point.standing:
+                    continue
+                points.append(point)
+                changed = True
+        if changed:
+            self._schedule_flush()
+        return changed
+
+    def change_today(self, queue_type: str, now: Optional[float] = None) -> int:
+        """The LP (or rating) won or lost in the queue since midnight."""
+        midnight: int = start_of_day(now)
+        with self._lock:
+            points: deque[RankPoint] = self._queues.get(queue_type, deque())
+            if not points or points[-1].at < midnight:
+                return 0
+            baseline: RankPoint = points[0]
+            for point in reversed(points):
+                baseline = point
+                if point.at < midnight:
+                    # The rank the day started with.
+                    break
+            return points[-1].score - baseline.score
+
+    def streak(self, queue_type: str) -> int:
+        """
+        The games won (positive) or lost (negative) in a row, as told by the wins and losses of the last points.
+        The LP can't tell: a loss at 0 LP, or a game while the LP is capped, doesn't change it.
+        The streak ends where the timeline can't tell the games apart, such as a win and a loss between two points,
+        a season reset, or a queue that doesn't count them.
+        """
+        with self._lock:
+            points: list[RankPoint] = list(self._queues.get(queue_type, ()))
+        streak: int = 0
+        for newer, older in zip(reversed(points), reversed(points[:-1])):
+            if (
+                newer.wins is None
+                or newer.losses is None
+                or older.wins is None
+                or older.losses is None
+            ):
+                break
+            won: int = newer.wins - older.wins
+            lost: int = newer.losses - older.losses
+            if won < 0 or lost < 0 or (won and lost):
+                break
+            if not won and not lost:
+                # Only the LP changed, such as with decay.
+                continue
+            step: int = won or -lost
+            if streak and (step > 0) != (streak > 0):
+                break
+            streak += step
+        return streak
+
+    def summary(self, queue_type: str, now: Optional[float] = None) -> str:
+        """Returns presence text such as "+18 LP today · 3W streak". Empty if there is nothing to tell."""
+        parts: list[str] = []
+        unit: str = "rating" if queue_type == "CHERRY" else "LP"
+        if change := self.change_today(queue_type=queue_type, now=now):
+            parts.append(f"{change:+d} {unit} today")
+        streak: int = self.streak(queue_type=queue_type)
+        if abs(streak) >= RANK_TIMELINE_STREAK_MIN:
+            parts.append(f"{abs(streak)}{'W' if streak > 0 else 'L'} streak")
+        return " · ".join(parts)
+
+    def flush(self) -> None:
+        """Writes the timeline to disk, if it changed since the last write."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            serialized: str = json.dumps(
+                {
+                    "version": RANK_TIMELINE_FILE_VERSION,
+                    "queues": {
+                        queue_type: [astuple(point) for point in points]
+                        for queue_type, points in self._queues.items()
+                    },
+                },
+                separators=(",", ":"),
+            )
+
+        temp_path: str = f"{self.path}.tmp"
+        try:
+            with open(file=temp_path, mode="w", encoding="utf-8") as file:
+                file.write(serialized)
+            os.replace(src=temp_path, dst=self.path)
+        except OSError as exc:
+            print(f"{Color.orange}Could not save the rank timeline: {exc}{Color.reset}")
+
+    def _schedule_flush(self) -> None:
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                return
+            try:
+                loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self._timer = loop.call_later(
+                    self.flush_delay,
+                    loop.run_in_executor,
+                    blocking_executor,
+                    self.flush,
+                )
+                return
+
+        self.flush()
+
+    @staticmethod
+    def _point(
+        client_data: ClientData, queue_type: str, at: int
+    ) -> Optional[RankPoint]:
+        stats = ranked_stats_for_queue(client_data=client_data, queue_type=queue_type)
+        if stats is None or not stats.tier:
+            # Unranked, or still in placements.
+            return None
+        if isinstance(stats, ArenaStats):
+            if stats.rated_rating is None:
+                return None
+            return RankPoint(
+                at=at, tier=stats.tier, division=None, points=stats.rated_rating
+            )
+        if stats.league_points is None:
+            return None
+        return RankPoint(
+            at=at,
+            tier=stats.tier,
+            division=stats.division,
+            points=stats.league_points,
+            wins=stats.wins,
+            losses=stats.losses,
+        )
@@ -10,26 +10,72 @@ Usage:
     which could disrupt the user experience or exceed API rate limits.
 """
 
+import asyncio
 import time
-from dataclasses import dataclass
-from threading import Timer
-
-from pypresence import Presence  # type:ignore
+import traceback
+from dataclasses import dataclass, field
+from typing import Callable, Optional
 
 from league_rpc.lcu_api.lcu_connector import ModuleData
 from league_rpc.models.client_data import ClientData
+from league_rpc.models.client_data_snapshot import ClientDataSnapshot
+from league_rpc.models.gameflow_state import GAMEFLOW_STATES, ClientState
 from league_rpc.models.lcu.current_chat_status import LolChatUser
 from league_rpc.models.lcu.current_ranked_stats import ArenaStats, RankedStats, TFTStats
-from league_rpc.models.lcu.gameflow_phase import GameFlowPhase
+from league_rpc.models.presence_writer import PresenceWriter
+from league_rpc.utils.color import Color
 from league_rpc.utils.const import (
     BASE_MAP_ICON_URL,
-    GAME_MODE_CONVERT_MAP,
     LEAGUE_OF_LEGENDS_LOGO,
-    MAP_ICON_CONVERT_MAP,
     PROFILE_ICON_BASE_URL,
     RANKED_TYPE_MAPPER,
+    RPC_MIN_UPDATE_INTERVAL,
+    RPC_UPDATE_DELAY,
     SMALL_TEXT,
 )
+from league_rpc.utils.metrics import event_queue_depth, rpc_updates
+from league_rpc.utils.tracing import traced
+
+# ClientData fields read by the presence of each state.
+# A change to any other field does not need a new presence.
+RANKED_PRESENCE_FIELDS: frozenset[str] = frozenset(
+    {"queue_type", "summoner_rank", "summoner_rank_flex", "tft_rank", "arena_rank"}
+)
+IN_CLIENT_PRESENCE_FIELDS: frozenset[str] = frozenset(
+    {"availability", "summoner_icon", "application_start_time"}
+)
+IN_LOBBY_PRESENCE_FIELDS: frozenset[str] = RANKED_PRESENCE_FIELDS | {
+    "summoner_icon",
+    "gamemode",
+    "map_id",
+    "queue",
+    "players",
+    "max_players",
+    "is_custom",
+    "is_practice",
+    "application_start_time",
+}
+IN_QUEUE_PRESENCE_FIELDS: frozenset[str] = RANKED_PRESENCE_FIELDS | {
+    "summoner_icon",
+    "gamemode",
+    "map_id",
+    "queue",
+}
+UNHANDLED_PHASE_PRESENCE_FIELDS: frozenset[str] = frozenset(
+    {"gameflow_phase", "summoner_icon", "application_start_time"}
+)
+PRESENCE_FIELDS: dict[str, frozenset[str]] = {
+    ClientState.IN_CLIENT: IN_CLIENT_PRESENCE_FIELDS,
+    ClientState.POST_GAME: IN_CLIENT_PRESENCE_FIELDS,
+    ClientState.IN_LOBBY: IN_LOBBY_PRESENCE_FIELDS,
+    ClientState.IN_QUEUE: IN_QUEUE_PRESENCE_FIELDS,
+    ClientState.IN_CHAMP_SELECT: IN_QUEUE_PRESENCE_FIELDS,
+    # Handled by the in-game loop in __main__.py, and nothing to show while the client is closed.
+    ClientState.IN_GAME: frozenset(),
+    ClientState.CLOSED: frozenset(),
+}
+
+Renderer = Callable[[PresenceWriter, ModuleData], None]
 
 
 # As some events are called multiple times, we should limit the amount of updates to the RPC.
@@ -38,30 +84,123 @@ from league_rpc.utils.const import (
 class RPCUpdater:
     """A dataclass responsible for scheduling and executing updates to the Discord Rich Presence,
     encapsulating logic to delay and batch update requests to avoid rapid, unnecessary refreshes.
+
+    A single long-lived task on the event loop consumes the update queue, so no thread is started no matter
+    how many events arrive, and the presence is always rendered from the latest state.
     """
 
-    scheduled_update: bool = False
-
-    def delay_update(self, module_data: ModuleData) -> None:
-        """Schedules an update if one is not already scheduled within a short delay (1 second)."""
-        if not self.scheduled_update:
-            self.scheduled_update = True
-            Timer(
-                interval=1.0,
-                function=self.update_rpc_and_reset_flag,
-                args=(module_data,),
-            ).start()
-
-    def update_rpc_and_reset_flag(self, module_data: ModuleData) -> None:
-        """Executes the update to Rich Presence and resets the scheduling flag."""
-        self.update_rpc(
-            module_data=module_data
-        )  # Assuming update_rpc is defined elsewhere
-        self.scheduled_update = False
+    snapshot: ClientDataSnapshot = field(default_factory=ClientDataSnapshot)
+    delay: float = RPC_UPDATE_DELAY
+    min_interval: float = RPC_MIN_UPDATE_INTERVAL
+
+    # Each item holds the ClientData fields that changed, or None when the presence must be re-rendered.
+    _queue: asyncio.Queue[tuple[ModuleData, Optional[set[str]]]] = field(
+        default_factory=asyncio.Queue
+    )
+    _worker: Optional[asyncio.Task[None]] = None
+    _last_update_time: float = float("-inf")
+    # The state the presence was last rendered for.
+    _rendered_state: Optional[str] = None
+    # The presence of each state that is shown from the LCU API, looked up by update_rpc.
+    renderers: dict[str, Renderer] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.renderers = {
+            ClientState.IN_CLIENT: self.in_client_rpc,
+            ClientState.POST_GAME: self.in_client_rpc,
+            ClientState.IN_LOBBY: self.lobby_rpc,
+            ClientState.IN_QUEUE: self.in_queue_rpc,
+            ClientState.IN_CHAMP_SELECT: self.in_champ_select_rpc,
+        }
+
+    def delay_update(
+        self, module_data: ModuleData, changed: Optional[set[str]] = None
+    ) -> None:
+        """
+        Queues an update, which is batched with every other update queued within a short delay (1 second).
+        `changed` holds the ClientData fields that changed. None means the presence must be re-rendered.
+        Must be called from the event loop.
+        """
+        if changed is not None and not changed:
+            # Nothing changed, so there is nothing to show.
+            return
+
+        self._ensure_worker()
+        self._queue.put_nowait((module_data, None if changed is None else set(changed)))
+        event_queue_depth.set(self._queue.qsize())
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        """Waits for queued updates, coalesces each burst of them and updates the Rich Presence once."""
+        while True:
+            module_data, changed = await self._queue.get()
+            dirty_fields: set[str] = set(changed or ())
+            force_update: bool = changed is None
+
+            # Keep collecting until the batch delay passed, and at least min_interval since the last update.
+            deadline: float = max(
+                time.monotonic() + self.delay,
+                self._last_update_time + self.min_interval,
+            )
+            while True:
+                try:
+                    module_data, changed = await asyncio.wait_for(
+                        self._queue.get(), max(deadline - time.monotonic(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    break
+                finally:
+                    event_queue_depth.set(self._queue.qsize())
+                force_update = force_update or changed is None
+                dirty_fields |= changed or set()
+
+            try:
+                self.flush_update(
+                    module_data=module_data,
+                    dirty_fields=dirty_fields,
+                    force_update=force_update,
+                )
+            except Exception:
+                # A failing update must not stop the updates that come after it.
+                print(f"{Color.red}Failed to update the Rich Presence{Color.reset}")
+                traceback.print_exc()
+
+    def flush_update(
+        self, module_data: ModuleData, dirty_fields: set[str], force_update: bool
+    ) -> None:
+        """
+        Executes the update to Rich Presence, if the state changed or a field it shows changed, and saves the state snapshot.
+        A new gameflow phase within the same state, such as the ready check while in queue, keeps the current presence.
+        """
+        if (
+            force_update
+            or module_data.gameflow.state != self._rendered_state
+            or self.presence_affected(
+                state=module_data.gameflow.state,
+                phase=module_data.client_data.gameflow_phase,
+                dirty_fields=dirty_fields,
+            )
+        ):
+            self._last_update_time = time.monotonic()
+            rpc_updates.inc("sent")
+            self.update_rpc(module_data=module_data)
+        else:
+            rpc_updates.inc("suppressed")
+        self.snapshot.save(data=module_data.client_data)
+
+    @staticmethod
+    def presence_affected(state: str, phase: str, dirty_fields: set[str]) -> bool:
+        """Returns whether any of the changed fields is shown in the presence of the given state and phase."""
+        if phase not in GAMEFLOW_STATES:
+            return not dirty_fields.isdisjoint(UNHANDLED_PHASE_PRESENCE_FIELDS)
+        return not dirty_fields.isdisjoint(PRESENCE_FIELDS[state])
 
     @staticmethod
     def in_client_rpc(
-        rpc: Presence,
+        rpc: PresenceWriter,
         module_data: ModuleData,
     ) -> None:
         """
@@ -77,7 +216,8 @@ class RPCUpdater:
             # details = status_emojis + details
             details = status_emojis + "  " + details
 
-        rpc.update(  # type: ignore
+        rpc.update(
+            phase=module_data.client_data.gameflow_phase,
             large_image=f"{PROFILE_ICON_BASE_URL}{module_data.client_data.summoner_icon}.png",
             large_text="In Client",
             small_image=LEAGUE_OF_LEGENDS_LOGO,
@@ -87,9 +227,18 @@ class RPCUpdater:
             start=module_data.client_data.application_start_time,
         )
 
+    def lobby_rpc(self, rpc: PresenceWriter, module_data: ModuleData) -> None:
+        """Updates Rich Presence in a lobby, which is a custom lobby for custom games and the practice tool."""
+        self.in_lobby_rpc(
+            rpc=rpc,
+            module_data=module_data,
+            is_custom=module_data.client_data.is_custom
+            or module_data.client_data.is_practice,
+        )
+
     @staticmethod
     def in_lobby_rpc(
-        rpc: Presence,
+        rpc: PresenceWriter,
         module_data: ModuleData,
         is_custom: bool,
     ) -> None:
@@ -99,18 +248,23 @@ class RPCUpdater:
                 f"{PROFILE_ICON_BASE_URL}{str(module_data.client_data.summoner_icon)}.png"
             )
 
-            large_text: str = (
-                f"{GAME_MODE_CONVERT_MAP.get(module_data.client_data.gamemode, module_data.client_data.gamemode)}"
+            large_text: str = module_data.queue_catalog.game_mode_name(
+                map_id=module_data.client_data.map_id,
+                game_mode=module_data.client_data.gamemode,
             )
             small_image: str = BASE_MAP_ICON_URL.format(
-                map_name=MAP_ICON_CONVERT_MAP.get(module_data.client_data.map_id)
+                map_name=module_data.queue_catalog.map_icon_name(
+                    map_id=module_data.client_data.map_id,
+                    game_mode=module_data.client_data.gamemode,
+                )
             )
             small_text = SMALL_TEXT
 
             details: str = f"In Lobby: {module_data.client_data.queue}"
             state = "Custom Lobby"
 
-            rpc.update(  # type: ignore
+            rpc.update(
+                phase=module_data.client_data.gameflow_phase,
                 large_image=large_image,
                 large_text=large_text,
                 small_image=small_image,
@@ -122,10 +276,16 @@ class RPCUpdater:
         else:
             large_image = f"{PROFILE_ICON_BASE_URL}{str(module_data.client_data.summoner_icon)}.png"
 
-            large_text = f"{GAME_MODE_CONVERT_MAP.get(module_data.client_data.gamemode, module_data.client_data.gamemode)}"
+            large_text = module_data.queue_catalog.game_mode_name(
+                map_id=module_data.client_data.map_id,
+                game_mode=module_data.client_data.gamemode,
+            )
 
             small_image = BASE_MAP_ICON_URL.format(
-                map_name=MAP_ICON_CONVERT_MAP.get(module_data.client_data.map_id)
+                map_name=module_data.queue_catalog.map_icon_name(
+                    map_id=module_data.client_data.map_id,
+                    game_mode=module_data.client_data.gamemode,
+                )
             )
             small_text = SMALL_TEXT
             details = f"{module_data.client_data.queue}"
@@ -142,7 +302,8 @@ class RPCUpdater:
                         _small_text,
                     )
 
-            rpc.update(  # type: ignore
+            rpc.update(
+                phase=module_data.client_data.gameflow_phase,
                 large_image=large_image,
                 large_text=large_text,
                 small_image=small_image,
@@ -197,19 +358,29 @@ class RPCUpdater:
 
             case _:
                 ...
+        if small_text and (
+            progress := module_data.rank_timeline.summary(
+                queue_type=module_data.client_data.queue_type
+            )
+        ):
+            small_text = f"{small_text} · {progress}"
         return large_text, small_image, small_text
 
     @staticmethod
-    def in_queue_rpc(rpc: Presence, module_data: ModuleData) -> None:
+    def in_queue_rpc(rpc: PresenceWriter, module_data: ModuleData) -> None:
         """Updates Rich Presence during the queue phase."""
         large_image: str = (
             f"{PROFILE_ICON_BASE_URL}{module_data.client_data.summoner_icon}.png"
         )
-        large_text: str = (
-            f"{GAME_MODE_CONVERT_MAP.get(module_data.client_data.gamemode, module_data.client_data.gamemode)}"
+        large_text: str = module_data.queue_catalog.game_mode_name(
+            map_id=module_data.client_data.map_id,
+            game_mode=module_data.client_data.gamemode,
         )
         small_image: str = BASE_MAP_ICON_URL.format(
-            map_name=MAP_ICON_CONVERT_MAP.get(module_data.client_data.map_id)
+            map_name=module_data.queue_catalog.map_icon_name(
+                map_id=module_data.client_data.map_id,
+                game_mode=module_data.client_data.gamemode,
+            )
         )
         small_text = SMALL_TEXT
 
@@ -224,7 +395,8 @@ class RPCUpdater:
                     _small_text,
                 )
 
-        rpc.update(  # type: ignore
+        rpc.update(
+            phase=module_data.client_data.gameflow_phase,
             large_image=large_image,
             large_text=large_text,
             small_image=small_image,
@@ -235,16 +407,20 @@ class RPCUpdater:
         )
 
     @staticmethod
-    def in_champ_select_rpc(rpc: Presence, module_data: ModuleData) -> None:
+    def in_champ_select_rpc(rpc: PresenceWriter, module_data: ModuleData) -> None:
         """Updates Rich Presence during champion selection."""
         large_image: str = (
             f"{PROFILE_ICON_BASE_URL}{module_data.client_data.summoner_icon}.png"
         )
-        large_text: str = (
-            f"{GAME_MODE_CONVERT_MAP.get(module_data.client_data.gamemode, module_data.client_data.gamemode)}"
+        large_text: str = module_data.queue_catalog.game_mode_name(
+            map_id=module_data.client_data.map_id,
+            game_mode=module_data.client_data.gamemode,
         )
         small_image: str = BASE_MAP_ICON_URL.format(
-            map_name=MAP_ICON_CONVERT_MAP.get(module_data.client_data.map_id)
+            map_name=module_data.queue_catalog.map_icon_name(
+                map_id=module_data.client_data.map_id,
+                game_mode=module_data.client_data.gamemode,
+            )
         )
         small_text = SMALL_TEXT
 
@@ -259,7 +435,8 @@ class RPCUpdater:
                     _small_text,
                 )
 
-        rpc.update(  # type: ignore
+        rpc.update(
+            phase=module_data.client_data.gameflow_phase,
             large_image=large_image,
             large_text=large_text,
             small_image=small_image,
@@ -270,60 +447,37 @@ class RPCUpdater:
         )
 
     # The function that updates discord rich presence, depending on the data
+    @traced(category="presence")
     def update_rpc(self, module_data: ModuleData) -> None:
         """
         Determines the appropriate Rich Presence status based on the game flow phase and updates Discord.
         """
         data: ClientData = module_data.client_data
-        rpc: Presence | None = module_data.rpc
+        rpc: PresenceWriter | None = module_data.presence
 
-        if not isinstance(rpc, Presence):
-            # Only continue if rpc is of type Presence.
+        if rpc is None:
+            # Only continue once the connection to Discord is up.
             return
 
-        match data.gameflow_phase:
-            # This value will be set by "/lol-gameflow/v1/gameflow-phase"
-
-            case GameFlowPhase.IN_PROGRESS:
-                # Handled by the "inGame" flow in __main__.py
-                return
-            case GameFlowPhase.READY_CHECK:
-                # When the READY check comes. We want to just ignore (IN_QUEUE rpc will still show.)
-                return
-
-            case (
-                GameFlowPhase.NONE
-                | GameFlowPhase.WAITING_FOR_STATS
-                | GameFlowPhase.PRE_END_OF_GAME
-                | GameFlowPhase.END_OF_GAME
-            ):
-                self.in_client_rpc(rpc=rpc, module_data=module_data)
-                return
-            case GameFlowPhase.CHAMP_SELECT | GameFlowPhase.GAME_START:
-                # In Champ Select
-                self.in_champ_select_rpc(rpc=rpc, module_data=module_data)
-                return
-            case GameFlowPhase.MATCHMAKING | GameFlowPhase.READY_CHECK:
-                # In Queue
-                self.in_queue_rpc(rpc=rpc, module_data=module_data)
-                return
-            case GameFlowPhase.LOBBY:
-                # In Lobby
-                if data.is_custom or data.is_practice:
-                    self.in_lobby_rpc(rpc=rpc, module_data=module_data, is_custom=True)
-                else:
-                    # matchmaking lobby
-                    self.in_lobby_rpc(rpc=rpc, module_data=module_data, is_custom=False)
-                return
-            case _:
-                # other unhandled gameflow phases
-                print(f"Unhandled Gameflow Phase: {data.gameflow_phase}")
-                rpc.update(  # type: ignore
-                    large_image=f"{PROFILE_ICON_BASE_URL}{str(data.summoner_icon)}.png",
-                    large_text=f"{data.gameflow_phase}",
-                    small_image=LEAGUE_OF_LEGENDS_LOGO,
-                    small_text=SMALL_TEXT,
-                    details=f"{data.gameflow_phase}",
-                    state="Unhandled Gameflow Phase",
-                    start=module_data.client_data.application_start_time,
-                )
+        state: str = module_data.gameflow.state
+        self._rendered_state = state
+        render: Optional[Renderer] = self.renderers.get(state)
+        if render is None:
+            # The in-game loop in __main__.py owns the presence, or the client is closed.
+            return
+        if data.gameflow_phase in GAMEFLOW_STATES:
+            render(rpc, module_data)
+            return
+
+        # other unhandled gameflow phases
+        print(f"Unhandled Gameflow Phase: {data.gameflow_phase}")
+        rpc.update(
+            phase=module_data.client_data.gameflow_phase,
+            large_image=f"{PROFILE_ICON_BASE_URL}{str(data.summoner_icon)}.png",
+            large_text=f"{data.gameflow_phase}",
+            small_image=LEAGUE_OF_LEGENDS_LOGO,
+            small_text=SMALL_TEXT,
+            details=f"{data.gameflow_phase}",
+            state="Unhandled Gameflow Phase",
+            start=module_data.client_data.application_start_time,
+        )
@@ -1,13 +1,48 @@
+import asyncio
 import sys
 import time
 from argparse import Namespace
+from dataclasses import dataclass, field
+from typing import Callable, Optional
 
 import psutil
-import pypresence  # type:ignore
 
 from league_rpc.disable_native_rpc.disable import check_and_modify_json, find_game_path
+from league_rpc.discord_ipc.client import (
+    DiscordIpcError,
+    DiscordIpcInvalidClientId,
+)
+from league_rpc.discord_ipc.discovery import (
+    async_discord_ipc_ready,
+    get_accepting_discord_ipc_paths,
+    get_discord_ipc_dirs,
+)
+from league_rpc.models.gameflow_state import ClientState, GameflowStateMachine
+from league_rpc.models.presence_writer import (
+    PRESENCE_EVENT_FAILED,
+    PRESENCE_EVENT_RECONNECTED,
+    PRESENCE_EVENT_SENT,
+    PresenceEvent,
+    PresenceWriter,
+)
 from league_rpc.utils.color import Color
+from league_rpc.utils.const import (
+    DISCORD_IPC_READY_TIMEOUT,
+    LEAGUE_CLIENT_LAUNCH_TIMEOUT,
+    PROCESS_RECHECK_WINDOW,
+)
+from league_rpc.utils.executor import run_blocking
 from league_rpc.utils.launch_league import launch_league_client
+from league_rpc.utils.metrics import (
+    discord_activities,
+    process_scan_duration,
+    reconnects,
+)
+from league_rpc.utils.polling import async_wait_for_condition
+
+LEAGUE_CLIENT_PROCESSES: list[str] = ["LeagueClient.exe", "LeagueClientUx.exe"]
+LEAGUE_GAME_PROCESS = "League of Legends.exe"
+LEAGUE_CLIENT_UX_PROCESSES: list[str] = ["LeagueClientUx.exe", "LeagueClientUx"]
 
 
 def processes_exists(process_names: list[str]) -> bool:
@@ -15,7 +50,11 @@ def processes_exists(process_names: list[str]) -> bool:
     Given an array of process names.
     Give a boolean return value if any of the names was a running process in the machine.
     """
-    return any(process_exists(process_name) for process_name in process_names)
+    started: float = time.perf_counter()
+    try:
+        return any(process_exists(process_name) for process_name in process_names)
+    finally:
+        process_scan_duration.observe(time.perf_counter() - started)
 
 
 def process_exists(process_name: str) -> bool:
@@ -31,21 +70,106 @@ def process_exists(process_name: str) -> bool:
     return False
 
 
-def check_league_client_process(cli_args: Namespace) -> None:
+def is_league_client_ux(process: psutil.Process) -> bool:
+    """
+    Returns whether the process is the League client UX, which serves the LCU API. Matches what lcu_driver looks for.
+    """
+    if process.status() == psutil.STATUS_ZOMBIE:
+        return False
+    if process.name() in LEAGUE_CLIENT_UX_PROCESSES:
+        return True
+    # Under wine the process name can differ, but the command line still starts with the executable.
+    cmdline: list[str] = process.cmdline()
+    return bool(cmdline) and cmdline[0].endswith(LEAGUE_CLIENT_UX_PROCESSES[0])
+
+
+@dataclass
+class ProcessFinder:
+    """
+    A dataclass finding a running process, while only looking at the processes that were started recently.
+    Listing the pids is cheap, but reading the name and command line of every process is not, so find() can be
+    called every half second for days while League is closed, at close to no CPU.
+    A process is only left alone once it did not match while older than `recheck_window`, so a process that
+    exec's into the client, or refused to be inspected while starting, is still found.
+    """
+
+    matches: Callable[[psutil.Process], bool]
+    recheck_window: float = PROCESS_RECHECK_WINDOW
+
+    # Pids that were inspected, did not match, and are past the recheck window.
+    _seen: set[int] = field(default_factory=set)
+    _found: Optional[psutil.Process] = None
+
+    def find(self) -> Optional[psutil.Process]:
+        """Returns the matching process, or None if it is not running."""
+        if self._found is not None and self._found.is_running():
+            return self._found
+        self._found = None
+
+        started: float = time.perf_counter()
+        pids: set[int] = set(psutil.pids())
+        # Forget the processes that ended, so a reused pid is inspected again.
+        self._seen &= pids
+        try:
+            for pid in pids - self._seen:
+                try:
+                    process = psutil.Process(pid)
+                except psutil.NoSuchProcess:
+                    continue
+                try:
+                    if self.matches(process):
+                        self._found = process
+                        return process
+                except psutil.NoSuchProcess:
+                    continue
+                except (psutil.AccessDenied, psutil.ZombieProcess):
+                    # Still starting, or not the client: it runs as the user, so it can be inspected once started.
+                    pass
+                if self._settled(process):
+                    self._seen.add(pid)
+            return None
+        finally:
+            process_scan_duration.observe(time.perf_counter() - started)
+
+    def _settled(self, process: psutil.Process) -> bool:
+        """Returns whether the process is past the recheck window, and so won't turn into the client anymore."""
+        try:
+            return time.time() - process.create_time() >= self.recheck_window
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return True
+
+
+async def check_league_client_process(cli_args: Namespace) -> None:
     """
     Checks league client processes.
+    The process scans run in the blocking executor, so the event loop keeps running while waiting.
     """
-    league_processes: list[str] = ["LeagueClient.exe", "LeagueClientUx.exe"]
+    league_processes: list[str] = LEAGUE_CLIENT_PROCESSES
 
     print(f"{Color.yellow}Checking if LeagueClient.exe is running...")
-    time.sleep(1)
 
     if cli_args.launch_league:
         # launch league if it's not already running.
-        if not processes_exists(league_processes):
+        if not await run_blocking(processes_exists, process_names=league_processes):
             launch_league_client(cli_args)
+            # Continue as soon as the client process is up, rather than after a fixed delay.
+            await async_wait_for_condition(
+                condition=lambda: run_blocking(
+                    processes_exists, process_names=league_processes
+                ),
+                timeout=LEAGUE_CLIENT_LAUNCH_TIMEOUT,
+                interval=0.5,
+            )
 
-    if not processes_exists(process_names=league_processes):
+    if cli_args.daemon:
+        # The LCU connector notices the client whenever it starts, so there is nothing to wait for here.
+        if not await run_blocking(processes_exists, process_names=league_processes):
+            print(
+                f"{Color.yellow}League is not running. LeagueRPC will wait for it in the background.{Color.reset}"
+            )
+        return
+
+    if not await run_blocking(processes_exists, process_names=league_processes):
         # If league process is still not running, even after launching the client.
         # Then something must have gone wrong.
         # Do not exit app, but rather wait for user to open the correct game..
@@ -56,17 +180,20 @@ def check_league_client_process(cli_args: Namespace) -> None:
 
     wait_time = 0
     while True:
-        if not processes_exists(process_names=league_processes):
-            if process_exists(process_name="RiotClientServices.exe"):
+        if not await run_blocking(processes_exists, process_names=league_processes):
+            if await run_blocking(
+                process_exists, process_name="RiotClientServices.exe"
+            ):
                 # Disable native RPC only if the RiotClientService.exe is running,
                 # but not the league client.
-                if game_path := find_game_path():
-                    check_and_modify_json(file_path=game_path)
+                if game_path := await run_blocking(find_game_path):
+                    await run_blocking(check_and_modify_json, file_path=game_path)
                 else:
                     print(
                         f"{Color.red} Did not find the game path for league.. Can't disable the native RPC.{Color.reset}"
                     )
             if cli_args.wait_for_league == -1:
+                await asyncio.sleep(5)
                 continue
             elif wait_time >= cli_args.wait_for_league:
                 print(
@@ -81,7 +208,7 @@ def check_league_client_process(cli_args: Namespace) -> None:
                 print(
                     f"{Color.yellow}Will wait for League to start. Time left: {cli_args.wait_for_league - wait_time} seconds..."
                 )
-                time.sleep(5)
+                await asyncio.sleep(5)
                 wait_time += 5
                 continue
         break
@@ -89,19 +216,25 @@ def check_league_client_process(cli_args: Namespace) -> None:
     print(f"{Color.green}League client is running!{Color.dgray}(1/2){Color.reset}")
 
 
-def check_discord_process(
-    process_names: list[str], client_id: str, wait_for_discord: int
-) -> pypresence.Presence:
+def count_presence_event(event: PresenceEvent) -> None:
+    """Records what happened to the presence in the metrics."""
+    if event.kind == PRESENCE_EVENT_SENT:
+        discord_activities.inc("sent")
+    elif event.kind == PRESENCE_EVENT_FAILED:
+        discord_activities.inc("failed")
+    elif event.kind == PRESENCE_EVENT_RECONNECTED:
+        reconnects.inc("discord")
+
+
+async def check_discord_process(
+    client_id: str, wait_for_discord: int
+) -> PresenceWriter:
     """
-    Checks if discord process is running.
-    Connects to Discord Rich Presence if it is found.
+    Checks if discord is running, by looking for its IPC socket. Process names are not reliable, as any Electron app would match.
+    Connects to Discord Rich Presence if it is found, and returns the writer owning that connection.
     """
     print(f"\n{Color.yellow}Checking if Discord is running...{Color.reset}")
 
-    look_for_processes = f"({Color.green}{', '.join(process_names)}{Color.blue})"
-
-    time.sleep(1)
-
     if wait_for_discord == -1:
         print(
             f"{Color.yellow}Will wait {Color.green}indefinitely{Color.yellow} for Discord to start... Remember, forever is a long time.. use {Color.green}CTRL + C{Color.yellow} if you would like to quit.{Color.reset}"
@@ -109,15 +242,15 @@ def check_discord_process(
 
     wait_time = 0
     while True:
-        if not processes_exists(process_names=process_names):
+        if not await run_blocking(get_accepting_discord_ipc_paths):
             if wait_for_discord == -1:
-                time.sleep(10)
+                await asyncio.sleep(10)
                 continue
             elif wait_time >= wait_for_discord:
                 print(
                     f"""{Color.red}Discord not running!
-            {Color.blue}Could not find any process with the names {look_for_processes} running on your system.
-            Is your Discord process named something else? Try --add-process <name>{Color.reset}"""
+            {Color.blue}Could not find a Discord IPC socket accepting connections in {Color.green}{', '.join(get_discord_ipc_dirs())}{Color.blue}.
+            Make sure Discord is running, and that Rich Presence is not disabled in its settings.{Color.reset}"""
                 )
 
                 if not wait_for_discord:
@@ -129,85 +262,39 @@ def check_discord_process(
                 print(
                     f"{Color.yellow}Will wait for Discord to start. Time left: {wait_for_discord - wait_time} seconds..."
                 )
-                time.sleep(5)
+                await asyncio.sleep(5)
                 wait_time += 5
                 continue
         break
 
     print(f"{Color.green}Discord is running! {Color.dgray}(2/2){Color.reset}")
 
+    presence = PresenceWriter(client_id=client_id, listeners=[count_presence_event])
     for _ in range(5):
-        time.sleep(3)
+        # Wait until Discord's IPC socket accepts connections, instead of sleeping blindly.
+        if not await async_wait_for_condition(
+            condition=async_discord_ipc_ready, timeout=DISCORD_IPC_READY_TIMEOUT
+        ):
+            continue
         try:
-            rpc = pypresence.Presence(client_id)
-            rpc.connect()
+            await presence.connect()
             break
-        except pypresence.exceptions.InvalidID:
+        except DiscordIpcInvalidClientId:
             print(
                 f"{Color.red}Invalid Client ID. Make sure your Discord Application ID is correct."
             )
             sys.exit()
-        except pypresence.exceptions.DiscordError:
-            # Sometimes when starting discord, an error can occur saying that you logged out.
-            # Weird but can be ignored since it usually works a second or so after.
-            time.sleep(1)
-            continue
-        except pypresence.exceptions.DiscordNotFound:
-            # Sometimes when starting discord, an error can occur saying that you logged out.
-            # Weird but can be ignored since it usually works a second or so after.
-            print(
-                f"{Color.red}Pypresence (RPC) Could not find Discord installed and running on this machine."
-            )
-            sys.exit()
-        except pypresence.exceptions.PipeClosed:
-            # The pipe was closed. Catch this exception and re-connect your instance
-            time.sleep(1)
+        except DiscordIpcError:
+            # Sometimes when starting discord, an error can occur saying that you logged out,
+            # or the pipe is closed right away. Weird but can be ignored since it usually works a second or so after.
+            await asyncio.sleep(1)
             continue
-        except ConnectionRefusedError:
-            print(
-                f"""
-            {Color.red}PyPresence encountered some problems, and could not connect to your Discord's RPC
-            {Color.blue}Try to restart Discord (Close the application from your Task Manager).{Color.reset}
-                """
-            )
-
-            ############################################################
-            # Legacy code.. This was implemented for Linux users only. #
-            ############################################################
-            # print(
-            #     f"""
-            # {Colors.red}PyPresence encountered some problems, and could not connect to your Discord's RPC
-            # {Colors.blue}
-            # 1. One or more of the processes this script was looking for was found {look_for_processes}
-            #     But Pypresence still was unable to detect a running discord-ipc
-            # 2. You may not have a discord ipc running. Try {Colors.reset}``{Colors.green}ls $XDG_RUNTIME_DIR | grep discord-ipc-{Colors.reset}``{Colors.blue} There should only be one result {Colors.reset}``{Colors.green}discord-ipc-0={Colors.reset}``
-            # {Colors.blue}3. Try restarting Discord. (Make sure the process is stopped before doing that.){Colors.reset}
-            #     """
-            # )
-
-            # # If process names were not found, but ipc exists. Try removing them & restarting
-            # if len((val := check_discord_ipc())) > 1:
-            #     print(
-            #         f"""
-            #     {Colors.red}Detected multiple ipc's running.{Colors.reset}
-            #     You seem to have more than 1 ipc running (which is unusual).
-            #     If you know that discord is running, but pypresence keep failing to connect.
-            #     It might be cause you have multiple ipc's running. try removing the following ipc's and {Colors.green}restart discord.{Colors.reset}
-            #     {Colors.yellow}ipc's: {' , '.join(val)}{Colors.reset}
-            #     run: ``{Colors.green}rm  {' '.join(val)}{Colors.reset}``
-            #     Or you just don't have discord up and running..
-            #             """
-            #     )
-            print(
-                f"{Color.red}Raising Exception found by PyPresence, and exiting..{Color.reset}"
-            )
-            sys.exit()
     else:
         print(
             f"{Color.red}Discord process was found but RPC could not be connected.{Color.reset}"
         )
         sys.exit()
-    return rpc
+    return presence
 
 
 ############################################################
@@ -234,15 +321,36 @@ def check_discord_process(
 #     return list_of_ipcs
 
 
-def player_state() -> str | None:
+def league_processes_running() -> tuple[bool, bool]:
     """
-    Returns the player state
+    Returns whether the League client, and whether a game, is running. Uses a single scan of the processes.
     """
-    current_state: str | None = None
+    started: float = time.perf_counter()
+    client_running: bool = False
+    game_running: bool = False
+    for proc in psutil.process_iter():
+        try:
+            name: str = proc.name().lower()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+        client_running = client_running or any(
+            process_name.lower() in name for process_name in LEAGUE_CLIENT_PROCESSES
+        )
+        game_running = game_running or LEAGUE_GAME_PROCESS.lower() in name
+        if client_running and game_running:
+            break
+    process_scan_duration.observe(time.perf_counter() - started)
+    return client_running, game_running
+
 
-    if processes_exists(process_names=["LeagueClient.exe", "LeagueClientUx.exe"]):
-        if process_exists(process_name="League of Legends.exe"):
-            current_state = "InGame"
-        else:
-            current_state = "InLobby"
-    return current_state
+async def watch_league_processes(gameflow: GameflowStateMachine) -> None:
+    """
+    Feeds the running League processes into the state machine, until the League client is closed.
+    Checks as often as the current state asks for, and right away after every change of state.
+    """
+    while True:
+        client_running, game_running = await run_blocking(league_processes_running)
+        gameflow.update(client_running=client_running, game_running=game_running)
+        if gameflow.state == ClientState.CLOSED:
+            return
+        await gameflow.wait(timeout=gameflow.poll_interval)
@@ -2,44 +2,64 @@
 Holds functions to try to reconnect to discord whenever the pipe closes or discord suddenly crashes.
 """
 
-import sys
+import asyncio
+import random
 import time
+from typing import Awaitable, Callable, Optional
 
-import pypresence
-
+from league_rpc.discord_ipc.client import DiscordIpcClient, DiscordIpcError
+from league_rpc.discord_ipc.discovery import async_discord_ipc_ready
 from league_rpc.utils.color import Color
+from league_rpc.utils.const import (
+    DISCORD_PROBE_INTERVAL,
+    DISCORD_RECONNECT_INITIAL_DELAY,
+    DISCORD_RECONNECT_MAX_DELAY,
+)
 
 
-def discord_reconnect_attempt(
-    rpc: pypresence.Presence,
-    amount_of_tries: int = 12,
-    amount_of_waiting: int = 5,
-):
+async def discord_reconnect_attempt(
+    client: DiscordIpcClient,
+    initial_delay: float = DISCORD_RECONNECT_INITIAL_DELAY,
+    max_delay: float = DISCORD_RECONNECT_MAX_DELAY,
+    probe_interval: float = DISCORD_PROBE_INTERVAL,
+    give_up: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> Optional[float]:
     """
-    Attempts to connect to discord, over a period of time. If it still fails, it will exit the program.
+    Reconnects to discord, for as long as it takes. Returns the amount of seconds it took.
+
+    While Discord is closed, its IPC socket is probed every `probe_interval` seconds, which is much cheaper
+    than a handshake. Only once it accepts connections a handshake is attempted. Handshakes that still fail,
+    typically while Discord is starting up, are retried with an exponential backoff.
+
+    `give_up` is asked after every probe that found the socket closed. Once it returns True, this stops
+    and returns None.
     """
-    for i in range(amount_of_tries):
+    started: float = time.monotonic()
+    paths: Optional[list[str]] = [client.path] if client.path else None
+    delay: float = initial_delay
+    attempt: int = 0
+
+    while True:
+        if not await async_discord_ipc_ready(paths=paths):
+            if give_up is not None and await give_up():
+                return None
+            await asyncio.sleep(probe_interval)
+            continue
+
+        attempt += 1
         try:
-            time.sleep(amount_of_waiting)
-            print(
-                f"{Color.yellow}({i + 1}/{amount_of_tries}). Attempting to reconnect..{Color.reset}"
-            )
-            rpc.connect()
+            await client.connect()
+        except DiscordIpcError as exc:
             print(
-                f"{Color.green}Successfully reconnected.. Proceeding as normal.{Color.reset}"
+                f"{Color.yellow}({attempt}). Discord is not ready yet ({exc}), retrying in {delay:.1f} seconds..{Color.reset}"
             )
-            break
-
-        except (
-            pypresence.exceptions.DiscordNotFound,
-            pypresence.exceptions.DiscordError,
-            pypresence.exceptions.InvalidPipe,
-            pypresence.exceptions.PipeClosed,
-            ConnectionError,
-        ):
-            pass
-    else:
+            # Jitter keeps several clients from retrying in lockstep.
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, max_delay)
+            continue
+
+        downtime: float = time.monotonic() - started
         print(
-            f"{Color.red}Was unable to reconnect to Discord. after trying for {amount_of_tries * amount_of_waiting} seconds.{Color.reset}"
+            f"{Color.green}Successfully reconnected after {downtime:.1f} seconds.. Proceeding as normal.{Color.reset}"
         )
-        sys.exit()
+        return downtime
@@ -1,11 +1,5 @@
 # Discord Application: League of Legends
 DEFAULT_CLIENT_ID = "1194034071588851783"
-DISCORD_PROCESS_NAMES: list[str] = [
-    "Discord",
-    "DiscordPTB",
-    "DiscordCanary",
-    "electron",
-]
 LEAGUE_OF_LEGENDS_LOGO = "https://github.com/Its-Haze/league-rpc/blob/master/assets/leagueoflegends.png?raw=true"
 SMALL_TEXT = "github.com/Its-Haze/league-rpc"
 
@@ -13,6 +7,8 @@ ALL_GAME_DATA_URL = "https://127.0.0.1:2999/liveclientdata/allgamedata"
 
 ACTIVE_PLAYER_URL = "https://127.0.0.1:2999/liveclientdata/activeplayer"
 
+GAME_STATS_URL = "https://127.0.0.1:2999/liveclientdata/gamestats"
+
 PLAYER_KDA_SCORES_URL = (
     "https://127.0.0.1:2999/liveclientdata/playerscores?riotId={riotId}"
 )
@@ -93,3 +89,73 @@ RANKED_TYPE_MAPPER = {
 
 DEFAULT_LEAGUE_CLIENT_EXE_PATH = "C:\\Riot Games\\Riot Client\\RiotClientServices.exe"
 DEFAULT_LEAGUE_CLIENT_EXECUTABLE = "RiotClientServices.exe"
+
+# Readiness probe timeouts (seconds)
+LEAGUE_CLIENT_LAUNCH_TIMEOUT = 30
+DISCORD_IPC_READY_TIMEOUT = 15
+LCU_READY_TIMEOUT = 30
+LCU_REQUEST_TIMEOUT = 5
+
+# Max threads used for blocking work (process scans, live client API requests, disk I/O).
+BLOCKING_EXECUTOR_MAX_WORKERS = 4
+
+# Presence updates: how long to collect a burst of changes, and the minimum time between two updates (seconds).
+RPC_UPDATE_DELAY = 1.0
+RPC_MIN_UPDATE_INTERVAL = 1.0
+
+# The client state file is written at most this often, however often the client data changes (seconds).
+CLIENT_STATE_MIN_WRITE_INTERVAL = 30.0
+
+# Discord accepts 5 activity updates per 20 seconds. Routine refreshes leave 1 of them for phase transitions.
+DISCORD_ACTIVITY_RATE_LIMIT = 5
+DISCORD_ACTIVITY_RATE_PERIOD = 20
+DISCORD_ACTIVITY_RESERVED_TOKENS = 1
+
+# Deadline of a single call to Discord's IPC (seconds).
+DISCORD_IPC_CALL_TIMEOUT = 5
+
+# Reconnecting to Discord: how often the IPC socket is probed while Discord is closed,
+# and the backoff between handshakes that fail while it's starting up (seconds).
+DISCORD_PROBE_INTERVAL = 0.5
+DISCORD_RECONNECT_INITIAL_DELAY = 0.5
+DISCORD_RECONNECT_MAX_DELAY = 30
+# How often an idle connection is checked for having been closed by Discord (seconds).
+DISCORD_CONNECTION_CHECK_INTERVAL = 5
+# How often to look for Discord clients that were started later, such as PTB or Canary next to stable (seconds).
+DISCORD_DISCOVERY_INTERVAL = 5
+# A channel whose IPC socket is gone for this long stops, and discovery connects to it again if it returns (seconds).
+# A restart of Discord is usually over by then, and is followed by the channel itself.
+DISCORD_CHANNEL_RETIRE_DELAY = 60
+
+# How often to look for the League Client process while it's not running (seconds).
+LCU_PROCESS_POLL_INTERVAL = 0.5
+# New processes are inspected again until they are this old (seconds), as wine starts the client under another
+# name and only then exec's into it, and a process that is still starting can refuse to be inspected.
+PROCESS_RECHECK_WINDOW = 30.0
+
+# Event loop lag: how often it is measured, and above which lag a warning is printed (seconds).
+LOOP_LAG_CHECK_INTERVAL = 0.5
+LOOP_LAG_WARNING_THRESHOLD = 0.25
+
+# Spans kept in memory by --trace, at most. Later spans are dropped.
+TRACE_MAX_EVENTS = 1_000_000
+
+# Distinct ranks kept as shared objects. A rank changes a few times a day, so a handful covers a long session.
+RANKED_STATS_CACHE_SIZE = 32
+
+# Finished games are written to the match history in batches, at most this long after the game ended (seconds).
+MATCH_HISTORY_FLUSH_DELAY = 5.0
+
+# Samples kept for the in-game per-minute rates. At one sample per refresh (10 seconds), they follow the last 5 minutes.
+RATE_WINDOW_SAMPLES = 30
+
+# The rank timeline keeps this many rank changes per ranked queue, for at most this many days.
+RANK_TIMELINE_MAX_POINTS = 200
+RANK_TIMELINE_RETENTION_DAYS = 30
+RANK_TIMELINE_FLUSH_DELAY = 5.0
+# Shortest win or loss streak shown in the presence.
+RANK_TIMELINE_STREAK_MIN = 2
+
+# The recorded games (--record-game) are written to disk this often (seconds), and their requests time out after this.
+TIMESERIES_FLUSH_INTERVAL = 60.0
+TIMESERIES_REQUEST_TIMEOUT = 1.0
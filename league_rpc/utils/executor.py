@@ -0,0 +1,30 @@
+"""
+Holds the bounded thread pool for blocking work, such as process scans, requests to the live client API and disk I/O.
+Everything else runs on the event loop, so blocking calls must go through run_blocking.
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from league_rpc.utils.const import BLOCKING_EXECUTOR_MAX_WORKERS
+
+T = TypeVar("T")
+
+blocking_executor = ThreadPoolExecutor(
+    max_workers=BLOCKING_EXECUTOR_MAX_WORKERS, thread_name_prefix="blocking"
+)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a blocking function in the bounded executor, and awaits its result.
+    Use this for anything that scans processes, makes HTTP requests or touches the disk, to keep the event loop free.
+    The function runs in a copy of the current context, so a span started around the call is its parent.
+    """
+    context: contextvars.Context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        blocking_executor, partial(context.run, func, *args, **kwargs)
+    )
@@ -0,0 +1,49 @@
+"""
+Measures the scheduling latency of the event loop: how late a sleep that should have ended wakes up.
+Everything runs on the one event loop, so a blocking call that was not moved to the executor shows up here as lag.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+from league_rpc.utils.color import Color
+from league_rpc.utils.const import LOOP_LAG_CHECK_INTERVAL, LOOP_LAG_WARNING_THRESHOLD
+
+
+@dataclass
+class LoopLagMonitor:
+    """A dataclass measuring the lag of the event loop every `interval` seconds, and warning when it exceeds `threshold`."""
+
+    interval: float = LOOP_LAG_CHECK_INTERVAL
+    threshold: float = LOOP_LAG_WARNING_THRESHOLD
+
+    samples: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+
+    @property
+    def average_lag(self) -> float:
+        return self.total_lag / self.samples if self.samples else 0.0
+
+    def record(self, lag: float) -> None:
+        """Records one measured lag, in seconds."""
+        self.samples += 1
+        self.last_lag = lag
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag > self.threshold:
+            print(
+                f"{Color.orange}The event loop was blocked for {lag * 1000:.0f}ms. Something is running on it that should not.{Color.reset}"
+            )
+
+    async def run(self) -> None:
+        """Measures the lag until cancelled."""
+        while True:
+            expected: float = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(lag=max(time.monotonic() - expected, 0.0))
+
+
+loop_monitor = LoopLagMonitor()
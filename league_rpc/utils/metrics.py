@@ -0,0 +1,351 @@
+"""
+Counters, gauges and histograms describing what LeagueRPC costs while it runs, and an opt-in local HTTP
+endpoint (--metrics-port) serving them at /metrics in the Prometheus text format.
+Recording a metric is a dict lookup and an addition, so the metrics are always collected, also without the endpoint.
+"""
+
+import asyncio
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import psutil
+
+from league_rpc.utils.color import Color
+from league_rpc.utils.loop_monitor import loop_monitor
+
+LabelValues = tuple[str, ...]
+
+# Latency buckets (seconds), from a local request to a slow CDN.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Ids in endpoints, such as /lol-game-queues/v1/queues/420, would give every id its own time series.
+NUMBER_PATTERN = re.compile(r"/\d+(?=/|$)")
+
+# The "source" label of the HTTP request metrics.
+SOURCE_LIVE_CLIENT = "live_client"
+SOURCE_LCU = "lcu"
+SOURCE_CDN = "cdn"
+
+
+def endpoint_label(url: str) -> str:
+    """Returns the endpoint of a url as a metric label: the path without ids or the query string."""
+    return NUMBER_PATTERN.sub("/{id}", urlsplit(url).path or "/")
+
+
+def host_label(url: str) -> str:
+    """Returns the host of a url as a metric label, for CDNs whose paths hold versions and champion names."""
+    return urlsplit(url).netloc
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs: str = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+@dataclass
+class Counter:
+    """A value that only goes up, such as a number of requests."""
+
+    name: str
+    help: str
+    labels: tuple[str, ...] = ()
+    _values: dict[LabelValues, float] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        # Counters are also increased from the blocking executor.
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> list[str]:
+        lines: list[str] = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} counter",
+        ]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+            )
+        return lines
+
+
+@dataclass
+class Gauge:
+    """A value that goes up and down. If `function` is given, it is read at every scrape instead."""
+
+    name: str
+    help: str
+    function: Optional[Callable[[], float]] = None
+    _value: float = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def value(self) -> float:
+        return self.function() if self.function is not None else self._value
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.value())}",
+        ]
+
+
+@dataclass
+class Histogram:
+    """Counts observations, such as request latencies, in cumulative buckets."""
+
+    name: str
+    help: str
+    labels: tuple[str, ...] = ()
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    # Per label values: the count of every bucket (not cumulative), the sum and the count.
+    _series: dict[LabelValues, tuple[list[int], list[float]]] = field(
+        default_factory=dict
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = (
+                    [0] * (len(self.buckets) + 1),
+                    [0.0, 0.0],
+                )
+            counts, totals = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return int(series[1][1]) if series else 0
+
+    def render(self) -> list[str]:
+        lines: list[str] = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label_values, (counts, totals) in sorted(self._series.items()):
+            cumulative: int = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels: str = _format_labels(
+                    (*self.labels, "le"), (*label_values, _format_value(bound))
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(totals[0])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(totals[1])}")
+        return lines
+
+
+Metric = Counter | Gauge | Histogram
+M = TypeVar("M", Counter, Gauge, Histogram)
+
+
+@dataclass
+class MetricsRegistry:
+    """Holds every metric, and renders them in the Prometheus text format."""
+
+    metrics: list[Metric] = field(default_factory=list)
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name=name, help=help, labels=labels))
+
+    def gauge(
+        self, name: str, help: str, function: Optional[Callable[[], float]] = None
+    ) -> Gauge:
+        return self._add(Gauge(name=name, help=help, function=function))
+
+    def histogram(
+        self, name: str, help: str, labels: tuple[str, ...] = ()
+    ) -> Histogram:
+        return self._add(Histogram(name=name, help=help, labels=labels))
+
+    def _add(self, metric: M) -> M:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+_process = psutil.Process(os.getpid())
+
+http_requests = registry.counter(
+    "leaguerpc_http_requests_total",
+    "HTTP requests to the Live Client API, the LCU API and the CDNs.",
+    labels=("source", "endpoint", "status"),
+)
+http_request_duration = registry.histogram(
+    "leaguerpc_http_request_duration_seconds",
+    "Latency of the HTTP requests to the Live Client API, the LCU API and the CDNs.",
+    labels=("source", "endpoint"),
+)
+lcu_events = registry.counter(
+    "leaguerpc_lcu_events_total",
+    "LCU events that reached a handler, by whether the handler ran or the event was skipped as unchanged.",
+    labels=("handler", "result"),
+)
+lcu_handler_duration = registry.histogram(
+    "leaguerpc_lcu_handler_duration_seconds",
+    "Time spent in each LCU event handler.",
+    labels=("handler",),
+)
+rpc_updates = registry.counter(
+    "leaguerpc_rpc_updates_total",
+    "Presence renders: sent to the PresenceWriter, or suppressed as nothing shown had changed.",
+    labels=("result",),
+)
+discord_activities = registry.counter(
+    "leaguerpc_discord_activities_total",
+    "Activity updates delivered to Discord, or refused by it.",
+    labels=("result",),
+)
+reconnects = registry.counter(
+    "leaguerpc_reconnects_total",
+    "Reconnects to Discord and to the League Client API.",
+    labels=("target",),
+)
+process_scan_duration = registry.histogram(
+    "leaguerpc_process_scan_duration_seconds",
+    "Duration of the scans of the running processes.",
+)
+event_queue_depth = registry.gauge(
+    "leaguerpc_event_queue_depth",
+    "Presence updates waiting to be batched by the RPCUpdater.",
+)
+registry.gauge(
+    "leaguerpc_threads",
+    "Threads of the process.",
+    function=threading.active_count,
+)
+registry.gauge(
+    "leaguerpc_resident_memory_bytes",
+    "Resident memory of the process.",
+    function=lambda: _process.memory_info().rss,
+)
+registry.gauge(
+    "leaguerpc_cpu_seconds",
+    "CPU time (user and system) used by the process.",
+    function=lambda: sum(_process.cpu_times()[:2]),
+)
+
+registry.gauge(
+    "leaguerpc_event_loop_lag_seconds",
+    "Scheduling latency of the event loop, at the last measurement.",
+    function=lambda: loop_monitor.last_lag,
+)
+registry.gauge(
+    "leaguerpc_event_loop_lag_max_seconds",
+    "Highest scheduling latency of the event loop so far.",
+    function=lambda: loop_monitor.max_lag,
+)
+
+
+@dataclass
+class MetricsServer:
+    """A minimal HTTP server answering GET /metrics on the event loop. Only listens on localhost."""
+
+    port: int
+    host: str = "127.0.0.1"
+    metrics: MetricsRegistry = field(default_factory=lambda: registry)
+    _server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(
+            f"{Color.green}Serving metrics at {Color.blue}http://{self.host}:{self.port}/metrics{Color.reset}"
+        )
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request_line: bytes = await asyncio.wait_for(reader.readline(), 5)
+            # Skip the headers, nothing in them changes the response.
+            while (await asyncio.wait_for(reader.readline(), 5)).strip():
+                pass
+        except (asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return
+
+        parts: list[str] = request_line.decode("latin-1").split()
+        if (
+            len(parts) >= 2
+            and parts[0] == "GET"
+            and parts[1].split("?")[0] == "/metrics"
+        ):
+            status, body = "200 OK", self.metrics.render()
+        else:
+            status, body = (
+                "404 Not Found",
+                "Not found. Metrics are served at /metrics\n",
+            )
+        data: bytes = body.encode("utf-8")
+        writer.write(
+            (
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+            + data
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
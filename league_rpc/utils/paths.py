@@ -0,0 +1,31 @@
+"""
+Holds functions to locate where LeagueRPC keeps its files between runs.
+"""
+
+import os
+import sys
+
+APP_DIR_NAME = "league-rpc"
+
+
+def get_data_dir() -> str:
+    """
+    Returns the per-user directory for LeagueRPC's state files, and creates it if needed.
+    %LOCALAPPDATA% on Windows, $XDG_STATE_HOME (or ~/.local/state) everywhere else.
+    """
+    if sys.platform == "win32":
+        base_dir: str = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base_dir = os.environ.get("XDG_STATE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".local", "state"
+        )
+    data_dir: str = os.path.join(base_dir, APP_DIR_NAME)
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+
+def get_data_file(file_name: str) -> str:
+    """
+    Returns the full path of a file inside the data directory.
+    """
+    return os.path.join(get_data_dir(), file_name)
@@ -1,9 +1,48 @@
+import asyncio
 import time
+from typing import Any, Awaitable, Callable, Optional
 
 import requests
 from urllib3.exceptions import NewConnectionError
 
+from league_rpc.utils.metrics import (
+    SOURCE_LIVE_CLIENT,
+    endpoint_label,
+    http_request_duration,
+    http_requests,
+)
+from league_rpc.utils.tracing import traced, tracer
 
+
+def timed_request(
+    method: str,
+    url: str,
+    source: str,
+    endpoint: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """
+    Sends an HTTP request with requests, and records its latency and status in the metrics.
+    `endpoint` is the metric label of the request, by default the path of the url.
+    Goes through `session` when one is given, to keep its connection alive between requests.
+    """
+    endpoint = endpoint or endpoint_label(url)
+    status: str = "error"
+    started: float = time.perf_counter()
+    try:
+        with tracer.span(f"{method} {endpoint}", source, url=url):
+            response: requests.Response = (session or requests).request(
+                method, url, **kwargs
+            )
+        status = str(response.status_code)
+        return response
+    finally:
+        http_request_duration.observe(time.perf_counter() - started, source, endpoint)
+        http_requests.inc(source, endpoint, status)
+
+
+@traced(category=SOURCE_LIVE_CLIENT)
 def wait_until_exists(
     url: str,
     custom_message: str = "",
@@ -19,7 +58,9 @@ def wait_until_exists(
 
     for _ in range(n_total_amount):
         try:
-            response = requests.get(url, timeout=timeout, verify=False)
+            response = timed_request(
+                "GET", url, source=SOURCE_LIVE_CLIENT, timeout=timeout, verify=False
+            )
             if response.status_code != expected_response_code:
                 time.sleep(n_sleep)
                 continue
@@ -42,3 +83,47 @@ def wait_until_exists(
         print(custom_message)
         return None
     return response
+
+
+def wait_for_condition(
+    condition: Callable[[], bool],
+    timeout: float,
+    interval: float = 0.1,
+    max_interval: float = 1.0,
+) -> bool:
+    """
+    Probes the condition until it returns True, or the timeout (in seconds) expires.
+    The interval between probes doubles up to max_interval, so a ready dependency
+    is detected almost immediately, while a slow one is not hammered.
+    Returns whether the condition was met.
+    """
+    deadline: float = time.monotonic() + timeout
+    while True:
+        if condition():
+            return True
+        remaining: float = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, max_interval)
+
+
+async def async_wait_for_condition(
+    condition: Callable[[], Awaitable[bool]],
+    timeout: float,
+    interval: float = 0.1,
+    max_interval: float = 1.0,
+) -> bool:
+    """
+    Same as wait_for_condition, but for coroutines.
+    Awaits between probes, so the event loop is never blocked while waiting.
+    """
+    deadline: float = time.monotonic() + timeout
+    while True:
+        if await condition():
+            return True
+        remaining: float = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(interval, remaining))
+        interval = min(interval * 2, max_interval)
@@ -0,0 +1,217 @@
+"""
+Lightweight spans around units of work (HTTP requests, LCU handlers, presence updates), written as a Chrome
+trace-event file when --trace is given. The file opens in Perfetto (ui.perfetto.dev) or chrome://tracing.
+
+Each task name and each executor thread gets its own track, so concurrent work never overlaps on one track.
+Tasks that do the same work one after another, such as the drains of an LCU handler, share a name and so a track.
+A span started inside another one records it as its parent, also across tasks and run_blocking calls.
+While tracing is disabled, span() returns a shared no-op context manager, so instrumented code pays a
+single attribute check.
+"""
+
+import asyncio
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, TypeVar
+
+from league_rpc.utils.color import Color
+from league_rpc.utils.const import TRACE_MAX_EVENTS
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# The id of the span that is running in the current context.
+_current_span: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class _NullSpan:
+    """Stands in for a span while tracing is disabled."""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        return None
+
+
+NULL_SPAN = _NullSpan()
+
+
+@dataclass
+class Span:
+    """A unit of work, recorded as a complete ("X") trace event when it ends."""
+
+    tracer: "Tracer"
+    name: str
+    category: str
+    args: dict[str, Any]
+    span_id: int = 0
+    parent_id: Optional[int] = None
+    _started: float = 0.0
+    _token: Optional[contextvars.Token[Optional[int]]] = None
+
+    def __enter__(self) -> "Span":
+        self.span_id = next(self.tracer._ids)
+        self.parent_id = _current_span.get()
+        self._token = _current_span.set(self.span_id)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, *_: Any) -> None:
+        ended: float = time.perf_counter()
+        _current_span.reset(self._token)  # type: ignore
+        args: dict[str, Any] = dict(self.args, span_id=self.span_id)
+        if self.parent_id is not None:
+            args["parent_id"] = self.parent_id
+        if exc_type is not None:
+            args["error"] = exc_type.__name__
+        self.tracer.record(
+            {
+                "name": self.name,
+                "cat": self.category,
+                "ph": "X",
+                "ts": self.tracer.timestamp(self._started),
+                "dur": round((ended - self._started) * 1_000_000, 3),
+                "pid": self.tracer.pid,
+                "tid": self.tracer.track(),
+                "args": args,
+            }
+        )
+
+
+@dataclass
+class Tracer:
+    """A dataclass collecting spans in memory, and writing them to a Chrome trace-event file on save()."""
+
+    path: Optional[str] = None
+    enabled: bool = False
+    max_events: int = TRACE_MAX_EVENTS
+    pid: int = field(default_factory=os.getpid)
+
+    events: list[dict[str, Any]] = field(default_factory=list)
+    dropped: int = 0
+    _started: float = field(default_factory=time.perf_counter)
+    _ids: itertools.count = field(default_factory=lambda: itertools.count(1))
+    # Track ids of the task names and threads, in order of appearance. Never holds on to a task.
+    _tracks: dict[Any, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def start(self, path: str) -> None:
+        """Starts recording spans, to be written to the given file."""
+        self.path = path
+        self.enabled = True
+        self._started = time.perf_counter()
+        print(f"{Color.dgray}Tracing to {path}{Color.reset}")
+
+    def span(self, name: str, category: str = "app", **args: Any) -> Any:
+        """Returns a context manager timing the work inside it. A no-op while tracing is disabled."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(tracer=self, name=name, category=category, args=args)
+
+    def timestamp(self, moment: float) -> float:
+        return round((moment - self._started) * 1_000_000, 3)
+
+    def track(self) -> int:
+        """Returns the track of the running task's name, or of the executor thread."""
+        key: Any
+        name: str
+        try:
+            task: Optional[asyncio.Task[Any]] = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            name = task.get_name()
+            key = ("task", name)
+        else:
+            thread: threading.Thread = threading.current_thread()
+            key, name = thread.ident, thread.name
+
+        with self._lock:
+            track: Optional[int] = self._tracks.get(key)
+            if track is None:
+                track = self._tracks[key] = len(self._tracks) + 1
+                self._append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": self.pid,
+                        "tid": track,
+                        "args": {"name": name},
+                    }
+                )
+        return track
+
+    def record(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            self._append(event)
+
+    def _append(self, event: dict[str, Any]) -> None:
+        if len(self.events) >= self.max_events:
+            # A forgotten --trace must not grow without bounds.
+            self.dropped += 1
+            return
+        self.events.append(event)
+
+    def save(self) -> None:
+        """Writes the collected spans to the trace file."""
+        if not self.enabled or self.path is None:
+            return
+        with self._lock:
+            events: list[dict[str, Any]] = list(self.events)
+        try:
+            with open(file=self.path, mode="w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "traceEvents": events,
+                        "displayTimeUnit": "ms",
+                        "otherData": {"dropped_events": self.dropped},
+                    },
+                    file,
+                    separators=(",", ":"),
+                )
+        except OSError as exc:
+            print(f"{Color.orange}Could not write the trace: {exc}{Color.reset}")
+            return
+        print(
+            f"{Color.dgray}Wrote {len(events)} trace events to {self.path}{Color.reset}"
+        )
+
+
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None, category: str = "app") -> Callable[[F], F]:
+    """Decorates a function or coroutine function, so every call is a span."""
+
+    def decorator(func: F) -> F:
+        span_name: str = name or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.span(span_name, category):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -0,0 +1,50 @@
+"""Fixtures shared by the tests."""
+
+import asyncio
+from typing import Any, Iterator
+
+import pytest
+
+from league_rpc.lcu_api import lcu_connector
+from league_rpc.models.client_data_snapshot import ClientDataSnapshot
+from league_rpc.models.module_data import ModuleData
+from league_rpc.models.rank_timeline import RankTimeline
+from league_rpc.models.rpc_updater import RPCUpdater
+
+RPC_DELAY = 0.05
+
+
+@pytest.fixture
+def current_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """A current event loop for the lcu_driver Connector, since asyncio.run() unsets it after every test."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+@pytest.fixture
+def connector(
+    tmp_path: Any,
+    monkeypatch: pytest.MonkeyPatch,
+    current_loop: asyncio.AbstractEventLoop,
+) -> Any:
+    """The LCU connector module, with fresh state that is kept in a temporary directory, and no LCU connection."""
+    module_data = ModuleData(
+        rank_timeline=RankTimeline(path=str(tmp_path / "rank_timeline.json"))
+    )
+    rpc_updater = RPCUpdater(
+        snapshot=ClientDataSnapshot(path=str(tmp_path / "client_state.json")),
+        delay=RPC_DELAY,
+        min_interval=0,
+    )
+    monkeypatch.setattr(lcu_connector, "module_data", module_data)
+    monkeypatch.setattr(lcu_connector, "rpc_updater", rpc_updater)
+
+    async def no_connection() -> None:
+        # The LCU API never answers during these tests.
+        return None
+
+    monkeypatch.setattr(lcu_connector, "run_connector", no_connection)
+    return lcu_connector
@@ -0,0 +1,33 @@
+"""A state file written by another version still warm starts what it can."""
+
+import json
+from typing import Any
+
+from league_rpc.models.client_data import ClientData
+from league_rpc.models.client_data_snapshot import (
+    STATE_FILE_VERSION,
+    ClientDataSnapshot,
+)
+
+
+def test_ranked_stats_with_other_fields_are_skipped(tmp_path: Any) -> None:
+    path = tmp_path / "client_state.json"
+    path.write_text(
+        json.dumps(
+            {
+                "version": STATE_FILE_VERSION,
+                "client_data": {
+                    "summoner_icon": 4321,
+                    "summoner_rank": {"tier": "Gold", "renamed_field": 1},
+                    "tft_rank": None,
+                },
+            }
+        )
+    )
+    data = ClientData()
+
+    assert ClientDataSnapshot(path=str(path)).load(data)
+
+    assert data.summoner_icon == 4321
+    assert data.summoner_rank == ClientData().summoner_rank
+    assert data.tft_rank == ClientData().tft_rank
@@ -0,0 +1,96 @@
+"""Recorded games are written in the columnar format, read back without copies, and never skipped."""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+import requests
+
+from league_rpc import live_timeseries
+from league_rpc.live_timeseries import (
+    TIMESERIES_SUFFIX,
+    LiveGameRecorder,
+    TimeSeries,
+    read_timeseries,
+)
+
+
+def sample(game_time: float) -> dict[str, float]:
+    return {
+        "game_time": game_time,
+        "gold": 500.0 + game_time,
+        "level": 1 + int(game_time) // 60,
+        "creep_score": int(game_time) // 10,
+        "kills": 1,
+        "deaths": 0,
+        "assists": 2,
+    }
+
+
+def test_a_recorded_game_is_read_back_as_written(tmp_path: Any) -> None:
+    path = str(tmp_path / f"game{TIMESERIES_SUFFIX}")
+    series = TimeSeries(sample_interval=1.0, started_at=1_700_000_000.0)
+    for game_time in (1.0, 2.0, 70.0):
+        series.append(**sample(game_time))
+    series.save(path)
+
+    with read_timeseries(path) as mapped:
+        assert (mapped.samples, mapped.sample_interval, mapped.started_at) == (
+            3,
+            1.0,
+            1_700_000_000.0,
+        )
+        assert list(mapped.columns["game_time"]) == [1.0, 2.0, 70.0]
+        assert list(mapped.columns["level"]) == [1, 1, 2]
+        assert list(mapped.columns["creep_score"]) == [0, 0, 7]
+        assert mapped.columns["gold"].format == "f"
+
+
+def test_a_file_that_is_not_a_recorded_game_is_refused(tmp_path: Any) -> None:
+    path = tmp_path / "not-a-game.lrts"
+    path.write_bytes(b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        read_timeseries(str(path))
+
+
+def test_a_game_started_while_the_last_one_is_saved_is_recorded(
+    tmp_path: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    released = threading.Event()
+    now = datetime(2026, 1, 1)
+
+    class Clock:
+        @staticmethod
+        def now() -> datetime:
+            nonlocal now
+            now += timedelta(seconds=1)
+            return now
+
+    def slow_sample(series: TimeSeries, session: Any, riot_id: Any) -> str:
+        series.append(**sample(float(len(series) + 1)))
+        # The request of the first game hangs until the second game started.
+        if not released.wait(timeout=5):
+            raise requests.exceptions.Timeout()
+        return "Player#EUW"
+
+    monkeypatch.setattr(live_timeseries, "datetime", Clock)
+    monkeypatch.setattr(LiveGameRecorder, "_sample", staticmethod(slow_sample))
+    recorder = LiveGameRecorder(directory=str(tmp_path), rate=20)
+
+    recorder.start()
+    first_game = recorder._thread
+    recorder.stop()
+    recorder.start()
+    assert recorder._thread is not first_game
+    released.set()
+    recorder.stop(wait=True)
+    assert first_game is not None
+    first_game.join()
+
+    recordings = sorted(tmp_path.glob(f"*{TIMESERIES_SUFFIX}"))
+    assert len(recordings) == 2
+    for recording in recordings:
+        with read_timeseries(str(recording)) as mapped:
+            assert mapped.samples >= 1
@@ -0,0 +1,54 @@
+"""The event loop is never blocked for more than a few ms, even while the blocking work is slow."""
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from league_rpc.lcu_api.event_replay import ReplayConnection
+from league_rpc.lcu_api.memory_benchmark import synthetic_session
+from league_rpc.processes import process
+from league_rpc.utils.loop_monitor import LoopLagMonitor
+
+# How long each blocking call takes in the test, and the most the loop may lag meanwhile (seconds).
+SLOW_CALL = 0.3
+MAX_LOOP_LAG = 0.05
+
+
+def slow(result: Any) -> Any:
+    def blocking_call(*_: Any, **__: Any) -> Any:
+        time.sleep(SLOW_CALL)
+        return result
+
+    return blocking_call
+
+
+def test_slow_blocking_work_does_not_block_the_loop(
+    connector: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(connector, "find_game_path", slow("C:/Riot Games/League"))
+    monkeypatch.setattr(connector, "check_plugin_status", slow(None))
+    monkeypatch.setattr(process, "league_processes_running", slow((True, False)))
+
+    _, responses = synthetic_session(hours=0)
+    connection = ReplayConnection(responses=responses, clock=lambda: 0.0)
+    monitor = LoopLagMonitor(interval=0.005, threshold=float("inf"))
+
+    async def scenario() -> None:
+        monitor_task = asyncio.create_task(monitor.run())
+        watcher = asyncio.create_task(
+            process.watch_league_processes(connector.module_data.gameflow)
+        )
+        await connector.connect(connection)
+        # Let the process watcher scan a few times.
+        await asyncio.sleep(SLOW_CALL * 3)
+        watcher.cancel()
+        monitor_task.cancel()
+
+    asyncio.run(scenario())
+
+    # find_game_path and check_plugin_status ran, and the watcher found the client.
+    assert connector.module_data.gameflow.client_running
+    assert monitor.samples > 50
+    assert monitor.max_lag < MAX_LOOP_LAG
@@ -0,0 +1,55 @@
+"""The match history keeps every finished game, and answers the queries of the in-game presence."""
+
+import argparse
+import asyncio
+from typing import Any
+
+from league_rpc.__main__ import champion_record
+from league_rpc.models.match_history import MatchHistory, MatchRecord, MatchRecorder
+
+
+def record(champion: str, ended_at: int, kills: int, deaths: int) -> MatchRecord:
+    return MatchRecord(
+        ended_at=ended_at, champion=champion, kills=kills, deaths=deaths, assists=4
+    )
+
+
+def test_champion_summary_and_last_games(tmp_path: Any) -> None:
+    path = str(tmp_path / "match_history.sqlite3")
+    history = MatchHistory(path=path)
+    history.add(record("Ahri", ended_at=100, kills=6, deaths=2))
+    history.add(record("Zed", ended_at=200, kills=1, deaths=8))
+    history.close()
+
+    history = MatchHistory(path=path)
+    summary = history.champion_summary("Ahri")
+    assert (summary.games, summary.kills, summary.last_played) == (1, 6, 100)
+    assert summary.format() == "1 game · 5.0 KDA"
+
+    # The summary that was read follows the new games, without reading the database again.
+    history.add(record("Ahri", ended_at=300, kills=2, deaths=2))
+    assert history.champion_summary("Ahri").format() == "2 games · 4.0 KDA"
+    assert [game.ended_at for game in history.last_games(count=2)] == [300, 200]
+    assert history.champion_summary("Lux").format() == ""
+    history.close()
+
+
+def test_the_presence_reads_the_champion_record_in_the_executor(
+    tmp_path: Any,
+) -> None:
+    recorder = MatchRecorder(
+        history=MatchHistory(path=str(tmp_path / "match_history.sqlite3"))
+    )
+    recorder.history.add(record("Ahri", ended_at=100, kills=6, deaths=2))
+
+    async def scenario() -> tuple[str, str]:
+        shown = await champion_record(
+            recorder, argparse.Namespace(no_stats=False), "Ahri"
+        )
+        hidden = await champion_record(
+            recorder, argparse.Namespace(no_stats=True), "Ahri"
+        )
+        return shown, hidden
+
+    assert asyncio.run(scenario()) == ("1 game · 5.0 KDA", "")
+    recorder.history.close()
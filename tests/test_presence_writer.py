@@ -0,0 +1,92 @@
+"""A PresenceWriter follows Discord to wherever its IPC socket is, without keeping channels to dead sockets."""
+
+import asyncio
+import os
+import sys
+from typing import Any, Callable
+
+import pytest
+
+from league_rpc.discord_ipc.fake_server import FakeDiscordServer
+from league_rpc.models.presence_writer import PresenceWriter
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="The fake Discord only serves unix sockets."
+)
+
+DISCOVERY_INTERVAL = 0.1
+
+
+async def eventually(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """Waits until the condition holds, failing the test after `timeout` seconds."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.05)
+
+
+def test_a_discord_back_on_another_socket_replaces_the_stale_one(
+    tmp_path: Any,
+) -> None:
+    old_path, new_path = str(tmp_path / "discord-ipc-0"), str(
+        tmp_path / "discord-ipc-1"
+    )
+
+    async def scenario() -> None:
+        old_discord = FakeDiscordServer(path=old_path)
+        new_discord = FakeDiscordServer(path=new_path)
+        await old_discord.start()
+        writer = PresenceWriter(
+            client_id="0",
+            paths=[old_path, new_path],
+            discovery_interval=DISCOVERY_INTERVAL,
+        )
+        await writer.connect()
+        writer.update(phase="Lobby", state="In Lobby")
+        await eventually(lambda: old_discord.counters.activities == 1)
+
+        # Discord crashed, leaving its socket behind, and came back on the next one.
+        await old_discord.stop()
+        with open(old_path, "w", encoding="utf-8"):
+            pass
+        await new_discord.start()
+        writer.update(phase="InProgress", state="In Game")
+
+        await eventually(lambda: list(writer.channels) == [new_path])
+        await eventually(lambda: new_discord.counters.activities == 1)
+        await writer.close()
+        await new_discord.stop()
+        os.unlink(old_path)
+
+    asyncio.run(scenario())
+
+
+def test_a_closed_discord_is_dropped_and_found_again_when_it_returns(
+    tmp_path: Any,
+) -> None:
+    path = str(tmp_path / "discord-ipc-0")
+
+    async def scenario() -> None:
+        discord = FakeDiscordServer(path=path)
+        await discord.start()
+        writer = PresenceWriter(
+            client_id="0",
+            paths=[path],
+            discovery_interval=DISCOVERY_INTERVAL,
+            retire_delay=DISCOVERY_INTERVAL * 3,
+        )
+        await writer.connect()
+        writer.update(phase="Lobby", state="In Lobby")
+        await eventually(lambda: discord.counters.activities == 1)
+
+        # Discord was closed, and took its socket with it.
+        await discord.stop()
+        writer.update(phase="InProgress", state="In Game")
+        await eventually(lambda: not writer.channels)
+
+        await discord.start()
+        await eventually(lambda: list(writer.channels) == [path])
+        await eventually(lambda: discord.counters.activities == 2)
+        await writer.close()
+        await discord.stop()
+
+    asyncio.run(scenario())
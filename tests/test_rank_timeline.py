@@ -0,0 +1,84 @@
+"""The rank timeline survives a corrupt state file, and tells the streak from the games won and lost, not the LP."""
+
+import json
+from typing import Any
+
+import pytest
+
+from league_rpc.models.client_data import ClientData
+from league_rpc.models.lcu.current_ranked_stats import RankedStats
+from league_rpc.models.rank_timeline import RANK_TIMELINE_FILE_VERSION, RankTimeline
+
+SOLO_QUEUE = "RANKED_SOLO_5x5"
+
+
+def record_games(
+    timeline: RankTimeline, games: list[tuple[str, str, int, int, int]]
+) -> None:
+    """Records the solo queue rank after each game, given as (tier, division, LP, wins, losses)."""
+    for at, (tier, division, league_points, wins, losses) in enumerate(games):
+        timeline.record(
+            ClientData(
+                summoner_rank=RankedStats(
+                    tier=tier,
+                    division=division,
+                    league_points=league_points,
+                    wins=wins,
+                    losses=losses,
+                )
+            ),
+            now=1_000_000 + at,
+        )
+
+
+@pytest.mark.parametrize(
+    "queues",
+    [
+        {SOLO_QUEUE: [[1, "Gold"]]},
+        {SOLO_QUEUE: [[]]},
+        {SOLO_QUEUE: ["Gold"]},
+        {SOLO_QUEUE: None},
+        [],
+    ],
+)
+def test_a_corrupt_timeline_file_is_ignored(tmp_path: Any, queues: Any) -> None:
+    path = tmp_path / "rank_timeline.json"
+    path.write_text(
+        json.dumps({"version": RANK_TIMELINE_FILE_VERSION, "queues": queues})
+    )
+    timeline = RankTimeline(path=str(path))
+
+    timeline.load()
+
+    assert timeline.streak(SOLO_QUEUE) == 0
+
+
+def test_losses_at_zero_lp_count_in_the_streak(tmp_path: Any) -> None:
+    timeline = RankTimeline(path=str(tmp_path / "rank_timeline.json"))
+    record_games(
+        timeline,
+        [
+            ("Gold", "IV", 20, 10, 10),
+            ("Gold", "IV", 0, 10, 11),
+            ("Gold", "IV", 0, 10, 12),
+            ("Gold", "IV", 0, 10, 13),
+        ],
+    )
+
+    assert timeline.streak(SOLO_QUEUE) == -3
+    assert timeline.summary(SOLO_QUEUE, now=1_000_010).endswith("3L streak")
+
+
+def test_a_win_and_a_loss_between_two_points_end_the_streak(tmp_path: Any) -> None:
+    timeline = RankTimeline(path=str(tmp_path / "rank_timeline.json"))
+    record_games(
+        timeline,
+        [
+            ("Gold", "IV", 20, 10, 10),
+            ("Gold", "IV", 40, 11, 10),
+            ("Gold", "IV", 40, 12, 11),
+            ("Gold", "IV", 60, 13, 11),
+        ],
+    )
+
+    assert timeline.streak(SOLO_QUEUE) == 1
@@ -0,0 +1,50 @@
+"""The presence restored from the state file is shown as soon as the League Client runs, before the LCU API connects."""
+
+import argparse
+import asyncio
+from typing import Any
+
+from league_rpc.lcu_api.event_replay import ReplayIpcClient
+from league_rpc.models.client_data import ClientData
+from league_rpc.models.client_data_snapshot import ClientDataSnapshot
+from league_rpc.models.gameflow_state import ClientState
+from league_rpc.models.presence_writer import PresenceWriter
+
+
+def test_restored_state_is_shown_before_the_lcu_connects(connector: Any) -> None:
+    ClientDataSnapshot(path=connector.rpc_updater.snapshot.path).save(
+        ClientData(summoner_icon=4321, availability="Away", gameflow_phase="InProgress")
+    )
+    updates: list[dict[str, Any]] = []
+    settle: float = connector.rpc_updater.delay * 4
+
+    async def scenario() -> None:
+        presence = PresenceWriter(
+            client_id="test",
+            clients=[ReplayIpcClient(on_update=updates.append)],
+            discover=False,
+        )
+        await connector.start_connector(
+            presence_from_main=presence,
+            cli_args=argparse.Namespace(
+                record_events=None, show_emojis=False, no_rank=False, no_stats=False
+            ),
+        )
+        await asyncio.sleep(settle)
+        # Nothing is shown while the client is not running.
+        assert not updates
+
+        # The process watcher found the client, the LCU API did not answer yet.
+        connector.module_data.gameflow.update(client_running=True)
+        await asyncio.sleep(settle)
+        await presence.close()
+
+    asyncio.run(scenario())
+
+    data: ClientData = connector.module_data.client_data
+    assert data.summoner_icon == 4321
+    # The phase of the last session is never restored.
+    assert connector.module_data.gameflow.state == ClientState.IN_CLIENT
+    assert updates
+    assert "4321" in updates[-1]["assets"]["large_image"]
+    assert updates[-1]["details"] == "Away"